@@ -0,0 +1,243 @@
+from contextlib import redirect_stdout
+import importlib
+from itertools import islice
+import io
+import math
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from benchmarks.synthetic import (
+    Statement,
+    boq_statement,
+    coles_statement,
+    commbank_statement,
+    hsbc_statement,
+    ing_statement,
+)
+from lib.MonthRange import MonthRange
+from lib.Source import Source
+from lib.TextDocument import TextDocument
+from lib.files import get_layout_page_data, transactions_to_csv
+from lib.printing import blue_print, error_print, valid_print
+
+SIZES = [10, 100, 1000, 10000, 100000]
+
+# a doubling in input should not much more than double the time
+MAX_SLOPE = 1.3
+
+STATEMENTS: Dict[str, Callable[[int], Statement]] = {
+    "boq": boq_statement,
+    "commbank": commbank_statement,
+    "hsbc": hsbc_statement,
+    "ing": ing_statement,
+    "coles": coles_statement,
+}
+
+
+def time_call(fn: Callable, *args):
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def parse_statement(source: Source, document: TextDocument, month_range: MonthRange):
+    # get_data streams, so the parse is only timed once it is drained
+    return list(source.get_data(document, month_range))
+
+
+# each stage takes the previous stage's output, the first takes the document
+Stage = Tuple[str, Callable[[Any], Iterable]]
+
+
+def commbank_stages(module, month_range: MonthRange) -> List[Stage]:
+    def split(document: TextDocument):
+        pages = module.get_page_data(document)
+        page_labels = module.CLASSIFIER.classify_pages(pages)
+        pages = module.get_transaction_pages(pages, page_labels)
+        return module.get_transaction_lines(pages)
+
+    def aggregate(rows: Iterable[List[str]]):
+        # the first aggregate is the opening balance
+        return islice(module.aggregate_lines(rows, month_range), 1, None)
+
+    return [
+        ("lines", split),
+        ("aggregate", aggregate),
+        ("transactions", module.get_transactions),
+    ]
+
+
+def boq_stages(module, month_range: MonthRange) -> List[Stage]:
+    def split(document: TextDocument):
+        pages = module.get_transaction_pages(get_layout_page_data(document))
+        return islice(module.get_transaction_rows(pages), 2, None)
+
+    return [
+        ("lines", split),
+        ("aggregate", lambda rows: module.aggregate_rows(rows, month_range)),
+        ("transactions", lambda data: map(module.format_transaction, data)),
+    ]
+
+
+def hsbc_stages(module, month_range: MonthRange) -> List[Stage]:
+    layout = None
+
+    def split(document: TextDocument):
+        nonlocal layout
+        pages = module.get_page_text(document)
+        layout = module.get_transaction_layout(pages[module.PAGE_START_INDEX])
+        transaction_pages = module.get_transaction_pages_text(pages)
+        texts = map(module.get_transaction_text, transaction_pages)
+        # the first line is the opening balance
+        return islice(module.get_transaction_lines(texts, []), 1, None)
+
+    return [
+        ("lines", split),
+        (
+            "aggregate",
+            lambda lines: module.aggregate_transactions(lines, layout, month_range),
+        ),
+        ("transactions", lambda data: module.get_transactions(data, month_range)),
+    ]
+
+
+def ing_stages(module, month_range: MonthRange) -> List[Stage]:
+    layout = None
+
+    def split(document: TextDocument):
+        nonlocal layout
+        pages = get_layout_page_data(document)
+        first_page = next(module.get_transaction_pages(pages))
+        layout = module.get_transaction_layout(first_page)
+        return module.get_transaction_lines(module.get_transaction_pages(pages))
+
+    return [
+        ("lines", split),
+        ("aggregate", lambda lines: module.aggregate_lines(lines, layout)),
+        ("transactions", lambda data: map(module.format_transaction, data)),
+    ]
+
+
+def coles_stages(module, month_range: MonthRange) -> List[Stage]:
+    # every transaction is a single line, so there is nothing to aggregate
+    def split(document: TextDocument):
+        pages = module.decrypt_and_get_data(document)
+        return (line for page in pages for line in module.get_transaction_lines(page))
+
+    return [
+        ("lines", split),
+        ("transactions", lambda lines: module.extract_transactions(lines, month_range)),
+    ]
+
+
+STAGES: Dict[str, Callable[[Any, MonthRange], List[Stage]]] = {
+    "boq": boq_stages,
+    "commbank": commbank_stages,
+    "hsbc": hsbc_stages,
+    "ing": ing_stages,
+    "coles": coles_stages,
+}
+
+
+def time_parsing_stages(name: str, module, document: TextDocument, month_range):
+    timings: Dict[str, float] = {}
+    output: Any = document
+    for stage, fn in STAGES[name](module, month_range):
+        # drained here so each generator is timed on its own
+        output, timings[stage] = time_call(lambda data: list(fn(data)), output)
+    return output, timings
+
+
+def check_count(name: str, stage: str, count: int, size: int):
+    if count != size:
+        raise Exception(f"{name}: {stage} expected {size} transactions, got {count}")
+
+
+def time_stages(name: str, size: int, output_path: str):
+    module = importlib.import_module(f"providers.{name}")
+    source = module.SOURCES[0]
+    statement = STATEMENTS[name](size)
+    document = TextDocument(statement.pages)
+
+    month_range, month_seconds = time_call(source.get_month_range, document)
+    if month_range != statement.month_range:
+        raise Exception(f"{name}: unexpected month range {month_range}")
+
+    staged, stage_seconds = time_parsing_stages(name, module, document, month_range)
+    check_count(name, "stages", len(staged), size)
+
+    transactions, data_seconds = time_call(
+        parse_statement, source, document, month_range
+    )
+    check_count(name, "get_data", len(transactions), size)
+
+    _, csv_seconds = time_call(
+        transactions_to_csv, output_path, f"{name}-{size}", transactions
+    )
+
+    return {
+        "month_range": month_seconds,
+        **stage_seconds,
+        "get_data": data_seconds,
+        "csv": csv_seconds,
+    }
+
+
+def get_slope(sizes: List[int], seconds: List[float]):
+    # least squares fit of log(time) against log(size), 1 is linear
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(max(s, 1e-7)) for s in seconds]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    denominator = sum((x - x_mean) ** 2 for x in xs)
+    return numerator / denominator
+
+
+def benchmark(name: str, sizes: List[int]):
+    blue_print(name.upper())
+    timings: Dict[str, List[float]] = {}
+    with tempfile.TemporaryDirectory() as output_path:
+        for size in sizes:
+            stages = time_stages(name, size, output_path)
+            for stage, seconds in stages.items():
+                timings.setdefault(stage, []).append(seconds)
+            formatted = "  ".join(f"{k} {v * 1000:9.2f}ms" for k, v in stages.items())
+            print(f"{size:>8}  {formatted}")
+
+    linear = True
+    for stage, seconds in timings.items():
+        # the smallest sizes are dominated by fixed overhead
+        fitted = [(s, t) for s, t in zip(sizes, seconds) if s >= 1000] or list(
+            zip(sizes, seconds)
+        )
+        if len(fitted) < 2:
+            continue
+        slope = get_slope([s for s, _ in fitted], [t for _, t in fitted])
+        message = f"{stage} scaling slope {slope:.2f}"
+        if slope > MAX_SLOPE:
+            error_print(message)
+            linear = False
+        else:
+            valid_print(message)
+    return linear
+
+
+def parse_sizes(argv: List[str]):
+    sizes = [int(arg) for arg in argv if arg.isdigit()]
+    return sorted(sizes) if len(sizes) > 0 else SIZES
+
+
+def parse_names(argv: List[str]):
+    names = [arg for arg in argv if arg in STATEMENTS]
+    return names if len(names) > 0 else list(STATEMENTS.keys())
+
+
+if __name__ == "__main__":
+    sizes = parse_sizes(sys.argv[1:])
+    results = [benchmark(name, sizes) for name in parse_names(sys.argv[1:])]
+    if not all(results):
+        sys.exit(1)
@@ -0,0 +1,344 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import random
+from typing import List
+
+from lib.MonthRange import MonthRange
+from lib.dates import get_month_abbreviation
+
+ROWS_PER_PAGE = 40
+
+START = datetime(2024, 1, 1)
+END = datetime(2024, 3, 31)
+MONTH_RANGE = MonthRange(START, datetime(2024, 3, 1))
+
+
+@dataclass
+class Statement:
+    pages: List[str]
+    month_range: MonthRange
+
+
+def money(cents: int):
+    return f"{cents / 100:,.2f}"
+
+
+def get_dates(count: int):
+    span = (END - START).days
+    return [START + timedelta(days=i * span // max(count, 1)) for i in range(count)]
+
+
+def paginate(rows: List[str], header: str, footer: str, last_footer: str):
+    pages = []
+    for start in range(0, max(len(rows), 1), ROWS_PER_PAGE):
+        chunk = rows[start : start + ROWS_PER_PAGE]
+        is_last = start + ROWS_PER_PAGE >= len(rows)
+        ending = last_footer if is_last else footer
+        lines = [header] + [row.rstrip() for row in chunk] + [ending]
+        pages.append("\n".join(lines))
+    return pages
+
+
+def boq_row(
+    date: str, processed: str, desc: str, debit: str, credit: str, balance: str
+):
+    return (
+        date.ljust(8)
+        + processed.ljust(11)
+        + desc.ljust(30)
+        + debit.rjust(12)
+        + credit.rjust(14)
+        + balance.rjust(14)
+    )
+
+
+def boq_statement(count: int):
+    rng = random.Random(count)
+    header = boq_row(
+        "Date", "Processed", "Description", "Debits ($)", "Credits ($)", "Balance ($)"
+    )
+
+    balance = 100000_00
+    opening = balance
+    debits = 0
+    credits = 0
+    rows = [
+        boq_row("", "", "OPENING BALANCE", "", "", money(balance)),
+        boq_row("", "", "Brought forward", "", "", ""),
+    ]
+    for date in get_dates(count):
+        date_cell = f"{date.day:02d}-{get_month_abbreviation(date.month)}"
+        kind = rng.choice(["card", "card", "transfer", "interest"])
+        cents = rng.randint(100, 50000)
+
+        if kind == "card":
+            balance -= cents
+            debits += cents
+            rows.append(
+                boq_row(
+                    date_cell, date_cell, "EFTPOS COLES 0583", money(-cents), "", ""
+                )
+            )
+            rows.append(boq_row("", "", "FITZROY AUS", "", "", ""))
+        elif kind == "transfer":
+            balance += cents
+            credits += cents
+            rows.append(
+                boq_row(
+                    date_cell, date_cell, "From: Future Saver", "", money(cents), ""
+                )
+            )
+        else:
+            balance += cents
+            credits += cents
+            rows.append(
+                boq_row(
+                    date_cell, date_cell, "Interest", "", money(cents), money(balance)
+                )
+            )
+
+    first_page = "\n".join(
+        [
+            "Bank of Queensland",
+            "Statement period",
+            " 01 Jan 2024 - 31 Mar 2024",
+            f"Opening balance     ${money(opening)}",
+            f"Total credits       ${money(credits)}",
+            f"Total debits        ${money(debits)}",
+            f"Closing balance     ${money(balance)}",
+            "",
+        ]
+    )
+    footer = "\nBank of Queensland Limited ABN 32 009 656 740"
+    return Statement([first_page] + paginate(rows, header, footer, footer), MONTH_RANGE)
+
+
+def commbank_row(date: str, desc: str, debit: str, credit: str, balance: str):
+    return (
+        date.ljust(8)
+        + desc.ljust(36)
+        + debit.rjust(12)
+        + credit.rjust(12)
+        + balance.rjust(16)
+    )
+
+
+def commbank_statement(count: int):
+    # the balance is only printed beside credits, the closing balance's CR
+    # sits apart from its amount and the table header is never the first line
+    # of a page, as the original double-space chunk parser expected
+    rng = random.Random(count)
+    header = "\n".join(
+        [
+            "Account Number  06 2000 12345678",
+            "",
+            commbank_row("Date", "Transaction", "Debit", "Credit", "Balance"),
+        ]
+    )
+
+    balance = 100000_00
+    opening = balance
+    debits = 0
+    credits = 0
+    rows = [commbank_row("01 Jan", "OPENING BALANCE", "", "", f"${money(balance)} CR")]
+    for date in get_dates(count):
+        date_cell = f"{date.day:02d} {get_month_abbreviation(date.month)}"
+        kind = rng.choice(["card", "card", "transfer", "salary"])
+        cents = rng.randint(100, 50000)
+
+        if kind == "card":
+            balance -= cents
+            debits += cents
+            rows.append(
+                commbank_row(date_cell, "WOOLWORTHS 3130", money(cents), "", "")
+            )
+        elif kind == "transfer":
+            balance -= cents
+            debits += cents
+            rows.append(commbank_row(date_cell, "Transfer To Savings", "", "", ""))
+            rows.append(commbank_row("", "NetBank Ref 1234", money(cents), "", ""))
+        else:
+            balance += cents
+            credits += cents
+            rows.append(
+                commbank_row(
+                    date_cell,
+                    "Salary ACME",
+                    "",
+                    f"${money(cents)}",
+                    f"${money(balance)} CR",
+                )
+            )
+
+    closing = f"${money(balance)} CR"
+    last_footer = commbank_row("31 Mar", "CLOSING BALANCE", "", "", closing)
+    first_page = "\n".join(
+        [
+            "Commonwealth Bank",
+            "Period 1 Jan 2024 - 31 Mar 2024",
+            "Opening balance   Total debits   Total credits   Closing balance",
+            f"${money(opening)} CR".rjust(15)
+            + f"${money(debits)}".rjust(15)
+            + f"${money(credits)}".rjust(16)
+            + f"${money(balance)}".rjust(18)
+            + "  CR",
+        ]
+    )
+    pages = paginate(rows, header, "", last_footer)
+    return Statement([first_page] + pages, MONTH_RANGE)
+
+
+def hsbc_row(date: str, desc: str, debit: str, credit: str, balance: str):
+    # measured from the start of the details, the original parser expected
+    # withdrawals to end before 120 characters, deposits before 160 and the
+    # balance after that
+    return (
+        date.ljust(12)
+        + desc.ljust(40)
+        + debit.rjust(60)
+        + credit.rjust(40)
+        + balance.rjust(35)
+    )
+
+
+def hsbc_statement(count: int):
+    rng = random.Random(count)
+    header = hsbc_row(
+        "Date", "Transaction Details", "Withdrawals", "Deposits", "Balance"
+    )
+
+    balance = 100000_00
+    debits = 0
+    credits = 0
+    debit_count = 0
+    credit_count = 0
+    rows = [hsbc_row("", "OPENING BALANCE", "", "", money(balance))]
+
+    previous_date = None
+    for date in get_dates(count):
+        date_cell = ""
+        if date != previous_date:
+            date_cell = f"{date.day:02d} {get_month_abbreviation(date.month)}"
+        previous_date = date
+
+        kind = rng.choice(["card", "card", "transfer", "cashback"])
+        cents = rng.randint(100, 50000)
+
+        if kind == "card":
+            balance -= cents
+            debits += cents
+            debit_count += 1
+            desc = "EFTPOS VISA AUD COLES 0583"
+            rows.append(hsbc_row(date_cell, desc, money(cents), "", ""))
+            rows.append(hsbc_row("", "FITZROY AU", "", "", ""))
+        elif kind == "transfer":
+            balance += cents
+            credits += cents
+            credit_count += 1
+            desc = "TRANSFER FROM SAVINGS"
+            rows.append(hsbc_row(date_cell, desc, "", money(cents), money(balance)))
+        else:
+            balance += cents
+            credits += cents
+            credit_count += 1
+            desc = "15JAN24 CASHBACK"
+            rows.append(hsbc_row(date_cell, desc, "", money(cents), ""))
+
+    last_footer = "\n".join(
+        [
+            f"CLOSING BALANCE {money(balance)}",
+            f"TRANSACTION TOTALS {money(debits)} {money(credits)}",
+            f"TRANSACTION COUNT {debit_count} {credit_count}",
+            "END OF STATEMENT",
+        ]
+    )
+    first_page = "HSBC\nSTATEMENT PERIOD FROM 01 Jan 2024 TO 31 Mar 2024\n"
+    pages = paginate(rows, header, "\nImportant Information", last_footer)
+    return Statement([first_page] + pages, MONTH_RANGE)
+
+
+def ing_row(date: str, out: str, into: str, balance: str, kind: str, desc: str):
+    if desc != "":
+        return " " * 14 + desc
+    row = date.ljust(14) + " " * 40 + out.rjust(14) + into.rjust(14)
+    return row + balance.rjust(14) + " " + kind
+
+
+def ing_statement(count: int):
+    rng = random.Random(count)
+    header = (
+        "Date".ljust(14)
+        + "Details".ljust(40)
+        + "Money out $".rjust(14)
+        + "Money in $".rjust(14)
+        + "Balance $".rjust(14)
+    )
+
+    balance = 100000_00
+    opening = balance
+    debits = 0
+    credits = 0
+    rows = []
+    for date in get_dates(count):
+        date_cell = date.strftime("%d/%m/%Y")
+        kind = rng.choice(["card", "card", "transfer", "interest"])
+        cents = rng.randint(100, 50000)
+
+        if kind == "card":
+            balance -= cents
+            debits += cents
+            row = ing_row(date_cell, money(-cents), "", money(balance), "EFTPOS", "")
+            rows.append(row)
+            rows.append(ing_row("", "", "", "", "", "COLES 0583 FITZROY"))
+        elif kind == "transfer":
+            balance += cents
+            credits += cents
+            kind = "Osko Deposit"
+            rows.append(ing_row(date_cell, "", money(cents), money(balance), kind, ""))
+            rows.append(ing_row("", "", "", "", "", "From Y Z WONG"))
+        else:
+            balance += cents
+            kind = "Interest Credit"
+            rows.append(ing_row(date_cell, "", money(cents), money(balance), kind, ""))
+            rows.append(ing_row("", "", "", "", "", "Bonus interest"))
+
+    first_page = "\n".join(
+        [
+            "ING",
+            "Statement from: 01/01/2024 to 31/03/2024",
+            "Opening balance  Total in  Total out  Closing balance",
+            f"${money(opening)}  ${money(credits)}  ${money(-debits)}  ${money(balance)}",
+            "",
+        ]
+    )
+    footer = "\nStatement continued over"
+    last_footer = "\nTotal Cashback Financial Year to Date: $0.00"
+    return Statement(
+        [first_page] + paginate(rows, header, footer, last_footer), MONTH_RANGE
+    )
+
+
+def coles_statement(count: int):
+    rng = random.Random(count)
+    header = "\n".join(
+        [
+            "Transactions",
+            "Statement Begins 1 January 2024",
+            "Statement Ends 31 March 2024",
+            "Date    Card Number    Transaction Details    Amount",
+        ]
+    )
+
+    rows = []
+    for date in get_dates(count):
+        date_cell = f"{get_month_abbreviation(date.month)} {date.day:02d}"
+        cents = rng.randint(100, 50000)
+        if rng.random() < 0.2:
+            rows.append(f"{date_cell}  Bpay Payments  5223  {money(-cents)}")
+        else:
+            rows.append(f"{date_cell}  Coles Supermarket Fitzroy  5223  {money(cents)}")
+
+    footer = "\n(Continued next page)"
+    last_footer = "Closing Balance $0.00\nImportant Information"
+    pages = paginate(rows, header, footer, last_footer)
+    return Statement(["Coles Mastercard"] + pages, MONTH_RANGE)
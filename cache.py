@@ -0,0 +1,25 @@
+import sys
+from typing import List
+
+from lib.page_cache import CACHE_PATH, get_cache_size, get_entry_paths, purge
+from lib.printing import error_print, valid_print
+
+
+def parse_args(args: List[str]):
+    if len(args) == 0:
+        return "info"
+    return args[0]
+
+
+if __name__ == "__main__":
+    command = parse_args(sys.argv[1:])
+
+    if command == "purge":
+        removed = purge()
+        error_print(f"{removed} cached documents removed from {CACHE_PATH}")
+    elif command == "info":
+        entries = len(get_entry_paths())
+        size = get_cache_size() / (1024 * 1024)
+        valid_print(f"{entries} cached documents, {size:.1f} MB in {CACHE_PATH}")
+    else:
+        raise Exception(f"Unknown command {command}, expected info or purge")
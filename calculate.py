@@ -1,13 +1,13 @@
-from providers.boq import handle_boq
-from providers.coles import handle_coles
-from providers.commbank import handle_commbank
-from providers.hsbc import handle_hsbc
-from providers.ing import handle_ing
+import os
+import sys
+
+from lib.files import is_manage_flag, parse_manage_args
+from lib.orchestrate import orchestrate
+from lib.registry import get_providers, parse_provider_names
 
 
 if __name__ == "__main__":
-    handle_boq()
-    handle_coles()
-    handle_commbank()
-    handle_hsbc()
-    handle_ing()
+    args = parse_manage_args(sys.argv, default_workers=os.cpu_count() or 1)
+    names = [arg for arg in sys.argv[1:] if not is_manage_flag(arg)]
+    providers = get_providers(parse_provider_names(names))
+    orchestrate(providers, args)
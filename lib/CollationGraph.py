@@ -0,0 +1,85 @@
+from dataclasses import asdict, dataclass
+import json
+import os
+from typing import Dict, List
+
+from lib.page_cache import hash_file
+
+GRAPH_NAME = "collation.json"
+
+
+@dataclass
+class FileHash:
+    size: int
+    mtime: int
+    hash: str
+
+
+@dataclass
+class MonthEntry:
+    # statement csv path to content hash, for every csv the month was built from
+    inputs: Dict[str, str]
+    missing_sources: List[str]
+
+
+class CollationGraph:
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.path = os.path.join(output_path, GRAPH_NAME)
+        self.months: Dict[str, MonthEntry] = {}
+        self.files: Dict[str, FileHash] = {}
+
+        if os.path.isfile(self.path):
+            with open(self.path) as file:
+                data = json.load(file)
+            for key in data["months"].keys():
+                self.months[key] = MonthEntry(**data["months"][key])
+            for key in data["files"].keys():
+                self.files[key] = FileHash(**data["files"][key])
+
+    def get_hash(self, file_path: str):
+        # unchanged size and mtime are trusted, anything else is rehashed
+        stat = os.stat(file_path)
+        known = self.files.get(file_path, None)
+        if known is not None and (known.size, known.mtime) == (
+            stat.st_size,
+            stat.st_mtime_ns,
+        ):
+            return known.hash
+
+        content_hash = hash_file(file_path)
+        self.files[file_path] = FileHash(stat.st_size, stat.st_mtime_ns, content_hash)
+        return content_hash
+
+    def get_inputs(self, file_paths: List[str]):
+        return {path: self.get_hash(path) for path in sorted(file_paths)}
+
+    def is_current(self, month_key: str, inputs: Dict[str, str], csv_name: str):
+        entry = self.months.get(month_key, None)
+        if entry is None or entry.inputs != inputs:
+            return False
+        return os.path.isfile(os.path.join(self.output_path, csv_name))
+
+    def record(self, month_key: str, inputs: Dict[str, str], missing: List[str]):
+        self.months[month_key] = MonthEntry(inputs=inputs, missing_sources=missing)
+
+    def prune(self, month_keys: List[str]):
+        present = set(month_keys)
+        for key in list(self.months.keys()):
+            if key not in present:
+                del self.months[key]
+
+        used = {path for entry in self.months.values() for path in entry.inputs}
+        for path in list(self.files.keys()):
+            if path not in used:
+                del self.files[path]
+
+    def save(self):
+        data = {
+            "months": {k: asdict(v) for k, v in self.months.items()},
+            "files": {k: asdict(v) for k, v in self.files.items()},
+        }
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+import re
+from typing import List, Tuple
+
+HEADER_SEPARATOR = re.compile(r"\S+(?: \S+)*")
+
+
+@dataclass
+class Column:
+    name: str
+    start: int
+    end: int
+    right_aligned: bool
+
+
+def get_header_names(header: str):
+    # header cells are separated by two or more spaces
+    return [match.group(0) for match in HEADER_SEPARATOR.finditer(header)]
+
+
+def find_columns(header: str, names: List[str], right_aligned: List[str]):
+    columns: List[Column] = []
+    search_index = 0
+    for name in names:
+        start = header.find(name, search_index)
+        if start == -1:
+            raise Exception(f"Expected {name} in header")
+        end = start + len(name)
+        columns.append(Column(name, start, end, name in right_aligned))
+        search_index = end
+    return columns
+
+
+def get_amount_start(row: str, earliest: int, start: int):
+    # only a word running into the header can be a wide amount, words that end
+    # before it are a long description
+    if start >= len(row) or row[start] == " " or row[start - 1] == " ":
+        return start
+
+    word_start = row.rfind(" ", 0, start) + 1
+    if word_start >= earliest:
+        return word_start
+
+    # a word reaching past the overhang is text spilling under the header
+    word_end = row.find(" ", start)
+    return len(row) if word_end == -1 else word_end
+
+
+class ColumnLayout:
+    def __init__(self, columns: List[Column], overhang: int = 0):
+        self.columns = columns
+        self.names = [column.name for column in columns]
+
+        # amounts sit under the end of their header, text under its start
+        self.cuts = [0]
+        # cut index, earliest start and header start of each amount column
+        # that follows a text column and may start before its header
+        self.overhangs: List[Tuple[int, int, int]] = []
+        for i in range(1, len(columns)):
+            previous = columns[i - 1]
+            column = columns[i]
+            if not column.right_aligned:
+                self.cuts.append(column.start)
+            elif previous.right_aligned:
+                self.cuts.append(previous.end)
+            else:
+                earliest = max(column.start - overhang, previous.end)
+                self.cuts.append(earliest)
+                if earliest < column.start:
+                    self.overhangs.append((i, earliest, column.start))
+        self.cuts.append(None)
+
+    @staticmethod
+    def from_header(
+        header: str, names: List[str], right_aligned: List[str], overhang: int = 0
+    ):
+        return ColumnLayout(find_columns(header, names, right_aligned), overhang)
+
+    def slice(self, row: str):
+        cuts = self.cuts
+        if len(self.overhangs) > 0:
+            cuts = list(cuts)
+            for i, earliest, start in self.overhangs:
+                cuts[i] = get_amount_start(row, earliest, start)
+                # text running past the column pushes the columns after it
+                j = i + 1
+                while cuts[j] is not None and cuts[j] < cuts[i]:
+                    cuts[j] = cuts[i]
+                    j += 1
+        return [row[cuts[i] : cuts[i + 1]].strip() for i in range(len(self.columns))]
+
+    def get_index(self, name: str):
+        return self.names.index(name)
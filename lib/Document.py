@@ -0,0 +1,98 @@
+from collections.abc import Sequence
+from typing import Dict
+
+from lib.json_config import get_password
+from lib.page_cache import hash_file, read_entry, write_entry
+
+EXTRACTION_MODE = "layout"
+
+
+class Document:
+    def __init__(self, file_path: str, use_cache: bool = True):
+        self.file_path = file_path
+        self.reader = None
+        self.password: str | None = None
+        self.password_key: str | None = None
+        self.decrypted = False
+        self.page_text: Dict[int, str] = {}
+        self.cached_page_count: int | None = None
+        self.extracted = False
+        self.use_cache = use_cache
+
+        self.content_hash = hash_file(file_path)
+        if use_cache:
+            entry = read_entry(self.content_hash, EXTRACTION_MODE)
+            if entry is not None:
+                self.cached_page_count, self.page_text = entry
+
+    def get_reader(self):
+        if self.reader is None:
+            # imported here so runs that only hit the cache never load pypdf
+            from pypdf import PdfReader
+
+            self.reader = PdfReader(self.file_path)
+        if self.password is None and self.password_key is not None:
+            self.password = get_password(self.password_key)
+        if self.password is not None and not self.decrypted:
+            if not self.reader.decrypt(self.password):
+                raise Exception("PDF Not Decryptable")
+            self.decrypted = True
+        return self.reader
+
+    def decrypt(self, password: str):
+        # deferred until a page is actually extracted, cached text needs no key
+        self.password = password
+        if self.reader is not None:
+            self.get_reader()
+
+    def decrypt_with_key(self, password_key: str):
+        # the password is only looked up if the pdf itself has to be read
+        self.password_key = password_key
+        if self.reader is not None:
+            self.get_reader()
+
+    def page_count(self):
+        if self.cached_page_count is not None:
+            return self.cached_page_count
+        return len(self.get_reader().pages)
+
+    def get_pages(self):
+        return LazyPages(self)
+
+    def get_page_text(self, index: int):
+        text = self.page_text.get(index, None)
+        if text is None:
+            page = self.get_reader().pages[index]
+            text = page.extract_text(extraction_mode=EXTRACTION_MODE)
+            self.page_text[index] = text
+            self.extracted = True
+        return text
+
+    def close(self):
+        if self.extracted and self.use_cache:
+            write_entry(
+                self.content_hash, EXTRACTION_MODE, self.page_count(), self.page_text
+            )
+        if self.reader is not None:
+            self.reader.close()
+
+
+class LazyPages(Sequence):
+    # pages are only extracted once indexed, so parsers that stop early never
+    # render the trailing pages
+    def __init__(self, document: Document):
+        self.document = document
+
+    def __len__(self):
+        return self.document.page_count()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indices = range(*index.indices(len(self)))
+            return [self.document.get_page_text(i) for i in indices]
+
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("Page index out of range")
+        return self.document.get_page_text(index)
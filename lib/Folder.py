@@ -1,46 +1,153 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+import heapq
+from itertools import accumulate
 import os
-from typing import List
+from typing import Dict, Iterable, List
 
-from lib.MonthRange import MonthRange, dates_overlap, get_month_range_from_filename
+from lib.HistoryStore import FileStats, HistoryStore
+from lib.MonthRange import MonthRange, get_month_range_from_filename
 from lib.files import get_filenames
-from lib.transaction import get_transactions_in_csv
+from lib.transaction import Transaction, get_transactions_in_csv
 
 
-def get_filenames_between_dates(query_range: MonthRange, filenames: str):
-    valid_month_ranges: List[str] = []
+@dataclass
+class Statement:
+    month_range: MonthRange
+    filename: str
+
+
+@dataclass
+class StatementRows:
+    # sorted by date, the sort is stable so same day rows keep statement order
+    dates: List[datetime]
+    transactions: List[Transaction]
+
+    def between(self, query_range: MonthRange):
+        low = bisect_left(self.dates, query_range.start)
+        high = bisect_right(self.dates, query_range.end)
+        return self.transactions[low:high]
+
+
+def build_statement_index(filenames: List[str]):
+    statements: List[Statement] = []
     for filename in filenames:
         month_range = get_month_range_from_filename(filename)
         if month_range is None:
             print(filename)
             continue
-
-        if not dates_overlap(query_range, month_range):
-            continue
-
-        valid_month_ranges.append(filename)
-    return valid_month_ranges
+        statements.append(Statement(month_range, filename))
+    statements.sort(key=lambda s: (s.month_range.start, s.filename))
+    return statements
 
 
 class Folder:
-    def __init__(self, path: str):
+    def __init__(self, path: str, store: HistoryStore | None = None):
         self.path = path
+        # answers queries by slicing the store while it matches the csvs here
+        self.store = store
+        self.store_current: bool | None = None
 
-    def get_transactions_between_dates(self, query_range: MonthRange):
-        filenames = get_filenames(self.path)
-        ranges = get_filenames_between_dates(query_range, filenames)
+        # built on first use and kept for the life of the process
+        self.statements: List[Statement] | None = None
+        self.starts: List[datetime] = []
+        self.latest_ends: List[datetime] = []
+        self.rows: Dict[str, StatementRows] = {}
 
-        transactions = []
-        for range in ranges:
-            full_path = os.path.join(self.path, range)
-            csv_transactions = get_transactions_in_csv(full_path)
+    def get_csv_filenames(self):
+        if not os.path.isdir(self.path):
+            return []
+        return [f for f in get_filenames(self.path) if f.endswith(".csv")]
 
-            for transaction in csv_transactions:
-                if query_range.contains_date(transaction.date):
-                    transactions.append(transaction)
+    def get_file_stats(self) -> FileStats:
+        stats: FileStats = {}
+        for filename in self.get_csv_filenames():
+            stat = os.stat(os.path.join(self.path, filename))
+            stats[filename] = [stat.st_size, stat.st_mtime_ns]
+        return stats
 
+    def order_filenames(self, filenames: Iterable[str]):
+        # the order statements are read in when answering from the csvs, so
+        # same day rows keep the same order in the history store
+        return [s.filename for s in build_statement_index(list(filenames))]
+
+    def read_files(self, filenames: List[str]):
+        transactions: List[Transaction] = []
+        for filename in filenames:
+            full_path = os.path.join(self.path, filename)
+            transactions += get_transactions_in_csv(full_path)
         return transactions
 
+    def reset(self):
+        # for when the csvs here change while the folder is in use
+        self.store_current = None
+        self.statements = None
+        self.rows = {}
+
+    def get_statements(self):
+        if self.statements is None:
+            self.statements = build_statement_index(get_filenames(self.path))
+            self.starts = [s.month_range.start for s in self.statements]
+            ends = [s.month_range.end for s in self.statements]
+            self.latest_ends = list(accumulate(ends, max))
+        return self.statements
+
+    def get_statements_between_dates(self, query_range: MonthRange):
+        statements = self.get_statements()
+        # sorted by start, and the running latest end only grows, so both
+        # ends of the overlapping run are found by bisection
+        low = bisect_left(self.latest_ends, query_range.start)
+        high = bisect_right(self.starts, query_range.end)
+        return [
+            s for s in statements[low:high] if s.month_range.end >= query_range.start
+        ]
+
+    def load_statement(self, filename: str):
+        rows = self.rows.get(filename, None)
+        if rows is None:
+            transactions = self.read_files([filename])
+            transactions.sort(key=lambda t: t.date)
+            rows = StatementRows([t.date for t in transactions], transactions)
+            self.rows[filename] = rows
+        return rows
+
+    def uses_store(self):
+        if self.store is None:
+            return False
+        if self.store_current is None:
+            files = self.get_file_stats()
+            self.store_current = self.store.is_current(self.get_source(), files)
+        return self.store_current
+
+    def get_transactions_between_dates(self, query_range: MonthRange):
+        if self.uses_store():
+            return self.store.get_transactions_between_dates(
+                query_range, self.get_source()
+            )
+
+        transactions: List[Transaction] = []
+        for statement in self.get_statements_between_dates(query_range):
+            rows = self.load_statement(statement.filename)
+            transactions += rows.between(query_range)
+        return transactions
+
+    def get_all_transactions(self):
+        if self.uses_store():
+            return self.store.get_transactions_between_dates(None, self.get_source())
+
+        # merging is stable, so same day rows keep statement order
+        statements = self.get_statements()
+        streams = [self.load_statement(s.filename).transactions for s in statements]
+        return list(heapq.merge(*streams, key=lambda t: t.date))
+
     def get_source(self):
         split = self.path.split("/")
         without_data_suffix = split[1:]
         return "-".join(without_data_suffix)
+
+
+def history_is_current(store: HistoryStore, folders: List[Folder]):
+    if not store.exists():
+        return False
+    return all(store.is_current(f.get_source(), f.get_file_stats()) for f in folders)
@@ -0,0 +1,253 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass, field
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, Tuple
+
+from lib.MonthRange import MonthRange, year_month_to_string
+from lib.dates import from_seconds, to_seconds
+from lib.transaction import TYPE_VALUES, Transaction
+
+HISTORY_PATH = os.path.join("data", "history")
+RECORDS_NAME = "transactions.bin"
+DESCRIPTIONS_NAME = "descriptions.txt"
+INDEX_NAME = "index.json"
+VERSION = 1
+
+# date, amount, description index, type code, source code
+RECORD = struct.Struct("<qqIBBxx")
+
+# file name to [size, mtime in ns], for every statement csv of a source
+FileStats = Dict[str, List[int]]
+
+
+def get_month_key(date):
+    return year_month_to_string(date.year, date.month)
+
+
+@dataclass
+class HistoryIndex:
+    version: int = VERSION
+    row_count: int = 0
+    description_count: int = 0
+    description_bytes: int = 0
+    types: List[str] = field(default_factory=lambda: list(TYPE_VALUES.keys()))
+    sources: List[str] = field(default_factory=list)
+    files: Dict[str, FileStats] = field(default_factory=dict)
+    # month key to the [first, last) rows holding that month
+    months: Dict[str, List[int]] = field(default_factory=dict)
+
+
+class HistoryStore:
+    # every transaction from every source in one date sorted file, mapped
+    # read only so concurrent readers share the page cache
+    def __init__(self, path: str = HISTORY_PATH):
+        self.path = path
+        self.index = HistoryIndex()
+        self.descriptions: List[str] = []
+        self.records: mmap.mmap | None = None
+        self.open()
+
+    def get_file_path(self, name: str):
+        return os.path.join(self.path, name)
+
+    def open(self):
+        self.close()
+        index_path = self.get_file_path(INDEX_NAME)
+        if not os.path.isfile(index_path):
+            self.index = HistoryIndex()
+            self.descriptions = []
+            return
+
+        with open(index_path) as file:
+            index = HistoryIndex(**json.load(file))
+        if index.version != VERSION:
+            self.index = HistoryIndex()
+            self.descriptions = []
+            return
+        self.index = index
+
+        descriptions_path = self.get_file_path(DESCRIPTIONS_NAME)
+        with open(descriptions_path, encoding="utf-8", newline="") as file:
+            self.descriptions = file.read().split("\n")[: index.description_count]
+
+        if index.row_count > 0:
+            with open(self.get_file_path(RECORDS_NAME), "rb") as file:
+                length = index.row_count * RECORD.size
+                self.records = mmap.mmap(
+                    file.fileno(), length, access=mmap.ACCESS_READ
+                )
+
+    def close(self):
+        if self.records is not None:
+            self.records.close()
+            self.records = None
+
+    def exists(self):
+        return os.path.isfile(self.get_file_path(INDEX_NAME))
+
+    def __len__(self):
+        return self.index.row_count
+
+    def is_current(self, source: str, files: FileStats):
+        return self.index.files.get(source, None) == files
+
+    def get_date_seconds(self, row: int):
+        return RECORD.unpack_from(self.records, row * RECORD.size)[0]
+
+    def get_row_range(self, query_range: MonthRange | None):
+        if self.records is None:
+            return 0, 0
+        if query_range is None:
+            return 0, len(self)
+
+        # whole months come from the offset table, partial ones by bisection
+        months = self.index.months
+        keys = sorted(months.keys())
+        start_key = get_month_key(query_range.start)
+        end_key = get_month_key(query_range.end)
+        inside = [months[k] for k in keys if start_key <= k <= end_key]
+        if len(inside) == 0:
+            return 0, 0
+
+        low = inside[0][0]
+        high = inside[-1][1]
+        rows = range(low, high)
+        key = self.get_date_seconds
+        first = bisect_left(rows, to_seconds(query_range.start), key=key)
+        last = bisect_right(rows, to_seconds(query_range.end), key=key)
+        return low + first, low + last
+
+    def slice(self, query_range: MonthRange | None):
+        low, high = self.get_row_range(query_range)
+        if low == high:
+            return memoryview(b"")
+        return memoryview(self.records)[low * RECORD.size : high * RECORD.size]
+
+    def iter_rows(self, query_range: MonthRange | None):
+        view = self.slice(query_range)
+        try:
+            yield from RECORD.iter_unpack(view)
+        finally:
+            view.release()
+
+    def get_transactions_between_dates(
+        self, query_range: MonthRange | None, source: str | None = None
+    ):
+        # no range is the whole history
+        source_code = None
+        if source is not None:
+            if source not in self.index.sources:
+                return []
+            source_code = self.index.sources.index(source)
+
+        types = [TYPE_VALUES[v] for v in self.index.types]
+        dates: Dict[int, object] = {}
+        transactions: List[Transaction] = []
+        for seconds, amount, description, type, code in self.iter_rows(query_range):
+            if source_code is not None and code != source_code:
+                continue
+            date = dates.get(seconds, None)
+            if date is None:
+                date = from_seconds(seconds)
+                dates[seconds] = date
+            transactions.append(
+                Transaction(date, amount, types[type], self.descriptions[description])
+            )
+        return transactions
+
+    def write(self, sources: Dict[str, Tuple[FileStats, List[Transaction]]]):
+        # each source's transactions come in statement order, sorting is
+        # stable so same day transactions keep that and their source order
+        index = HistoryIndex()
+        rows: List[Tuple[Transaction, int]] = []
+        for code, source in enumerate(sources.keys()):
+            files, transactions = sources[source]
+            index.sources.append(source)
+            index.files[source] = files
+            rows += [(t, code) for t in transactions]
+        rows.sort(key=lambda row: row[0].date)
+
+        self.close()
+        os.makedirs(self.path, exist_ok=True)
+        # unlinked rather than truncated, other readers keep their mapping
+        for name in [RECORDS_NAME, DESCRIPTIONS_NAME]:
+            if os.path.isfile(self.get_file_path(name)):
+                os.remove(self.get_file_path(name))
+        self.descriptions = []
+        self.index = index
+        self.extend(rows)
+
+    def append(
+        self, source: str, files: FileStats, transactions: List[Transaction]
+    ):
+        # only transactions after everything stored can go on the end, a tie
+        # could belong before rows already written
+        if len(self) > 0 and len(transactions) > 0:
+            last_date = from_seconds(self.get_date_seconds(len(self) - 1))
+            if min(t.date for t in transactions) <= last_date:
+                return False
+
+        if source not in self.index.sources:
+            self.index.sources.append(source)
+        code = self.index.sources.index(source)
+        self.index.files[source] = files
+
+        self.close()
+        os.makedirs(self.path, exist_ok=True)
+        ordered = sorted(transactions, key=lambda t: t.date)
+        self.extend([(t, code) for t in ordered])
+        return True
+
+    def extend(self, rows: Iterable[Tuple[Transaction, int]]):
+        index = self.index
+        codes = {d: i for i, d in enumerate(self.descriptions)}
+        type_codes = {v: i for i, v in enumerate(index.types)}
+
+        records_path = self.get_file_path(RECORDS_NAME)
+        descriptions_path = self.get_file_path(DESCRIPTIONS_NAME)
+
+        # anything past what the index covers is a torn earlier write
+        with open(records_path, "ab") as records, open(
+            descriptions_path, "ab"
+        ) as descriptions:
+            records.truncate(index.row_count * RECORD.size)
+            descriptions.truncate(index.description_bytes)
+            for transaction, source_code in rows:
+                description = transaction.description.replace("\n", " ")
+                code = codes.get(description, None)
+                if code is None:
+                    code = len(self.descriptions)
+                    self.descriptions.append(description)
+                    codes[description] = code
+                    line = (description + "\n").encode()
+                    descriptions.write(line)
+                    index.description_bytes += len(line)
+
+                records.write(
+                    RECORD.pack(
+                        to_seconds(transaction.date),
+                        transaction.amount,
+                        code,
+                        type_codes[transaction.type.value],
+                        source_code,
+                    )
+                )
+
+                month = get_month_key(transaction.date)
+                bounds = index.months.setdefault(month, [index.row_count, 0])
+                index.row_count += 1
+                bounds[1] = index.row_count
+
+        index.description_count = len(self.descriptions)
+        self.save_index()
+        self.open()
+
+    def save_index(self):
+        path = self.get_file_path(INDEX_NAME)
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(asdict(self.index), file, indent=2, sort_keys=True)
+        os.replace(temporary_path, path)
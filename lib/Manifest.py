@@ -0,0 +1,130 @@
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from typing import Dict, List
+
+from lib.MonthRange import MonthRange
+from lib.page_cache import hash_file
+
+MANIFEST_NAME = "manifest.json"
+
+# the shared code every provider parses statements with, and the writers
+# of the csvs and sidecars, an edit to any of these changes the files on
+# disk as much as an edit to the provider itself
+PARSING_MODULES = [
+    "lib.ColumnLayout",
+    "lib.MonthRange",
+    "lib.PageClassifier",
+    "lib.PageText",
+    "lib.dates",
+    "lib.files",
+    "lib.search",
+    "lib.sidecar",
+    "lib.strings",
+    "lib.transaction",
+    "lib.validation",
+]
+
+
+def get_module_path(module_name: str):
+    module = sys.modules.get(module_name, None)
+    if module is not None:
+        return module.__file__
+    # resolved without importing so unchanged providers are never loaded
+    return importlib.util.find_spec(module_name).origin
+
+
+@lru_cache(maxsize=None)
+def get_module_hash(module_name: str):
+    return hash_file(get_module_path(module_name))
+
+
+def get_parser_version(module_name: str):
+    # any edit to the provider module or the shared parsing modules
+    # invalidates the statements it parsed
+    digest = hashlib.sha256()
+    for name in [module_name] + PARSING_MODULES:
+        digest.update(get_module_hash(name).encode())
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class ManifestEntry:
+    hash: str
+    size: int
+    mtime: float
+    month_range: str
+    csv: str
+    parser_version: str | None
+
+
+class Manifest:
+    def __init__(self, input_path: str, output_path: str):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.path = os.path.join(input_path, MANIFEST_NAME)
+        self.entries: Dict[str, ManifestEntry] = {}
+
+        if os.path.isfile(self.path):
+            with open(self.path) as file:
+                data = json.load(file)
+            for filename in data.keys():
+                self.entries[filename] = ManifestEntry(**data[filename])
+
+    def is_current(self, filename: str, parser_version: str | None):
+        entry = self.entries.get(filename, None)
+        if entry is None:
+            return False
+
+        if parser_version is not None and entry.parser_version != parser_version:
+            return False
+
+        if not os.path.isfile(os.path.join(self.output_path, entry.csv)):
+            return False
+
+        file_path = os.path.join(self.input_path, filename)
+        stat = os.stat(file_path)
+        if stat.st_size == entry.size and stat.st_mtime == entry.mtime:
+            return True
+
+        # touched but possibly unchanged, only the bytes decide
+        if stat.st_size != entry.size or hash_file(file_path) != entry.hash:
+            return False
+
+        entry.mtime = stat.st_mtime
+        return True
+
+    def record(
+        self,
+        filename: str,
+        content_hash: str,
+        month_range: MonthRange,
+        parser_version: str | None,
+    ):
+        stat = os.stat(os.path.join(self.input_path, filename))
+        name = month_range.to_filename()
+        self.entries[filename] = ManifestEntry(
+            hash=content_hash,
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            month_range=name,
+            csv=name + ".csv",
+            parser_version=parser_version,
+        )
+
+    def prune(self, filenames: List[str]):
+        present = set(filenames)
+        for filename in list(self.entries.keys()):
+            if filename not in present:
+                del self.entries[filename]
+
+    def save(self):
+        data = {k: asdict(v) for k, v in self.entries.items()}
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.path)
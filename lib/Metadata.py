@@ -1,7 +1,9 @@
+import csv
 from dataclasses import dataclass
+import os
 from typing import List
 from lib.SingleMonthRange import SingleMonthRange
-from lib.files import export_to_csv
+from lib.files import export_to_csv, write_csv
 from lib.printing import valid_print
 
 
@@ -25,3 +27,36 @@ def metadata_to_csv(output_path: str, name: str, metadata: List[Metadata]):
     export_to_csv(output_path, name, data)
 
     valid_print(f"{name} written, {len(metadata)} metadata items")
+
+
+def read_metadata_rows(csv_path: str):
+    if not os.path.isfile(csv_path):
+        return []
+    with open(csv_path, newline="") as file:
+        return list(csv.reader(file))
+
+
+def patch_metadata_csv(output_path: str, name: str, metadata: List[Metadata]):
+    csv_path = os.path.join(output_path, name)
+    rows = [[str(value) for value in item.to_data()] for item in metadata]
+
+    # rows are keyed by year and month, only a changed month counts
+    old = {tuple(row[:2]): row for row in read_metadata_rows(csv_path)}
+    new = {tuple(row[:2]): row for row in rows}
+    changed = [key for key in new.keys() if old.get(key, None) != new[key]]
+    removed = [key for key in old.keys() if key not in new]
+    count = len(changed) + len(removed)
+
+    if count == 0:
+        return 0
+
+    # months are in order, so new months after an unchanged file only need
+    # appending, any other change rewrites the file as it is small
+    old_rows = list(old.values())
+    if len(old_rows) > 0 and rows[: len(old_rows)] == old_rows:
+        with open(csv_path, mode="a", newline="") as file:
+            csv.writer(file).writerows(rows[len(old_rows) :])
+    else:
+        write_csv(csv_path, rows)
+    valid_print(f"{name} patched, {count} metadata items changed")
+    return count
@@ -66,7 +66,3 @@ def get_month_range_from_filename(filename: str):
         return MonthRange(low_date, high_date)
     except:
         return None
-
-
-def dates_overlap(range1: MonthRange, range2: MonthRange):
-    return range1.start <= range2.end and range2.start <= range1.end
@@ -0,0 +1,45 @@
+from enum import Enum
+from typing import Dict, Iterable, List, Sequence, Set
+
+
+class PageLabel(Enum):
+    Transaction = "Transaction"
+    Validation = "Validation"
+    EndOfStatement = "End Of Statement"
+    Boilerplate = "Boilerplate"
+
+
+class PageClassifier:
+    def __init__(self, label_keywords: Dict[PageLabel, List[str]]):
+        self.label_keywords = label_keywords
+
+        # keywords shared between labels are only searched for once per page
+        self.keywords: List[str] = []
+        for keywords in label_keywords.values():
+            for keyword in keywords:
+                if keyword not in self.keywords:
+                    self.keywords.append(keyword)
+
+    def classify(self, page: str):
+        found = {keyword for keyword in self.keywords if keyword in page}
+
+        labels: Set[PageLabel] = set()
+        for label, keywords in self.label_keywords.items():
+            if all(keyword in found for keyword in keywords):
+                labels.add(label)
+
+        if len(labels) == 0:
+            labels.add(PageLabel.Boilerplate)
+        return labels
+
+    def classify_pages(self, pages: Sequence[str]):
+        return [self.classify(page) for page in pages]
+
+    def select(self, pages: Iterable[str], label: PageLabel):
+        for page in pages:
+            if label in self.classify(page):
+                yield page
+
+
+def select_pages(pages: Sequence[str], page_labels: List[Set[PageLabel]], label):
+    return [page for page, labels in zip(pages, page_labels) if label in labels]
@@ -0,0 +1,50 @@
+from bisect import bisect_left, bisect_right
+from typing import List
+
+
+class PageText:
+    def __init__(self, text: str):
+        self.text = text
+        self.newlines: List[int] = []
+
+        index = text.find("\n")
+        while index != -1:
+            self.newlines.append(index)
+            index = text.find("\n", index + 1)
+
+    def previous_newline(self, offset: int):
+        # the newline at or before offset, -1 when on the first line
+        position = bisect_right(self.newlines, offset) - 1
+        if position < 0:
+            return -1
+        return self.newlines[position]
+
+    def next_newline(self, offset: int):
+        # the newline at or after offset, -1 when on the last line
+        position = bisect_left(self.newlines, offset)
+        if position == len(self.newlines):
+            return -1
+        return self.newlines[position]
+
+    def line_start(self, offset: int):
+        return self.previous_newline(offset - 1) + 1
+
+    def line_end(self, offset: int):
+        end = self.next_newline(offset)
+        if end == -1:
+            return len(self.text)
+        return end
+
+    def line_at(self, offset: int):
+        return self.text[self.line_start(offset) : self.line_end(offset)]
+
+    def lines_between(self, start_offset: int, stop_offset: int | None = None):
+        # lines after the one holding start_offset, before the one holding
+        # stop_offset or to the end of the page
+        start = self.line_end(start_offset) + 1
+        stop = len(self.text)
+        if stop_offset is not None:
+            stop = self.line_start(stop_offset) - 1
+        if stop <= start:
+            return []
+        return self.text[start:stop].split("\n")
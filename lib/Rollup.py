@@ -0,0 +1,104 @@
+import json
+import os
+from typing import Dict, Iterable, List
+
+from lib.TransactionTable import CATEGORIES, TransactionTable
+from lib.categorise import Category, get_rules_version
+
+ROLLUP_NAME = "rollup.json"
+
+# source to category value to [cents, count]
+Cells = Dict[str, Dict[str, List[int]]]
+
+
+def get_month_cells(table: TransactionTable, row_sources: List[str]) -> Cells:
+    cells: Cells = {}
+    for source, code, amount in zip(row_sources, table.categories, table.amounts):
+        by_category = cells.setdefault(source, {})
+        cell = by_category.setdefault(CATEGORIES[code].value, [0, 0])
+        cell[0] += amount
+        cell[1] += 1
+    return cells
+
+
+class Rollup:
+    # sums and counts per month, source and category, kept beside the monthly
+    # csvs so totals never need the transactions themselves
+    def __init__(self, output_path: str):
+        self.path = os.path.join(output_path, ROLLUP_NAME)
+        self.rules_version: str | None = None
+        self.months: Dict[str, Cells] = {}
+
+        if os.path.isfile(self.path):
+            with open(self.path) as file:
+                data = json.load(file)
+            self.rules_version = data["rules_version"]
+            self.months = data["months"]
+
+    def is_current(self):
+        return self.rules_version == get_rules_version()
+
+    def has_month(self, month_key: str):
+        return month_key in self.months
+
+    def set_month(self, month_key: str, cells: Cells):
+        self.months[month_key] = cells
+        self.rules_version = get_rules_version()
+
+    def clear(self):
+        self.months = {}
+
+    def prune(self, month_keys: Iterable[str]):
+        present = set(month_keys)
+        for key in list(self.months.keys()):
+            if key not in present:
+                del self.months[key]
+
+    def save(self):
+        data = {"rules_version": self.rules_version, "months": self.months}
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+        os.replace(temporary_path, self.path)
+
+    def get_month_keys(self, year: int | None = None):
+        keys = sorted(self.months.keys())
+        if year is None:
+            return keys
+        return [k for k in keys if k.startswith(f"{year}-")]
+
+    def total(
+        self,
+        month_key: str,
+        categories: List[Category] | None = None,
+        source: str | None = None,
+    ):
+        values = None if categories is None else {c.value for c in categories}
+        cents = 0
+        count = 0
+        for cell_source, by_category in self.months.get(month_key, {}).items():
+            if source is not None and cell_source != source:
+                continue
+            for category, cell in by_category.items():
+                if values is not None and category not in values:
+                    continue
+                cents += cell[0]
+                count += cell[1]
+        return cents, count
+
+    def totals_by_month(
+        self, categories: List[Category] | None = None, year: int | None = None
+    ):
+        return {k: self.total(k, categories) for k in self.get_month_keys(year)}
+
+    def get_sources(self):
+        return sorted({s for cells in self.months.values() for s in cells.keys()})
+
+    def totals_by_source(
+        self, categories: List[Category] | None = None, year: int | None = None
+    ):
+        keys = self.get_month_keys(year)
+        totals: Dict[str, int] = {}
+        for source in self.get_sources():
+            totals[source] = sum(self.total(k, categories, source)[0] for k in keys)
+        return totals
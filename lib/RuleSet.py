@@ -0,0 +1,92 @@
+from collections import deque
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+import hashlib
+import json
+from typing import Dict, List
+
+from lib.json_config import get_json
+
+RULES_FILENAME = "categories.json"
+
+
+@dataclass
+class Rule:
+    match: str
+    category: str
+    # higher wins, equal priorities go to the rule listed first
+    priority: int = 0
+
+
+class RuleSet:
+    # every rule compiled into one Aho-Corasick automaton, so a description
+    # is scanned once however many rules there are
+    def __init__(self, rules: List[Rule]):
+        self.rules = sorted(rules, key=lambda r: -r.priority)
+        self.version = get_rules_version(rules)
+
+        self.transitions: List[Dict[str, int]] = [{}]
+        # rank of the best rule ending at each state, lower ranks win
+        self.best: List[int | None] = [None]
+
+        for rank, rule in enumerate(self.rules):
+            state = 0
+            for character in rule.match.lower():
+                next_state = self.transitions[state].get(character, None)
+                if next_state is None:
+                    next_state = len(self.transitions)
+                    self.transitions.append({})
+                    self.best.append(None)
+                    self.transitions[state][character] = next_state
+                state = next_state
+            if self.best[state] is None:
+                self.best[state] = rank
+
+        self.fail = [0] * len(self.transitions)
+        self.link_failures()
+
+    def link_failures(self):
+        queue = deque(self.transitions[0].values())
+        while len(queue) > 0:
+            state = queue.popleft()
+            for character, next_state in self.transitions[state].items():
+                fallback = self.fail[state]
+                while fallback != 0 and character not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.transitions[fallback].get(character, 0)
+
+                # a state also matches every rule its failure link matches
+                inherited = self.best[self.fail[next_state]]
+                if inherited is not None and (
+                    self.best[next_state] is None or inherited < self.best[next_state]
+                ):
+                    self.best[next_state] = inherited
+                queue.append(next_state)
+
+    def match(self, text: str):
+        transitions = self.transitions
+        fail = self.fail
+        best = None
+        state = 0
+        for character in text.lower():
+            while state != 0 and character not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(character, 0)
+            rank = self.best[state]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+        return None if best is None else self.rules[best]
+
+
+def get_rules_version(rules: List[Rule]):
+    text = json.dumps([asdict(r) for r in rules], sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def parse_rules(data: dict):
+    return [Rule(**rule) for rule in data["rules"]]
+
+
+@lru_cache(maxsize=None)
+def get_rule_set():
+    return RuleSet(parse_rules(get_json(RULES_FILENAME)))
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from typing import Callable, List
+
+from lib.Document import Document
+from lib.MonthRange import MonthRange
+from lib.transaction import Transaction
+
+
+@dataclass
+class Source:
+    key: str
+    suffix: str
+    get_month_range: Callable[[Document], MonthRange]
+    get_data: Callable[[Document, MonthRange], List[Transaction]]
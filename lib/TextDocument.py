@@ -0,0 +1,25 @@
+from typing import List
+
+
+class TextDocument:
+    # same interface as lib.Document for page text that is already extracted
+    def __init__(self, pages: List[str]):
+        self.pages = pages
+
+    def decrypt(self, password: str):
+        pass
+
+    def decrypt_with_key(self, password_key: str):
+        pass
+
+    def page_count(self):
+        return len(self.pages)
+
+    def get_pages(self):
+        return self.pages
+
+    def get_page_text(self, index: int):
+        return self.pages[index]
+
+    def close(self):
+        pass
@@ -1,42 +1,43 @@
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
 
+from lib.TransactionTable import TransactionTable
 from lib.categorise import (
     INCOME_CATEGORIES,
     EXPENSE_CATEGORIES,
     TRANSFER_CATEGORIES,
     Category,
-    categorise_transaction,
-    category_signed_transaction_sum,
     print_based_on_category,
 )
-from lib.strings import float_to_money_str, pad_string
-from lib.transaction import AMNT_WIDTH, DATE_WIDTH, Transaction, sum_transactions
+from lib.strings import cents_to_money_str, pad_string
+from lib.transaction import AMNT_WIDTH, DATE_WIDTH
 
+MONTH_WIDTH = 12
 
-def format_text_value_header(text: str, value: float):
+
+def format_text_value_header(text: str, value: int):
     remaining_width = DATE_WIDTH + AMNT_WIDTH - len(text)
-    value_string = pad_string(float_to_money_str(value), remaining_width)
+    value_string = pad_string(cents_to_money_str(value), remaining_width)
     return text + value_string
 
 
+def format_month_columns(text: str, values: List[int]):
+    columns = "".join(pad_string(cents_to_money_str(v), MONTH_WIDTH) for v in values)
+    return format_text_value_header(text, sum(values)) + columns
+
+
 @dataclass
 class TransactionGroups:
-    dict: Dict[Category, List[Transaction]]
+    table: TransactionTable
+    dict: Dict[Category, TransactionTable]
+    # labelled tables for each month, when the summary covers several
+    months: List[Tuple[str, TransactionTable]] = field(default_factory=list)
 
     def compute_totals(self):
-        totals: Dict[Category, float] = {}
-        for category in self.dict.keys():
-            total = sum_transactions(self.dict[category])
-            totals[category] = total
-        return totals
+        return self.table.category_totals()
 
     def print_category_type(self, name: str, categories: List[Category]):
-        all_transactions: List[Transaction] = []
-        for category in categories:
-            all_transactions += self.dict.get(category, [])
-
-        value = category_signed_transaction_sum(all_transactions)
+        value = self.table.in_categories(categories).signed_total()
         title = format_text_value_header(name, value)
         print_based_on_category(categories[0], title)
         for category in categories:
@@ -47,7 +48,7 @@ class TransactionGroups:
         if transactions is None:
             return
 
-        value = sum_transactions(transactions)
+        value = transactions.total()
         transaction_header = format_text_value_header(f"{category.value}", value)
         print_based_on_category(category, transaction_header)
 
@@ -55,19 +56,35 @@ class TransactionGroups:
             print(t.pretty_string())
         print()
 
+    def print_monthly_type(self, name: str, categories: List[Category]):
+        values = [t.in_categories(categories).signed_total() for _, t in self.months]
+        print_based_on_category(categories[0], format_month_columns(name, values))
+
+        for category in categories:
+            values = [t.category_totals().get(category, 0) for _, t in self.months]
+            print_based_on_category(
+                category, format_month_columns(f"  {category.value}", values)
+            )
+        print()
+
+    def print_monthly_columns(self):
+        labels = "".join(pad_string(label, MONTH_WIDTH) for label, _ in self.months)
+        print(pad_string("Total", DATE_WIDTH + AMNT_WIDTH) + labels)
+        self.print_monthly_type("Income", INCOME_CATEGORIES)
+        self.print_monthly_type("Expenses", EXPENSE_CATEGORIES)
+        self.print_monthly_type("Transfers", TRANSFER_CATEGORIES)
+
     def print_comprehensive_summary(self):
         self.print_category_type("Income", INCOME_CATEGORIES)
         self.print_category_type("Expenses", EXPENSE_CATEGORIES)
         self.print_category_type("Transfers", TRANSFER_CATEGORIES)
+        if len(self.months) > 1:
+            self.print_monthly_columns()
 
 
-def parse_transaction_groups(transactions: List[Transaction]):
-    dict: Dict[Category, List[Transaction]] = {}
-
-    for transaction in transactions:
-        category = categorise_transaction(transaction)
-        arr = dict.get(category, [])
-        arr.append(transaction)
-        dict[category] = arr
-
-    return TransactionGroups(dict=dict)
+def parse_transaction_groups(
+    table: TransactionTable, months: List[Tuple[str, TransactionTable]] | None = None
+):
+    return TransactionGroups(
+        table=table, dict=table.group_by_category(), months=months or []
+    )
@@ -0,0 +1,242 @@
+from array import array
+from datetime import datetime
+from itertools import compress
+import os
+from typing import Dict, Iterable, List, Sequence
+
+from lib.categorise import (
+    Category,
+    categorise_transaction,
+    get_category_sign,
+    get_rules_version,
+    has_current_categories,
+)
+from lib.dates import EPOCH, from_seconds, to_seconds
+from lib.sidecar import Columns, read_sidecar
+from lib.transaction import (
+    TYPE_VALUES,
+    Transaction,
+    TransactionType,
+    parse_csv_amount,
+    parse_timestamp,
+)
+
+TYPES = list(TransactionType)
+TYPE_CODES = {type: code for code, type in enumerate(TYPES)}
+
+CATEGORIES = list(Category)
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+
+
+def csv_has_current_categories(csv_filepath: str):
+    if not os.path.isfile(csv_filepath):
+        return False
+    with open(csv_filepath, "r") as f:
+        return has_current_categories(next(f, "").rstrip("\n").split(","))
+
+
+class TransactionTable:
+    # one typed array per field instead of one object per transaction, so
+    # totals over years of statements are tight loops over machine integers
+    def __init__(
+        self,
+        descriptions: List[str] | None = None,
+        description_codes: Dict[str, int] | None = None,
+    ):
+        self.dates = array("q")
+        self.amounts = array("q")
+        self.types = array("B")
+        self.categories = array("B")
+        self.description_indices = array("l")
+
+        # the description pool is shared with tables filtered from this one
+        self.descriptions: List[str] = [] if descriptions is None else descriptions
+        self.description_codes: Dict[str, int] = (
+            {} if description_codes is None else description_codes
+        )
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Transaction]):
+        table = cls()
+        for transaction in transactions:
+            table.append(transaction)
+        return table
+
+    @classmethod
+    def from_columns(cls, columns: Columns):
+        table = cls(list(columns.descriptions), dict(columns.description_codes))
+        table.dates = array("q", columns.dates)
+        table.amounts = array("q", columns.amounts)
+        table.description_indices = array("l", columns.description_indices)
+
+        type_codes = [TYPE_CODES[TYPE_VALUES[v]] for v in columns.type_values]
+        table.types = array("B", [type_codes[code] for code in columns.types])
+
+        if columns.rules_version == get_rules_version():
+            category_codes = [
+                CATEGORY_CODES[Category(v)] for v in columns.category_values
+            ]
+            table.categories = array(
+                "B", [category_codes[code] for code in columns.categories]
+            )
+            return table
+
+        # each description and type pair is only categorised once
+        categories: Dict[tuple, int] = {}
+        for type_code, index in zip(table.types, table.description_indices):
+            key = (type_code, index)
+            if key not in categories:
+                transaction = Transaction(
+                    EPOCH, 0, TYPES[type_code], table.descriptions[index]
+                )
+                categories[key] = CATEGORY_CODES[categorise_transaction(transaction)]
+            table.categories.append(categories[key])
+        return table
+
+    @classmethod
+    def from_csv(cls, csv_filepath: str):
+        columns = read_sidecar(csv_filepath)
+        if columns is not None:
+            return cls.from_columns(columns)
+
+        table = cls()
+        # dates, descriptions and categories repeat, so each is worked out once
+        seconds: Dict[str, int] = {}
+        rows: Dict[tuple, tuple] = {}
+
+        with open(csv_filepath, "r") as f:
+            header = next(f, "").rstrip("\n").split(",")
+            # categories written under other rules are worked out again
+            stored = has_current_categories(header)
+            for line in f:
+                sections = line.rstrip("\n").split(",")
+                date, description, amount, type = sections[:4]
+
+                date_seconds = seconds.get(date, None)
+                if date_seconds is None:
+                    date_seconds = to_seconds(parse_timestamp(date))
+                    seconds[date] = date_seconds
+
+                key = (description, type, sections[4] if stored else None)
+                codes = rows.get(key, None)
+                if codes is None:
+                    transaction_type = TYPE_VALUES[type]
+                    if stored:
+                        category = Category(sections[4])
+                    else:
+                        category = categorise_transaction(
+                            Transaction(EPOCH, 0, transaction_type, description)
+                        )
+                    codes = (
+                        TYPE_CODES[transaction_type],
+                        CATEGORY_CODES[category],
+                        table.intern(description),
+                    )
+                    rows[key] = codes
+
+                table.dates.append(date_seconds)
+                table.amounts.append(parse_csv_amount(amount))
+                table.types.append(codes[0])
+                table.categories.append(codes[1])
+                table.description_indices.append(codes[2])
+        return table
+
+    def intern(self, description: str):
+        index = self.description_codes.get(description, None)
+        if index is None:
+            index = len(self.descriptions)
+            self.descriptions.append(description)
+            self.description_codes[description] = index
+        return index
+
+    def append(self, transaction: Transaction, category: Category | None = None):
+        if category is None:
+            category = categorise_transaction(transaction)
+
+        self.dates.append(to_seconds(transaction.date))
+        self.amounts.append(transaction.amount)
+        self.types.append(TYPE_CODES[transaction.type])
+        self.categories.append(CATEGORY_CODES[category])
+        self.description_indices.append(self.intern(transaction.description))
+
+    def extend(self, other: "TransactionTable"):
+        # other may have its own description pool, so indices are remapped
+        codes: Dict[int, int] = {}
+        for index in other.description_indices:
+            if index not in codes:
+                codes[index] = self.intern(other.descriptions[index])
+
+        self.dates.extend(other.dates)
+        self.amounts.extend(other.amounts)
+        self.types.extend(other.types)
+        self.categories.extend(other.categories)
+        self.description_indices.extend(codes[i] for i in other.description_indices)
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def row(self, index: int):
+        return Transaction(
+            from_seconds(self.dates[index]),
+            self.amounts[index],
+            TYPES[self.types[index]],
+            self.descriptions[self.description_indices[index]],
+        )
+
+    def category(self, index: int):
+        return CATEGORIES[self.categories[index]]
+
+    def filter(self, mask: Sequence[bool]):
+        table = TransactionTable(self.descriptions, self.description_codes)
+        table.dates = array("q", compress(self.dates, mask))
+        table.amounts = array("q", compress(self.amounts, mask))
+        table.types = array("B", compress(self.types, mask))
+        table.categories = array("B", compress(self.categories, mask))
+        table.description_indices = array("l", compress(self.description_indices, mask))
+        return table
+
+    def in_categories(self, categories: Iterable[Category]):
+        codes = {CATEGORY_CODES[c] for c in categories}
+        return self.filter([code in codes for code in self.categories])
+
+    def between(self, start: datetime, end: datetime):
+        low = to_seconds(start)
+        high = to_seconds(end)
+        return self.filter([low <= date <= high for date in self.dates])
+
+    def take(self, indices: Sequence[int]):
+        table = TransactionTable(self.descriptions, self.description_codes)
+        table.dates = array("q", [self.dates[i] for i in indices])
+        table.amounts = array("q", [self.amounts[i] for i in indices])
+        table.types = array("B", [self.types[i] for i in indices])
+        table.categories = array("B", [self.categories[i] for i in indices])
+        table.description_indices = array(
+            "l", [self.description_indices[i] for i in indices]
+        )
+        return table
+
+    def group_by_category(self):
+        indices: Dict[int, List[int]] = {}
+        for i, code in enumerate(self.categories):
+            indices.setdefault(code, []).append(i)
+        return {CATEGORIES[code]: self.take(rows) for code, rows in indices.items()}
+
+    def total(self):
+        return sum(self.amounts)
+
+    def category_totals(self):
+        # categories appear in the order they are first seen
+        cents: Dict[int, int] = {}
+        for code, amount in zip(self.categories, self.amounts):
+            cents[code] = cents.get(code, 0) + amount
+        return {CATEGORIES[code]: total for code, total in cents.items()}
+
+    def signed_total(self):
+        signs = [get_category_sign(category) for category in CATEGORIES]
+        return sum(
+            signs[code] * amount for code, amount in zip(self.categories, self.amounts)
+        )
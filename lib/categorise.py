@@ -1,6 +1,7 @@
 from enum import Enum
 from typing import List
 
+from lib.RuleSet import get_rule_set
 from lib.printing import blue_print, error_print, valid_print
 from lib.transaction import Transaction, TransactionType
 
@@ -48,22 +49,13 @@ def category_is_transfer(category: Category):
     return category in TRANSFER_CATEGORIES
 
 
-def category_signed_transaction_sum(transactions: List[Transaction]):
-    total = 0
-    for t in transactions:
-        category = categorise_transaction(t)
-
-        if category_is_earning(category):
-            total += t.amount
-        if category_is_expense(category):
-            total -= t.amount
-        if category == Category.TransferIn:
-            total += t.amount
-        if category == Category.TransferOut:
-            total -= t.amount
-        if category == Category.Investments:
-            total += 0  # ignore
-    return total
+def get_category_sign(category: Category):
+    if category_is_earning(category) or category == Category.TransferIn:
+        return 1
+    if category_is_expense(category) or category == Category.TransferOut:
+        return -1
+    # investments are ignored
+    return 0
 
 
 def print_based_on_category(category: Category, text: str):
@@ -92,24 +84,26 @@ def get_category_from_type(type: TransactionType):
 
 
 def get_category_from_description(desc: str):
-    lowered = desc.lower()
+    rule = get_rule_set().match(desc)
+    if rule is None:
+        return None
+    return Category(rule.category)
 
-    if "myki" in lowered:
-        return Category.Transport
 
-    if "art mem vol" in lowered:
-        return Category.Investments
+CATEGORY_COLUMN = "Category"
 
-    if "agl" in lowered or "*amaysimmobi" in lowered:
-        return Category.Utilities
 
-    if "coles" in lowered or "woolworths" in lowered or "aldi" in lowered:
-        return Category.Groceries
+def get_rules_version():
+    return get_rule_set().version
 
-    if "metro petroleum" in lowered:
-        return Category.Transport
 
-    return None
+def get_category_column():
+    # the header names the rules, so stale categories are never trusted
+    return f"{CATEGORY_COLUMN} {get_rules_version()}"
+
+
+def has_current_categories(header: List[str]):
+    return len(header) > 4 and header[4] == get_category_column()
 
 
 def categorise_transaction(transaction: Transaction):
@@ -1,5 +1,7 @@
 from datetime import datetime, timedelta
 
+EPOCH = datetime(1970, 1, 1)
+
 
 def format_date(month_str: str, year_str: str):
     month = get_month_value(month_str)
@@ -37,3 +39,11 @@ def get_month_abbreviation(value: int):
 def get_last_date_in_month(month: int, year: int):
     month_following = datetime(year, month, 28) + timedelta(days=4)
     return month_following.replace(day=1) - timedelta(days=1)
+
+
+def to_seconds(date: datetime):
+    return int((date - EPOCH).total_seconds())
+
+
+def from_seconds(seconds: int):
+    return EPOCH + timedelta(seconds=seconds)
@@ -1,15 +1,23 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 import csv
 from dataclasses import dataclass
+from functools import partial
+import io
 import json
 import logging
 import os
 import sys
-from typing import Any, Callable, List, Tuple
+from typing import Any, Callable, Iterable, List, Tuple
 
-from pypdf import PdfReader
-
-from lib.MonthRange import MonthRange, get_month_range_from_filename
+from lib.Document import Document
+from lib.fixtures import write_fixture
+from lib.Manifest import Manifest, get_parser_version
+from lib.MonthRange import MonthRange
 from lib.printing import error_print, valid_print
+from lib.sidecar import Columns, get_sidecar_path, write_sidecar
+from lib.TransactionTable import TransactionTable
+from lib.categorise import get_category_column, get_rules_version
 from lib.transaction import Transaction
 
 logger = logging.getLogger("pypdf")
@@ -21,14 +29,41 @@ class FileParsingArgs:
     force: bool
     log: bool
     quick: bool
+    workers: int
+    cache: bool
+    capture: bool = False
+
+
+def parse_worker_count(all_args: List[str], default: int):
+    for arg in all_args:
+        if arg.startswith("j") and arg[1:].isdigit():
+            return max(int(arg[1:]), 1)
+    return default
+
+
+MANAGE_FLAGS = ["f", "l", "q", "n", "c"]
 
 
-def parse_manage_args(argv: List[str]):
+def is_manage_flag(arg: str):
+    return arg in MANAGE_FLAGS or (arg.startswith("j") and arg[1:].isdigit())
+
+
+def parse_manage_args(argv: List[str], default_workers: int = 1):
     all_args = argv[1:]
     force = "f" in all_args
     log = "l" in all_args
     quick = "q" in all_args
-    return FileParsingArgs(force=force, log=log, quick=quick)
+    workers = parse_worker_count(all_args, default_workers)
+    cache = "n" not in all_args
+    capture = "c" in all_args
+    return FileParsingArgs(
+        force=force,
+        log=log,
+        quick=quick,
+        workers=workers,
+        cache=cache,
+        capture=capture,
+    )
 
 
 def get_filenames(path: str):
@@ -36,71 +71,251 @@ def get_filenames(path: str):
     return [f for f in all_items if os.path.isfile(os.path.join(path, f))]
 
 
-def export_to_csv(output_path: str, name: str, data: List[List[Any]]):
+def write_rows(csv_path: str, rows: Iterable[List[Any]]):
+    count = 0
+    with open(csv_path, mode="w", newline="") as file:
+        writer = csv.writer(file)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_csv(csv_path: str, data: Iterable[List[Any]]):
+    temporary_path = csv_path + ".tmp"
+
+    # rows may be produced lazily, a failure part way leaves the old csv intact
+    try:
+        count = write_rows(temporary_path, data)
+    except BaseException:
+        if os.path.isfile(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+    os.replace(temporary_path, csv_path)
+    return count
+
+
+def export_to_csv(output_path: str, name: str, data: Iterable[List[Any]]):
     csv_path = os.path.join(output_path, name)
+    replaced = os.path.isfile(csv_path)
+    count = write_csv(csv_path, data)
+    if replaced:
+        error_print(f"{name} deleted")
+    return count
 
-    if os.path.isfile(csv_path):
+
+def transactions_to_rows(transactions: Iterable[Transaction], log: bool = False):
+    yield ["Date", "Description", "Amount", "Type"]
+    for transaction in transactions:
+        if log:
+            print(transaction)
+        yield transaction.to_data()
+
+
+def write_transactions(csv_path: str, transactions: Iterable[Transaction]):
+    columns = Columns()
+    rows = transactions_to_rows(columns.collect(transactions))
+    count = write_csv(csv_path, rows) - 1
+    # written after the csv, so it only counts as fresh once both exist
+    write_sidecar(get_sidecar_path(csv_path), columns)
+    return count
+
+
+def table_to_rows(transactions: Iterable[Transaction], category_values: List[str]):
+    yield ["Date", "Description", "Amount", "Type", get_category_column()]
+    for transaction, category in zip(transactions, category_values):
+        yield transaction.to_data() + [category]
+
+
+def write_table(csv_path: str, table: TransactionTable):
+    # categories are decided once here, readers take them from the file
+    category_values = [table.category(i).value for i in range(len(table))]
+    columns = Columns(get_rules_version())
+    transactions = columns.collect(table, category_values)
+    count = write_csv(csv_path, table_to_rows(transactions, category_values)) - 1
+    write_sidecar(get_sidecar_path(csv_path), columns)
+    return count
+
+
+def table_to_csv(output_path: str, name: str, table: TransactionTable):
+    csv_path = os.path.join(output_path, name)
+    replaced = os.path.isfile(csv_path)
+    count = write_table(csv_path, table)
+
+    if replaced:
         error_print(f"{name} deleted")
-        os.remove(csv_path)
+    valid_print(f"{name} written, {count} transactions")
 
-    with open(csv_path, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerows(data)
 
+def transactions_to_csv(
+    output_path: str, name: str, transactions: Iterable[Transaction]
+):
+    csv_path = os.path.join(output_path, name)
+    replaced = os.path.isfile(csv_path)
+    count = write_transactions(csv_path, transactions)
 
-def transactions_to_csv(output_path: str, name: str, transactions: List[Transaction]):
-    data = [["Date", "Description", "Amount", "Type"]]
-    for transaction in transactions:
-        data.append(transaction.to_data())
+    if replaced:
+        error_print(f"{name} deleted")
+    valid_print(f"{name} written, {count} transactions")
 
-    export_to_csv(output_path, name, data)
 
-    valid_print(f"{name} written, {len(transactions)} transactions")
+def get_layout_page_data(document: Document):
+    return document.get_pages()
 
 
-def get_layout_page_data(reader: PdfReader):
-    return [page.extract_text(extraction_mode="layout") for page in reader.pages]
+@dataclass
+class FileResult:
+    filename: str
+    month_range: MonthRange
+    transaction_count: int | None
+    content_hash: str
+    output: str = ""
+    pages: List[str] | None = None
+    pending_csv: str | None = None
 
 
-def manage_files(
-    suffix: str,
-    get_month_range: Callable[[PdfReader], MonthRange],
-    get_data: Callable[[PdfReader, MonthRange], List[Transaction]],
+def get_pending_csv_path(input_path: str, filename: str):
+    return os.path.join(input_path, filename + ".csv.tmp")
+
+
+def get_pending_sidecar_path(pending_csv: str):
+    return pending_csv + ".bin"
+
+
+def parse_file(
+    input_path: str,
+    args: FileParsingArgs,
+    get_month_range: Callable[[Document], MonthRange],
+    get_data: Callable[[Document, MonthRange], Iterable[Transaction]],
+    filename: str,
 ):
-    args = parse_manage_args(sys.argv)
+    document = Document(os.path.join(input_path, filename), use_cache=args.cache)
+    try:
+        month_range = get_month_range(document)
 
-    input_path = suffix + "/raw"
-    output_path = suffix
+        if args.quick and month_range.to_filename() + ".pdf" == filename:
+            return FileResult(filename, month_range, None, document.content_hash)
+
+        # transactions are written as they are parsed, the parent moves the
+        # finished csv into place once the statement has validated
+        pending_csv = get_pending_csv_path(input_path, filename)
+        pending_sidecar = get_pending_sidecar_path(pending_csv)
+        columns = Columns()
+        transactions = columns.collect(get_data(document, month_range))
+        rows = transactions_to_rows(transactions, args.log)
+        try:
+            count = write_rows(pending_csv, rows) - 1
+            write_sidecar(pending_sidecar, columns)
+        except BaseException:
+            for path in [pending_csv, pending_sidecar]:
+                if os.path.isfile(path):
+                    os.remove(path)
+            raise
+
+        result = FileResult(filename, month_range, count, document.content_hash)
+        result.pending_csv = pending_csv
+        if args.capture:
+            result.pages = list(document.get_pages())
+        return result
+    finally:
+        document.close()
+
+
+def parse_file_captured(*args):
+    # worker output is replayed by the parent so files print in a stable order
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        result = parse_file(*args)
+    result.output = buffer.getvalue()
+    return result
+
+
+def handle_result(manifest: Manifest, result: FileResult, parser_version: str):
+    print(result.output, end="")
+
+    output_name = result.month_range.to_filename()
+    pdf_name = output_name + ".pdf"
+    csv_name = output_name + ".csv"
+
+    if result.transaction_count is None:
+        print(f"{output_name} skipped")
+        # the csv predates the manifest, so the parser that wrote it is unknown
+        if os.path.isfile(os.path.join(manifest.output_path, csv_name)):
+            manifest.record(pdf_name, result.content_hash, result.month_range, None)
+            manifest.save()
+        return
 
-    filenames = get_filenames(input_path)
+    file_path = os.path.join(manifest.input_path, result.filename)
+    os.rename(file_path, os.path.join(manifest.input_path, pdf_name))
 
+    csv_path = os.path.join(manifest.output_path, csv_name)
+    if os.path.isfile(csv_path):
+        error_print(f"{csv_name} deleted")
+    os.replace(result.pending_csv, csv_path)
+    sidecar_path = get_sidecar_path(csv_path)
+    os.makedirs(os.path.dirname(sidecar_path), exist_ok=True)
+    os.replace(get_pending_sidecar_path(result.pending_csv), sidecar_path)
+    valid_print(f"{csv_name} written, {result.transaction_count} transactions")
+    if result.pages is not None:
+        write_fixture(
+            manifest.output_path, output_name, result.month_range, result.pages
+        )
+        print(f"{output_name} fixture captured")
+
+    manifest.entries.pop(result.filename, None)
+    manifest.record(pdf_name, result.content_hash, result.month_range, parser_version)
+    manifest.save()
+    print()
+
+
+def is_pdf(filename: str):
+    return filename.lower().endswith(".pdf")
+
+
+def get_pending_filenames(
+    manifest: Manifest, args: FileParsingArgs, parser_version: str
+):
+    # quick mode trusts existing outputs even if the parser has since changed
+    required_version = None if args.quick else parser_version
+
+    filenames = sorted(filter(is_pdf, get_filenames(manifest.input_path)))
+    manifest.prune(filenames)
+
+    pending: List[str] = []
     for filename in filenames:
-        if not args.force and not args.quick and filename_is_already_range(filename):
+        if not args.force and manifest.is_current(filename, required_version):
             print(f"{filename} skipped")
             continue
+        pending.append(filename)
+    return pending
 
-        file_path = os.path.join(input_path, filename)
-        reader = PdfReader(file_path)
-        month_range = get_month_range(reader)
-        reader.close()
 
-        output_name = month_range.to_filename()
-        pdf_name = output_name + ".pdf"
-
-        if args.quick and pdf_name == filename:
-            print(f"{output_name} skipped")
-            continue
-        reader = PdfReader(file_path)
-        transactions = get_data(reader, month_range)
+def manage_files(
+    suffix: str,
+    get_month_range: Callable[[Document], MonthRange],
+    get_data: Callable[[Document, MonthRange], Iterable[Transaction]],
+):
+    args = parse_manage_args(sys.argv)
 
-        if args.log:
-            for transaction in transactions:
-                print(transaction)
+    input_path = suffix + "/raw"
+    output_path = suffix
 
-        os.rename(file_path, os.path.join(input_path, pdf_name))
-        transactions_to_csv(output_path, output_name + ".csv", transactions)
-        print()
+    manifest = Manifest(input_path, output_path)
+    parser_version = get_parser_version(get_data.__module__)
+    pending = get_pending_filenames(manifest, args, parser_version)
 
+    if args.workers == 1 or len(pending) <= 1:
+        for filename in pending:
+            result = parse_file(input_path, args, get_month_range, get_data, filename)
+            handle_result(manifest, result, parser_version)
+        manifest.save()
+        return
 
-def filename_is_already_range(filename: str):
-    return get_month_range_from_filename(filename) is not None
+    parse_captured = partial(
+        parse_file_captured, input_path, args, get_month_range, get_data
+    )
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for result in executor.map(parse_captured, pending):
+            handle_result(manifest, result, parser_version)
+    manifest.save()
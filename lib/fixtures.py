@@ -0,0 +1,46 @@
+from datetime import datetime
+import json
+import os
+from typing import List
+
+from lib.MonthRange import MonthRange
+
+FIXTURE_DIRECTORY = "fixtures"
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def get_fixture_path(output_path: str):
+    return os.path.join(output_path, FIXTURE_DIRECTORY)
+
+
+def get_fixture_names(output_path: str):
+    fixture_path = get_fixture_path(output_path)
+    if not os.path.isdir(fixture_path):
+        return []
+    return sorted(f for f in os.listdir(fixture_path) if f.endswith(".json"))
+
+
+def write_fixture(
+    output_path: str, name: str, month_range: MonthRange, pages: List[str]
+):
+    fixture_path = get_fixture_path(output_path)
+    os.makedirs(fixture_path, exist_ok=True)
+
+    data = {
+        "start": month_range.start.strftime(DATE_FORMAT),
+        "end": month_range.end.strftime(DATE_FORMAT),
+        "pages": pages,
+    }
+    with open(os.path.join(fixture_path, name + ".json"), "w") as file:
+        json.dump(data, file, indent=2)
+
+
+def read_fixture(output_path: str, filename: str):
+    with open(os.path.join(get_fixture_path(output_path), filename)) as file:
+        data = json.load(file)
+
+    month_range = MonthRange(
+        datetime.strptime(data["start"], DATE_FORMAT),
+        datetime.strptime(data["end"], DATE_FORMAT),
+    )
+    return month_range, data["pages"]
@@ -1,2 +0,0 @@
-def float_close(f1, f2):
-    return abs(f1 - f2) < 1e-6
@@ -1,7 +1,10 @@
+from functools import lru_cache
 import json
 import os
 
 
+# loaded once per process, callers must not mutate the result
+@lru_cache(maxsize=None)
 def get_json(filename: str):
     current_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -0,0 +1,154 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+import io
+import os
+import time
+import traceback
+from typing import Dict, List
+
+from lib.Manifest import Manifest, get_parser_version
+from lib.files import (
+    FileParsingArgs,
+    FileResult,
+    get_pending_filenames,
+    handle_result,
+    parse_file,
+)
+from lib.printing import blue_print, error_print, valid_print
+from lib.registry import Provider
+
+
+@dataclass
+class Job:
+    provider: Provider
+    filename: str
+    size: int
+
+
+@dataclass
+class JobResult:
+    job: Job
+    result: FileResult | None
+    error: str | None
+    output: str
+    # cpu time spent parsing in the worker, queueing behind other jobs excluded
+    seconds: float
+
+
+@dataclass
+class SourceSummary:
+    files: int = 0
+    transactions: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+
+
+def get_input_path(provider: Provider):
+    return provider.suffix + "/raw"
+
+
+def run_job(args: FileParsingArgs, job: Job):
+    start = time.process_time()
+    buffer = io.StringIO()
+    result = None
+    error = None
+    with redirect_stdout(buffer):
+        try:
+            source = job.provider.load()
+            result = parse_file(
+                get_input_path(job.provider),
+                args,
+                source.get_month_range,
+                source.get_data,
+                job.filename,
+            )
+        except Exception:
+            error = traceback.format_exc()
+
+    seconds = time.process_time() - start
+    return JobResult(job, result, error, buffer.getvalue(), seconds)
+
+
+def collect_jobs(providers: List[Provider], args: FileParsingArgs):
+    manifests: Dict[str, Manifest] = {}
+    parser_versions: Dict[str, str] = {}
+    jobs: List[Job] = []
+
+    for provider in providers:
+        input_path = get_input_path(provider)
+        manifest = Manifest(input_path, provider.suffix)
+        parser_version = get_parser_version(provider.module_name)
+
+        blue_print(provider.key)
+        for filename in get_pending_filenames(manifest, args, parser_version):
+            size = os.path.getsize(os.path.join(input_path, filename))
+            jobs.append(Job(provider, filename, size))
+
+        manifests[provider.key] = manifest
+        parser_versions[provider.key] = parser_version
+
+    # the largest statements go first so they do not end up as stragglers
+    jobs.sort(key=lambda job: job.size, reverse=True)
+    return jobs, manifests, parser_versions
+
+
+def print_summary(summaries: Dict[str, SourceSummary], seconds: float):
+    print()
+    blue_print("SUMMARY")
+    for key in summaries.keys():
+        summary = summaries[key]
+        text = (
+            f"{key}: {summary.files} files, {summary.transactions} transactions, "
+            f"{summary.failures} failures, {summary.seconds:.2f}s CPU time"
+        )
+        if summary.failures > 0:
+            error_print(text)
+        else:
+            valid_print(text)
+
+    total_files = sum(s.files for s in summaries.values())
+    total_failures = sum(s.failures for s in summaries.values())
+    text = f"Total: {total_files} files, {total_failures} failures in {seconds:.2f}s"
+    if total_failures > 0:
+        error_print(text)
+    else:
+        valid_print(text)
+
+
+def orchestrate(providers: List[Provider], args: FileParsingArgs):
+    start = time.perf_counter()
+    jobs, manifests, parser_versions = collect_jobs(providers, args)
+    summaries = {provider.key: SourceSummary() for provider in providers}
+
+    def handle_job_result(job_result: JobResult):
+        job = job_result.job
+        key = job.provider.key
+        summary = summaries[key]
+        summary.seconds += job_result.seconds
+
+        print()
+        blue_print(f"{key}: {job.filename}")
+        print(job_result.output, end="")
+
+        if job_result.error is not None:
+            summary.failures += 1
+            error_print(job_result.error)
+            return
+
+        result = job_result.result
+        handle_result(manifests[key], result, parser_versions[key])
+        if result.transaction_count is not None:
+            summary.files += 1
+            summary.transactions += result.transaction_count
+
+    if args.workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            handle_job_result(run_job(args, job))
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = [executor.submit(run_job, args, job) for job in jobs]
+            for future in as_completed(futures):
+                handle_job_result(future.result())
+
+    print_summary(summaries, time.perf_counter() - start)
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Tuple
+
+CACHE_PATH = os.path.join("data", ".page_cache")
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def hash_file(file_path: str):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_entry_path(content_hash: str, mode: str):
+    return os.path.join(CACHE_PATH, f"{content_hash}-{mode}.json")
+
+
+def get_entry_paths():
+    if not os.path.isdir(CACHE_PATH):
+        return []
+    names = [n for n in os.listdir(CACHE_PATH) if n.endswith(".json")]
+    return [os.path.join(CACHE_PATH, n) for n in names]
+
+
+def read_entry(content_hash: str, mode: str):
+    path = get_entry_path(content_hash, mode)
+    try:
+        with open(path) as file:
+            entry = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    # reads refresh the mtime so eviction drops the least recently used,
+    # another process may have evicted the entry since it was read
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    pages = {int(k): v for k, v in entry["pages"].items()}
+    return entry["page_count"], pages
+
+
+def write_entry(content_hash: str, mode: str, page_count: int, pages: Dict[int, str]):
+    os.makedirs(CACHE_PATH, exist_ok=True)
+    path = get_entry_path(content_hash, mode)
+    # per process, so concurrent workers never write the same temporary file
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(temporary_path, "w") as file:
+        json.dump({"page_count": page_count, "pages": pages}, file)
+    os.replace(temporary_path, path)
+
+    evict(MAX_CACHE_BYTES)
+
+
+def get_entry_stats():
+    # entries another process evicts while this one lists them are skipped
+    stats: List[Tuple[str, os.stat_result]] = []
+    for path in get_entry_paths():
+        try:
+            stats.append((path, os.stat(path)))
+        except FileNotFoundError:
+            continue
+    return stats
+
+
+def get_cache_size():
+    return sum(stat.st_size for _, stat in get_entry_stats())
+
+
+def evict(max_bytes: int):
+    stats = sorted(get_entry_stats(), key=lambda entry: entry[1].st_mtime)
+    total = sum(stat.st_size for _, stat in stats)
+
+    removed = 0
+    for path, stat in stats:
+        if total <= max_bytes:
+            break
+        total -= stat.st_size
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        removed += 1
+    return removed
+
+
+def purge():
+    return evict(0)
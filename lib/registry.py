@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+import importlib
+from typing import List
+
+from lib.Source import Source
+from lib.json_config import get_json
+
+PROVIDER_PACKAGE = "providers"
+
+
+def get_module_name(key: str):
+    # "boq-everyday" and "boq-savings" are both parsed by providers/boq.py
+    return f"{PROVIDER_PACKAGE}.{key.split('-')[0]}"
+
+
+@dataclass
+class Provider:
+    key: str
+    suffix: str
+    module_name: str
+
+    def load(self) -> Source:
+        module = importlib.import_module(self.module_name)
+        for source in module.SOURCES:
+            if source.key == self.key:
+                return source
+        raise Exception(f"{self.module_name} does not define {self.key}")
+
+
+def get_providers(names: List[str] | None = None):
+    suffixes: dict = get_json("suffixes.json")
+
+    providers: List[Provider] = []
+    for key in suffixes.keys():
+        module_name = get_module_name(key)
+        short_name = module_name.split(".")[-1]
+        if names and key not in names and short_name not in names:
+            continue
+        providers.append(Provider(key, suffixes[key], module_name))
+    return providers
+
+
+def get_provider_names():
+    suffixes: dict = get_json("suffixes.json")
+    names = set(suffixes.keys())
+    for key in suffixes.keys():
+        names.add(get_module_name(key).split(".")[-1])
+    return names
+
+
+def parse_provider_names(args: List[str]):
+    # a mistyped name would otherwise select every provider
+    known_names = get_provider_names()
+    unknown = [arg for arg in args if arg not in known_names]
+    if len(unknown) > 0:
+        raise Exception(
+            f"Unknown providers {', '.join(unknown)}, expected any of "
+            + ", ".join(sorted(known_names))
+        )
+    return args
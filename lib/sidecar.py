@@ -0,0 +1,229 @@
+from array import array
+from dataclasses import dataclass
+import os
+import struct
+import sys
+from typing import Dict, Iterable, List
+
+from lib.dates import from_seconds, to_seconds
+
+SIDECAR_DIRECTORY = "columns"
+SIDECAR_SUFFIX = ".bin"
+
+MAGIC = b"TXCL"
+VERSION = 2
+
+# magic, version, rows, strings, types, categories, first date, last date and
+# the version of the rules the categories came from, empty if there are none
+HEADER = struct.Struct("<4sBxxxIIIIqq16s")
+
+
+def get_sidecar_path(csv_path: str):
+    directory, name = os.path.split(csv_path)
+    return os.path.join(directory, SIDECAR_DIRECTORY, name + SIDECAR_SUFFIX)
+
+
+@dataclass
+class SidecarHeader:
+    row_count: int
+    string_count: int
+    type_count: int
+    category_count: int
+    first_date: int
+    last_date: int
+    rules_version: str
+
+
+class Columns:
+    # the fields of a transaction csv as written, one typed array per column,
+    # with descriptions, type and category values stored once in a string table
+    def __init__(self, rules_version: str | None = None):
+        self.dates = array("q")
+        self.amounts = array("q")
+        self.types = array("B")
+        self.description_indices = array("i")
+        # only filled when the csv carries categories
+        self.categories = array("B")
+        self.rules_version = rules_version
+
+        self.type_values: List[str] = []
+        self.category_values: List[str] = []
+        self.descriptions: List[str] = []
+        self.type_codes: Dict[str, int] = {}
+        self.category_codes: Dict[str, int] = {}
+        self.description_codes: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def append(
+        self,
+        date_seconds: int,
+        amount: int,
+        type_value: str,
+        description: str,
+        category_value: str | None = None,
+    ):
+        type_code = self.type_codes.get(type_value, None)
+        if type_code is None:
+            type_code = len(self.type_values)
+            self.type_values.append(type_value)
+            self.type_codes[type_value] = type_code
+
+        if category_value is not None:
+            category_code = self.category_codes.get(category_value, None)
+            if category_code is None:
+                category_code = len(self.category_values)
+                self.category_values.append(category_value)
+                self.category_codes[category_value] = category_code
+            self.categories.append(category_code)
+
+        index = self.description_codes.get(description, None)
+        if index is None:
+            index = len(self.descriptions)
+            self.descriptions.append(description)
+            self.description_codes[description] = index
+
+        self.dates.append(date_seconds)
+        self.amounts.append(amount)
+        self.types.append(type_code)
+        self.description_indices.append(index)
+
+    def collect(
+        self, transactions: Iterable, category_values: List[str] | None = None
+    ):
+        # passes transactions through, so the csv and sidecar share one stream
+        for i, transaction in enumerate(transactions):
+            self.append(
+                to_seconds(transaction.date),
+                transaction.amount,
+                transaction.type.value,
+                transaction.description.replace(",", " "),
+                None if category_values is None else category_values[i],
+            )
+            yield transaction
+
+    def rows(self):
+        dates: Dict[int, object] = {}
+        for i in range(len(self)):
+            seconds = self.dates[i]
+            date = dates.get(seconds, None)
+            if date is None:
+                date = from_seconds(seconds)
+                dates[seconds] = date
+            yield (
+                date,
+                self.amounts[i],
+                self.type_values[self.types[i]],
+                self.descriptions[self.description_indices[i]],
+            )
+
+
+def to_little_endian(values: array):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def write_sidecar(sidecar_path: str, columns: Columns):
+    directory = os.path.dirname(sidecar_path)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+
+    values = columns.type_values + columns.category_values + columns.descriptions
+    strings = [s.encode() for s in values]
+    lengths = array("I", [len(s) for s in strings])
+    first_date = min(columns.dates) if len(columns) > 0 else 0
+    last_date = max(columns.dates) if len(columns) > 0 else 0
+
+    temporary_path = sidecar_path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(columns),
+                len(strings),
+                len(columns.type_values),
+                len(columns.category_values),
+                first_date,
+                last_date,
+                (columns.rules_version or "").encode(),
+            )
+        )
+        to_little_endian(columns.dates).tofile(file)
+        to_little_endian(columns.amounts).tofile(file)
+        columns.types.tofile(file)
+        to_little_endian(columns.description_indices).tofile(file)
+        columns.categories.tofile(file)
+        to_little_endian(lengths).tofile(file)
+        file.write(b"".join(strings))
+    os.replace(temporary_path, sidecar_path)
+
+
+def read_header(file):
+    data = file.read(HEADER.size)
+    if len(data) != HEADER.size:
+        return None
+
+    magic, version, *fields, rules_version = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return SidecarHeader(*fields, rules_version.rstrip(b"\0").decode())
+
+
+def read_array(file, typecode: str, count: int):
+    values = array(typecode)
+    values.fromfile(file, count)
+    return to_little_endian(values)
+
+
+def is_fresh(csv_path: str, sidecar_path: str):
+    try:
+        return os.stat(sidecar_path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def read_sidecar(csv_path: str):
+    # None whenever the csv has to be parsed instead
+    sidecar_path = get_sidecar_path(csv_path)
+    if not is_fresh(csv_path, sidecar_path):
+        return None
+
+    try:
+        with open(sidecar_path, "rb") as file:
+            header = read_header(file)
+            if header is None:
+                return None
+
+            columns = Columns(header.rules_version or None)
+            columns.dates = read_array(file, "q", header.row_count)
+            columns.amounts = read_array(file, "q", header.row_count)
+            columns.types = read_array(file, "B", header.row_count)
+            columns.description_indices = read_array(file, "i", header.row_count)
+            if columns.rules_version is not None:
+                columns.categories = read_array(file, "B", header.row_count)
+            lengths = read_array(file, "I", header.string_count)
+            blob = file.read()
+    except (EOFError, ValueError):
+        return None
+
+    if len(blob) != sum(lengths):
+        return None
+
+    strings: List[str] = []
+    offset = 0
+    for length in lengths:
+        strings.append(blob[offset : offset + length].decode())
+        offset += length
+
+    category_end = header.type_count + header.category_count
+    columns.type_values = strings[: header.type_count]
+    columns.category_values = strings[header.type_count : category_end]
+    columns.descriptions = strings[category_end:]
+    columns.type_codes = {v: i for i, v in enumerate(columns.type_values)}
+    columns.category_codes = {v: i for i, v in enumerate(columns.category_values)}
+    columns.description_codes = {d: i for i, d in enumerate(columns.descriptions)}
+    return columns
@@ -2,5 +2,6 @@ def pad_string(item_string: str, width: int):
     return " " * (width - len(item_string)) + item_string
 
 
-def float_to_money_str(val: float):
-    return f"{val:.2f}"
+def cents_to_money_str(cents: int):
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
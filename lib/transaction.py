@@ -1,8 +1,10 @@
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_EVEN
 from enum import Enum
-from typing import List
+from typing import Dict
 
-from lib.strings import float_to_money_str, pad_string
+from lib.sidecar import read_sidecar
+from lib.strings import cents_to_money_str, pad_string
 
 
 class TransactionType(Enum):
@@ -21,50 +23,107 @@ DESC_WIDTH = 120
 
 
 class Transaction:
+    __slots__ = ("date", "amount", "type", "description")
+
     def __init__(
-        self, date: datetime, amount: float, type: TransactionType, description: str
+        self, date: datetime, amount: int, type: TransactionType, description: str
     ):
         self.date = date
+        # whole cents, so totals are exact
         self.amount = amount
         self.type = type
         self.description = description
 
     def __repr__(self):
-        return f"Date: {self.date}, Desc: {self.description}, Amt: {self.amount}, Type: {self.type.value}"
+        return f"Date: {self.date}, Desc: {self.description}, Amt: {cents_to_money_str(self.amount)}, Type: {self.type.value}"
 
     def to_data(self):
         return [
             self.date,
             self.description.replace(",", " "),
-            self.amount,
+            self.amount / 100,
             self.type.value,
         ]
 
     def pretty_string(self):
         desc_string = pad_string(self.description, DESC_WIDTH)
-        amount_string = pad_string(float_to_money_str(self.amount), AMNT_WIDTH)
+        amount_string = pad_string(cents_to_money_str(self.amount), AMNT_WIDTH)
         return str(self.date) + amount_string + desc_string
 
 
-def parse_money(money: str):
-    return float("".join(money.split(",")))
+def parse_money(money: str) -> int:
+    text = money.strip().replace(",", "")
+    negative = text.startswith("-")
+    whole, _, fraction = text.lstrip("-").partition(".")
+
+    if (
+        whole.isdigit()
+        and len(fraction) <= 2
+        and (fraction == "" or fraction.isdigit())
+    ):
+        cents = int(whole) * 100 + int(fraction.ljust(2, "0"))
+        return -cents if negative else cents
+
+    # anything unusual, like a float written with more than two decimals
+    cents = (Decimal(text) * 100).to_integral_value(ROUND_HALF_EVEN)
+    return int(cents)
+
+
+TYPE_VALUES = {type.value: type for type in TransactionType}
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_timestamp(text: str):
+    if len(text) == 19 and text[4] == "-" and text[13] == ":":
+        return datetime(
+            int(text[0:4]),
+            int(text[5:7]),
+            int(text[8:10]),
+            int(text[11:13]),
+            int(text[14:16]),
+            int(text[17:19]),
+        )
+    return datetime.strptime(text, TIMESTAMP_FORMAT)
+
+
+def parse_csv_amount(amount: str):
+    # csvs hold dollars written from whole cents, which a float round trips
+    return round(float(amount) * 100)
 
 
 def parse_transaction(line: str):
     trimmed = line.replace("\n", "")
     sections = trimmed.split(",")
-    date = datetime.strptime(sections[0], "%Y-%m-%d %H:%M:%S")
+    date = parse_timestamp(sections[0])
     desc = sections[1]
-    amount = float(sections[2])
-    type = TransactionType(sections[3])
+    amount = parse_csv_amount(sections[2])
+    type = TYPE_VALUES[sections[3]]
     return Transaction(date, amount, type, desc)
 
 
-def get_transactions_in_csv(csv_filepath: str):
+def read_csv_rows(csv_filepath: str):
+    # statements repeat the same few dates, so each is only parsed once
+    dates: Dict[str, datetime] = {}
+
     with open(csv_filepath, "r") as f:
-        lines = f.readlines()
-        return [parse_transaction(l) for l in lines[1:]]
+        next(f, None)
+        for line in f:
+            sections = line.rstrip("\n").split(",")
+            date = dates.get(sections[0], None)
+            if date is None:
+                date = parse_timestamp(sections[0])
+                dates[sections[0]] = date
+            amount = parse_csv_amount(sections[2])
+            yield date, amount, TYPE_VALUES[sections[3]], sections[1]
 
 
-def sum_transactions(transactions: List[Transaction]):
-    return sum([t.amount for t in transactions])
+def get_transactions_in_csv(csv_filepath: str):
+    columns = read_sidecar(csv_filepath)
+    if columns is None:
+        return [Transaction(*row) for row in read_csv_rows(csv_filepath)]
+
+    return [
+        Transaction(date, amount, TYPE_VALUES[type], description)
+        for date, amount, type, description in columns.rows()
+    ]
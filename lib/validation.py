@@ -0,0 +1,157 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Iterable, List
+
+from lib.TransactionTable import TYPE_CODES, TYPES
+from lib.printing import error_print, valid_print
+from lib.strings import cents_to_money_str
+from lib.transaction import Transaction, TransactionType
+
+
+class Bucket(Enum):
+    Debit = "Debit"
+    Credit = "Credit"
+    # moves the balance but is left out of the statement's own totals
+    UntotalledCredit = "Untotalled Credit"
+
+
+def get_buckets(default: Bucket, overrides: Dict[TransactionType, Bucket]):
+    return {type: overrides.get(type, default) for type in TransactionType}
+
+
+@dataclass
+class StatementTotals:
+    opening: int
+    closing: int
+    debits: int
+    credits: int
+    debit_count: int | None = None
+    credit_count: int | None = None
+
+
+@dataclass
+class CheckResult:
+    name: str
+    actual: int
+    expected: int
+    money: bool = True
+
+    @property
+    def passed(self):
+        return self.actual == self.expected
+
+    def to_string(self):
+        if self.money:
+            actual = cents_to_money_str(self.actual)
+            expected = cents_to_money_str(self.expected)
+            return f"{self.name}: {actual} / {expected}"
+        return f"{self.name}: {self.actual} / {self.expected}"
+
+
+@dataclass
+class ValidationReport:
+    checks: List[CheckResult] = field(default_factory=list)
+
+    @property
+    def passed(self):
+        return all(check.passed for check in self.checks)
+
+    def failures(self):
+        return [check for check in self.checks if not check.passed]
+
+    def print(self):
+        for check in self.checks:
+            if check.passed:
+                valid_print(check.to_string())
+            else:
+                error_print(check.to_string())
+
+
+def get_bucket_totals(
+    buckets: Dict[TransactionType, Bucket], cents: List[int], counts: List[int]
+):
+    bucket_cents = {bucket: 0 for bucket in Bucket}
+    bucket_counts = {bucket: 0 for bucket in Bucket}
+    for code, type in enumerate(TYPES):
+        bucket_cents[buckets[type]] += cents[code]
+        bucket_counts[buckets[type]] += counts[code]
+    return bucket_cents, bucket_counts
+
+
+def validate(
+    buckets: Dict[TransactionType, Bucket],
+    totals: StatementTotals,
+    cents: List[int],
+    counts: List[int],
+):
+    # cents and counts are summed per transaction type code
+    bucket_cents, bucket_counts = get_bucket_totals(buckets, cents, counts)
+    debits = bucket_cents[Bucket.Debit]
+    credits = bucket_cents[Bucket.Credit]
+    untotalled = bucket_cents[Bucket.UntotalledCredit]
+    balance_change = totals.closing - totals.opening
+
+    report = ValidationReport()
+    report.checks.append(
+        CheckResult(
+            "Statement Balance",
+            totals.credits - totals.debits + untotalled,
+            balance_change,
+        )
+    )
+    report.checks.append(
+        CheckResult("Change In Balance", credits - debits + untotalled, balance_change)
+    )
+    report.checks.append(CheckResult("Total Debits", debits, totals.debits))
+    report.checks.append(CheckResult("Total Credits", credits, totals.credits))
+
+    if totals.debit_count is not None:
+        debit_count = bucket_counts[Bucket.Debit]
+        report.checks.append(
+            CheckResult("Debit Count", debit_count, totals.debit_count, False)
+        )
+    if totals.credit_count is not None:
+        credit_count = bucket_counts[Bucket.Credit]
+        report.checks.append(
+            CheckResult("Credit Count", credit_count, totals.credit_count, False)
+        )
+    return report
+
+
+class StatementValidation:
+    def __init__(
+        self, buckets: Dict[TransactionType, Bucket], totals: StatementTotals | None
+    ):
+        self.buckets = buckets
+        self.totals = totals
+        self.cents = [0] * len(TYPES)
+        self.counts = [0] * len(TYPES)
+
+    def add(self, transaction: Transaction):
+        code = TYPE_CODES[transaction.type]
+        self.cents[code] += transaction.amount
+        self.counts[code] += 1
+
+    def get_totals(self):
+        if self.totals is None:
+            raise Exception("Expected statement totals")
+        return self.totals
+
+    def report(self):
+        return validate(self.buckets, self.get_totals(), self.cents, self.counts)
+
+    def check(self):
+        report = self.report()
+        report.print()
+        if not report.passed:
+            names = ", ".join(check.name for check in report.failures())
+            raise Exception(f"Statement failed validation: {names}")
+
+
+def validated(transactions: Iterable[Transaction], validation_data):
+    # totals are accumulated as transactions stream past, so the statement is
+    # only checked once the last one has been written
+    for transaction in transactions:
+        validation_data.add(transaction)
+        yield transaction
+    validation_data.check()
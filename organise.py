@@ -1,29 +1,60 @@
-from typing import Dict, List
-from lib.Metadata import Metadata, metadata_to_csv
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import heapq
+from itertools import groupby
+import os
+import sys
+from typing import Dict, Iterable, List, Set, Tuple
+from lib.CollationGraph import CollationGraph
+from lib.HistoryStore import FileStats, HistoryStore
+from lib.Metadata import Metadata, metadata_to_csv, patch_metadata_csv
+from lib.MonthRange import MonthRange
+from lib.Rollup import Rollup, get_month_cells
 from lib.SingleMonthRange import SingleMonthRange
 from lib.Folder import Folder
-from lib.TransactionGroups import parse_transaction_groups
-from lib.categorise import Category, categorise_transaction
-from lib.files import transactions_to_csv
+from lib.TransactionTable import TransactionTable
+from lib.categorise import Category, get_rules_version
+from lib.files import parse_worker_count, table_to_csv, write_csv, write_table
 from lib.json_config import get_json
-from lib.printing import valid_print, warning_print
+from lib.printing import error_print, valid_print, warning_print
+from lib.strings import cents_to_money_str
 from lib.transaction import Transaction
 
 OUTPUT_PATH = "data"
+RULES_INPUT = "categories.json"
 
 known_range_with_transactions = SingleMonthRange(month=3, year=2024)
 
 
-def short_summary(transactions: List[Transaction]):
-    transaction_groups = parse_transaction_groups(transactions)
-    totals = transaction_groups.compute_totals()
+@dataclass
+class OrganiseArgs:
+    one_pass: bool
+    incremental: bool
+    force: bool
+    workers: int
+
+
+def parse_organise_args(argv: List[str]):
+    all_args = argv[1:]
+    one_pass = "m" in all_args
+    incremental = "i" in all_args
+    force = "f" in all_args
+    workers = parse_worker_count(all_args, os.cpu_count() or 1)
+    return OrganiseArgs(
+        one_pass=one_pass, incremental=incremental, force=force, workers=workers
+    )
+
+
+def short_summary(table: TransactionTable):
+    totals = table.category_totals()
 
     for total_key in totals.keys():
-        valid_print(f"Total {total_key.value}: {totals[total_key]}")
+        valid_print(f"Total {total_key.value}: {cents_to_money_str(totals[total_key])}")
 
-    warning_print(
-        f"Transfer Difference (+): {totals.get(Category.TransferIn, 0) - totals.get(Category.TransferOut, 0)}"
+    transfer_difference = totals.get(Category.TransferIn, 0) - totals.get(
+        Category.TransferOut, 0
     )
+    warning_print(f"Transfer Difference (+): {cents_to_money_str(transfer_difference)}")
 
     plus = (
         totals.get(Category.Cashback, 0)
@@ -34,40 +65,95 @@ def short_summary(transactions: List[Transaction]):
     overall = sum([totals[total_key] for total_key in totals.keys()])
     minus = overall - plus
 
-    warning_print(f"Balance Change (+): {plus - minus}")
+    warning_print(f"Balance Change (+): {cents_to_money_str(plus - minus)}")
 
 
-def collate_transactions(folders: List[Folder], single_month_range: SingleMonthRange):
-    month_range = single_month_range.to_month_range()
+def tag_source(transactions: Iterable[Transaction], source):
+    for transaction in transactions:
+        yield transaction, source
 
-    missing_sources = set()
-    transactions: List[Transaction] = []
+
+def gather_month(folders: List[Folder], month_range: MonthRange):
+    missing_sources: List[str] = []
+    rows: List[Tuple[Transaction, str]] = []
     for folder in folders:
         source_transactions = folder.get_transactions_between_dates(month_range)
         if len(source_transactions) == 0:
-            missing_sources.add(folder.get_source())
+            missing_sources.append(folder.get_source())
             continue
-        transactions += source_transactions
+        rows += tag_source(source_transactions, folder.get_source())
 
-    if len(transactions) == 0:
-        return None
+    rows.sort(key=lambda row: row[0].date)
+    transactions = [row[0] for row in rows]
+    row_sources = [row[1] for row in rows]
+    return transactions, missing_sources, row_sources
 
-    sorted_transactions = sorted(transactions, key=lambda x: x.date)
 
+def collate_transactions(
+    folders: List[Folder],
+    single_month_range: SingleMonthRange,
+    rollup: Rollup | None = None,
+):
+    month_range = single_month_range.to_month_range()
+
+    sorted_transactions, missing_sources, row_sources = gather_month(
+        folders, month_range
+    )
+    if len(sorted_transactions) == 0:
+        return None
+
+    table = TransactionTable.from_transactions(sorted_transactions)
     output_csv_name = f"{month_range.to_filename()}.csv"
-    transactions_to_csv(OUTPUT_PATH, output_csv_name, sorted_transactions)
+    table_to_csv(OUTPUT_PATH, output_csv_name, table)
+    if rollup is not None:
+        rollup.set_month(
+            single_month_range.to_string(), get_month_cells(table, row_sources)
+        )
 
-    short_summary(sorted_transactions)
+    short_summary(table)
     print()
 
-    return list(missing_sources)
+    return missing_sources
 
 
-def search_and_collate(starting_month: SingleMonthRange, direction: int):
+def refresh_history(store: HistoryStore, folders: List[Folder]):
+    stale: List[Tuple[Folder, FileStats]] = []
+    for folder in folders:
+        files = folder.get_file_stats()
+        if not store.is_current(folder.get_source(), files):
+            stale.append((folder, files))
+
+    if len(stale) == 0:
+        return
+
+    # a new statement after everything stored only needs appending
+    if len(stale) == 1 and store.exists():
+        folder, files = stale[0]
+        previous = store.index.files.get(folder.get_source(), {})
+        added = folder.order_filenames(f for f in files.keys() if f not in previous)
+        unchanged = all(files.get(name) == stat for name, stat in previous.items())
+        if unchanged and len(added) > 0:
+            transactions = folder.read_files(added)
+            if store.append(folder.get_source(), files, transactions):
+                valid_print(f"history appended, {len(transactions)} transactions")
+                return
+
+    sources = {}
+    for folder in folders:
+        files = folder.get_file_stats()
+        transactions = folder.read_files(folder.order_filenames(files.keys()))
+        sources[folder.get_source()] = (files, transactions)
+    store.write(sources)
+    valid_print(f"history written, {len(store)} transactions")
+
+
+def search_and_collate(
+    starting_month: SingleMonthRange, direction: int, rollup: Rollup
+):
     metadata = []
     month = starting_month
     while True:
-        missing_sources = collate_transactions(folders, month)
+        missing_sources = collate_transactions(folders, month, rollup)
 
         if missing_sources is None:
             break
@@ -80,15 +166,196 @@ def search_and_collate(starting_month: SingleMonthRange, direction: int):
     return metadata
 
 
+@dataclass
+class MonthBucket:
+    month: SingleMonthRange
+    transactions: List[Transaction] = field(default_factory=list)
+    row_sources: List[int] = field(default_factory=list)
+    sources: Set[int] = field(default_factory=set)
+
+
+def merge_sources(folders: List[Folder]):
+    # ties go to the earlier folder, as in sorting the months one at a time
+    streams = [tag_source(f.get_all_transactions(), i) for i, f in enumerate(folders)]
+    return heapq.merge(*streams, key=lambda row: row[0].date)
+
+
+def bucket_by_month(rows: Iterable[Tuple[Transaction, int]]):
+    buckets: List[MonthBucket] = []
+    for (year, month), month_rows in groupby(
+        rows, key=lambda row: (row[0].date.year, row[0].date.month)
+    ):
+        bucket = MonthBucket(SingleMonthRange(month=month, year=year))
+        for transaction, source in month_rows:
+            bucket.transactions.append(transaction)
+            bucket.row_sources.append(source)
+            bucket.sources.add(source)
+        buckets.append(bucket)
+
+    if len(buckets) == 0:
+        return buckets
+
+    # months inside the history with nothing in them are still written
+    filled: List[MonthBucket] = []
+    month = buckets[0].month
+    for bucket in buckets:
+        while month != bucket.month:
+            filled.append(MonthBucket(month))
+            month = month.get_incremented_copy(1)
+        filled.append(bucket)
+        month = month.get_incremented_copy(1)
+    return filled
+
+
+def write_month(bucket: MonthBucket, table: TransactionTable):
+    name = f"{bucket.month.to_month_range().to_filename()}.csv"
+    csv_path = os.path.join(OUTPUT_PATH, name)
+    replaced = os.path.isfile(csv_path)
+    return name, replaced, write_table(csv_path, table)
+
+
+def collate_all(folders: List[Folder], workers: int):
+    sources = [folder.get_source() for folder in folders]
+    buckets = bucket_by_month(merge_sources(folders))
+
+    metadata: List[Metadata] = []
+    for bucket in buckets:
+        missing = [s for i, s in enumerate(sources) if i not in bucket.sources]
+        metadata.append(
+            Metadata(single_month_range=bucket.month, missing_sources=missing)
+        )
+    metadata_path = os.path.join(OUTPUT_PATH, "metadata.csv")
+    rollup = Rollup(OUTPUT_PATH)
+    rollup.clear()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        metadata_write = executor.submit(
+            write_csv, metadata_path, [item.to_data() for item in metadata]
+        )
+
+        # each month is categorised once, then written while the next is built
+        tables: List[TransactionTable] = []
+        writes = []
+        for bucket in buckets:
+            table = TransactionTable.from_transactions(bucket.transactions)
+            tables.append(table)
+            writes.append(executor.submit(write_month, bucket, table))
+
+            row_sources = [sources[i] for i in bucket.row_sources]
+            cells = get_month_cells(table, row_sources)
+            rollup.set_month(bucket.month.to_string(), cells)
+
+        # printed in month order
+        for table, write in zip(tables, writes):
+            name, replaced, count = write.result()
+            if replaced:
+                error_print(f"{name} deleted")
+            valid_print(f"{name} written, {count} transactions")
+            short_summary(table)
+            print()
+
+        metadata_write.result()
+    rollup.save()
+    valid_print(f"metadata.csv written, {len(metadata)} metadata items")
+
+
+def get_statement_months(folders: List[Folder]):
+    # every month from the first statement to the last, gaps included
+    statements = [s for folder in folders for s in folder.get_statements()]
+    if len(statements) == 0:
+        return []
+
+    start = min(s.month_range.start for s in statements)
+    end = max(s.month_range.end for s in statements)
+    month = SingleMonthRange(month=start.month, year=start.year)
+    last = SingleMonthRange(month=end.month, year=end.year)
+
+    months = [month]
+    while month != last:
+        month = month.get_incremented_copy(1)
+        months.append(month)
+    return months
+
+
+def get_month_inputs(
+    graph: CollationGraph, folders: List[Folder], month_range: MonthRange
+):
+    paths: List[str] = []
+    for folder in folders:
+        for statement in folder.get_statements_between_dates(month_range):
+            paths.append(os.path.join(folder.path, statement.filename))
+
+    # the category column depends on the rules as well as the statements
+    inputs = graph.get_inputs(paths)
+    inputs[RULES_INPUT] = get_rules_version()
+    return inputs
+
+
+def collate_incremental(folders: List[Folder], force: bool):
+    graph = CollationGraph(OUTPUT_PATH)
+    rollup = Rollup(OUTPUT_PATH)
+    months = get_statement_months(folders)
+
+    written = 0
+    for month in months:
+        month_range = month.to_month_range()
+        key = month.to_string()
+        csv_name = f"{month_range.to_filename()}.csv"
+
+        inputs = get_month_inputs(graph, folders, month_range)
+        current = graph.is_current(key, inputs, csv_name) and rollup.has_month(key)
+        if not force and current:
+            continue
+
+        transactions, missing_sources, row_sources = gather_month(
+            folders, month_range
+        )
+        table = TransactionTable.from_transactions(transactions)
+        table_to_csv(OUTPUT_PATH, csv_name, table)
+        rollup.set_month(key, get_month_cells(table, row_sources))
+        short_summary(table)
+        print()
+
+        graph.record(key, inputs, missing_sources)
+        written += 1
+
+    graph.prune([month.to_string() for month in months])
+    graph.save()
+    rollup.prune([month.to_string() for month in months])
+    rollup.save()
+
+    metadata = [
+        Metadata(month, graph.months[month.to_string()].missing_sources)
+        for month in months
+    ]
+    patch_metadata_csv(OUTPUT_PATH, "metadata.csv", metadata)
+    valid_print(f"{written} of {len(months)} months written")
+    return written
+
+
 if __name__ == "__main__":
+    args = parse_organise_args(sys.argv)
     suffixes: dict = get_json("suffixes.json")
 
-    folders = [Folder(path) for path in suffixes.values()]
+    store = HistoryStore()
+    folders = [Folder(path, store) for path in suffixes.values()]
+    refresh_history(store, folders)
+
+    if args.one_pass:
+        collate_all(folders, args.workers)
+        sys.exit(0)
+
+    if args.incremental:
+        collate_incremental(folders, args.force)
+        sys.exit(0)
 
-    forward_metadata = search_and_collate(known_range_with_transactions, 1)
+    rollup = Rollup(OUTPUT_PATH)
+    rollup.clear()
+    forward_metadata = search_and_collate(known_range_with_transactions, 1, rollup)
     inverse_metadata = search_and_collate(
-        known_range_with_transactions.get_incremented_copy(-1), -1
+        known_range_with_transactions.get_incremented_copy(-1), -1, rollup
     )
+    rollup.save()
 
     metadata = list(reversed(inverse_metadata)) + forward_metadata
 
@@ -1,60 +1,55 @@
 from datetime import datetime
-from typing import List, Tuple
-from pypdf import PdfReader
+from itertools import islice
+from typing import Iterable, List, Tuple
 
+from lib.ColumnLayout import ColumnLayout
+from lib.Document import Document
 from lib.MonthRange import MonthRange, parse_dashed_month_range
 from lib.dates import get_month_value
 from lib.files import get_layout_page_data, manage_files
 from lib.json_config import get_suffix
-
-from lib.floats import float_close
 from lib.printing import blue_print, valid_print
-from lib.search import search
+from lib.PageClassifier import PageClassifier, PageLabel
+from lib.PageText import PageText
+from lib.Source import Source
 from lib.transaction import Transaction, TransactionType, parse_money
-
+from lib.validation import (
+    Bucket,
+    StatementTotals,
+    StatementValidation,
+    get_buckets,
+    validated,
+)
 
 SUFFIX_EVERYDAY = get_suffix("boq-everyday")
 
 SUFFIX_SAVINGS = get_suffix("boq-savings")
 
-
-class ValidationData:
-    def __init__(
-        self,
-        open_balance: float,
-        total_credits: float,
-        total_debits: float,
-        closing_balance: float,
-    ):
-        self.open_balance = open_balance
-        self.total_credits = total_credits
-        self.total_debits = total_debits
-        self.closing_balance = closing_balance
-
-    def check(self, transactions: List[Transaction]):
-        balance_difference = self.closing_balance - self.open_balance
-        total_difference = self.total_credits - self.total_debits
-        assert float_close(balance_difference, total_difference)
-        valid_print(
-            f"Statement Differences: {total_difference:.2f} / {balance_difference:.2f}"
-        )
-
-        credits = 0.0
-        debits = 0.0
-        for transaction in transactions:
-            if transaction.type in [
-                TransactionType.CardPayment,
-                TransactionType.TransferOut,
-            ]:
-                debits += transaction.amount
-            else:
-                credits += transaction.amount
-
-        assert float_close(debits, self.total_debits)
-        valid_print(f"Total Debits: {debits:.2f} / {self.total_debits:.2f}")
-
-        assert float_close(credits, self.total_credits)
-        valid_print(f"Total Credits: {credits:.2f} / {self.total_credits:.2f}")
+CLASSIFIER = PageClassifier(
+    {PageLabel.Transaction: ["Date", "Processed", "Description", "Debits"]}
+)
+
+TRANSACTION_COLUMNS = [
+    "Date",
+    "Processed",
+    "Description",
+    "Debits ($)",
+    "Credits ($)",
+    "Balance ($)",
+]
+DATE_INDEX = 0
+DESCRIPTION_INDEX = 2
+DEBIT_INDEX = 3
+CREDIT_INDEX = 4
+
+
+BUCKETS = get_buckets(
+    Bucket.Credit,
+    {
+        TransactionType.CardPayment: Bucket.Debit,
+        TransactionType.TransferOut: Bucket.Debit,
+    },
+)
 
 
 def get_validation_value(first_page: str, text: str):
@@ -74,55 +69,41 @@ def get_validation_data(first_page: str):
     total_debits = get_validation_value(first_page, "Total debits")
     closing_balance = get_validation_value(first_page, "Closing balance")
 
-    return ValidationData(opening_balance, total_credits, total_debits, closing_balance)
+    totals = StatementTotals(
+        opening=opening_balance,
+        closing=closing_balance,
+        debits=total_debits,
+        credits=total_credits,
+    )
+    return StatementValidation(BUCKETS, totals)
 
 
 def extract_dates_string(first_page: str):
+    page = PageText(first_page)
     statement_period_index = first_page.find("Statement period")
-    start_index, _ = search(
-        list(first_page), statement_period_index, 1, lambda x: x != "\n"
-    )
-    start_index += 1
-    start_index, _ = search(list(first_page), start_index + 1, 1, lambda x: x == " ")
-
-    end_index = first_page.find("\n", start_index)
-    return first_page[start_index:end_index].strip()
-
-
-def get_transaction_pages(pages: List[str]):
-    output = []
-    for page in pages:
-        keywords = ["Date", "Processed", "Description", "Debits"]
-        all_found = True
-        for keyword in keywords:
-            if keyword not in page:
-                all_found = False
+    start_index = page.next_newline(statement_period_index) + 1
 
-        if all_found:
-            output.append(page)
-    return output
+    end_index = page.line_end(start_index)
+    return first_page[start_index + 1 : end_index].strip()
 
 
-def formatted_line(l: str):
-    output = ""
-    i = 0
-    while i < len(l):
-        if l[i : i + len("NA")] == "NA":
-            i += 2
-        if l[i : i + len("N/A")] == "N/A":
-            i += 3
+def get_transaction_pages(pages: Iterable[str]):
+    return CLASSIFIER.select(pages, PageLabel.Transaction)
 
-        if i > len(l) - 1:
-            break
-        output += l[i]
-        i += 1
-    return output[:120].strip()
 
+def get_transaction_layout(page: str):
+    header = PageText(page).line_at(page.find("Balance ($)"))
+    return ColumnLayout.from_header(
+        header, TRANSACTION_COLUMNS, TRANSACTION_COLUMNS[DEBIT_INDEX:]
+    )
 
-def get_transaction_lines(pages: List[str]):
-    lines = []
 
+def get_transaction_rows(pages: Iterable[str]):
+    layout = None
     for page in pages:
+        if layout is None:
+            layout = get_transaction_layout(page)
+
         balance_index = page.find("Balance ($)")
         start_index = page.find("\n", balance_index)
 
@@ -131,15 +112,10 @@ def get_transaction_lines(pages: List[str]):
         if end_index == -1:
             end_index = page.find("Page")
 
-        page_lines = page[start_index:end_index].split("\n")
-        formatted_lines = [formatted_line(l) for l in page_lines]
-        lines += list(filter(lambda x: len(x) != 0, formatted_lines))
-
-    return lines[2:]
-
-
-def get_items(separated: List[str]):
-    return list(filter(lambda x: x != "", separated))
+        for line in page[start_index:end_index].split("\n"):
+            row = layout.slice(line)
+            if any(row):
+                yield row
 
 
 def read_date(date_string: str, month_range: MonthRange):
@@ -152,25 +128,22 @@ def read_date(date_string: str, month_range: MonthRange):
     return datetime(year, month, day)
 
 
-def get_amount(items: List[str]):
-    if len(items) == 5:
-        return parse_money(items[-2].strip())
-    return parse_money(items[-1].strip())
+def get_amount(row: List[str]):
+    if row[DEBIT_INDEX] != "":
+        return parse_money(row[DEBIT_INDEX])
+    return parse_money(row[CREDIT_INDEX])
 
 
-def read_transaction_data(line: str, month_range: MonthRange):
-    separated = line.split("  ")
-    items = get_items(separated)
+def read_transaction_data(row: List[str], month_range: MonthRange):
+    if row[DATE_INDEX] == "":
+        return None, row[DESCRIPTION_INDEX], None
 
-    if len(items) == 1:
-        return None, items[0], None
+    date = read_date(row[DATE_INDEX], month_range)
 
-    date = read_date(items[0], month_range)
+    return date, row[DESCRIPTION_INDEX], get_amount(row)
 
-    return date, items[2], get_amount(items)
 
-
-def get_transaction_type_and_amount(value: float, desc: str):
+def get_transaction_type_and_amount(value: int, desc: str):
     if "Interest" in desc:
         return TransactionType.Interest, value
 
@@ -190,53 +163,59 @@ def get_transaction_type_and_amount(value: float, desc: str):
     return TransactionType.Credit, value
 
 
-def format_transaction(data: Tuple[datetime, str, float]):
-    type, amount = get_transaction_type_and_amount(data[2], data[1])
-    return Transaction(data[0], amount, type, data[1])
+def format_transaction(data: Tuple[datetime, List[str], int]):
+    desc = " ".join(data[1])
+    type, amount = get_transaction_type_and_amount(data[2], desc)
+    return Transaction(data[0], amount, type, desc)
 
 
-def extract_transactions(lines: List[str], month_range: MonthRange):
+def aggregate_rows(rows: Iterable[List[str]], month_range: MonthRange):
     data = None
 
-    transactions = []
-
-    for line in lines:
-        date, desc, value = read_transaction_data(line, month_range)
+    for row in rows:
+        date, desc, value = read_transaction_data(row, month_range)
 
         if date is None:
             if data is None:
                 raise Exception("Expected data")
 
-            data = data[0], data[1] + " " + desc, data[2]
+            data[1].append(desc)
             continue
 
         if data is not None:
-            transactions.append(format_transaction(data))
-        data = date, desc, value
+            yield data
+        data = date, [desc], value
 
     if data is not None:
-        transactions.append(format_transaction(data))
+        yield data
 
-    return transactions
 
+def extract_transactions(rows: Iterable[List[str]], month_range: MonthRange):
+    for data in aggregate_rows(rows, month_range):
+        yield format_transaction(data)
 
-def get_month_range(reader: PdfReader):
-    pages = get_layout_page_data(reader)
+
+def get_month_range(document: Document):
+    pages = get_layout_page_data(document)
     dates_string = extract_dates_string(pages[0])
     return parse_dashed_month_range(dates_string)
 
 
-def get_data(reader: PdfReader, month_range: MonthRange):
-    pages = get_layout_page_data(reader)
+def get_data(document: Document, month_range: MonthRange):
+    pages = get_layout_page_data(document)
 
     validation_data = get_validation_data(pages[0])
     transaction_pages = get_transaction_pages(pages)
-    transaction_lines = get_transaction_lines(transaction_pages)
-    transactions = extract_transactions(transaction_lines, month_range)
+    transaction_rows = islice(get_transaction_rows(transaction_pages), 2, None)
+    transactions = extract_transactions(transaction_rows, month_range)
+
+    yield from validated(transactions, validation_data)
 
-    validation_data.check(transactions)
 
-    return transactions
+SOURCES = [
+    Source("boq-everyday", SUFFIX_EVERYDAY, get_month_range, get_data),
+    Source("boq-savings", SUFFIX_SAVINGS, get_month_range, get_data),
+]
 
 
 def handle_boq():
@@ -1,34 +1,34 @@
 from datetime import datetime
-from pypdf import PdfReader
+from typing import Iterable
+from lib.Document import Document
 from lib.MonthRange import MonthRange
 from lib.dates import format_date, get_month_value
-from lib.files import manage_files
-from lib.json_config import get_suffix, get_password
+from lib.files import get_layout_page_data, manage_files
+from lib.json_config import get_suffix
 
 from lib.printing import blue_print, warning_print
-from lib.search import find_index_prior_to_newline, search
+from lib.PageText import PageText
+from lib.search import search
+from lib.Source import Source
 from lib.transaction import Transaction, TransactionType, parse_money
 
-
 SUFFIX = get_suffix("coles")
-PASSWORD = get_password("coles")
+PASSWORD_KEY = "coles"
 
 
-def get_page_text(reader: PdfReader):
-    return [page.extract_text(extraction_mode="layout") for page in reader.pages]
+def get_page_text(document: Document):
+    return get_layout_page_data(document)
 
 
-def get_transaction_page_text(reader: PdfReader):
-    output = []
+def get_transaction_page_text(document: Document):
+    pages = get_page_text(document)
 
     # first page not parsable for some reason
-    for page in reader.pages[1:]:
+    for i in range(1, len(pages)):
 
-        page_text = page.extract_text(extraction_mode="layout")
+        page_text = pages[i]
         if "Transactions" in page_text:
-            output.append(page_text)
-
-    return output
+            yield page_text
 
 
 def extract_date(line: str):
@@ -56,7 +56,7 @@ def extract_month_range(page: str):
     return MonthRange(start_date, end_date)
 
 
-def get_transaction_details(value: float, desc: str):
+def get_transaction_details(value: int, desc: str):
     if desc == "Bpay Payments":
         return -1 * value, TransactionType.TransferIn
 
@@ -102,51 +102,55 @@ def parse_transaction(line: str, month_range: MonthRange):
     return Transaction(date, amount, type, description)
 
 
-def extract_transactions(page: str, month_range: MonthRange):
+def get_transaction_lines(page: str):
+    page_text = PageText(page)
+
     end_index = page.find("Closing Balance")
     if end_index == -1:
         end_index = page.find("(Continued next page)")
 
         if end_index == -1:
             end_index = page.find("Important Information")
-            end_index = find_index_prior_to_newline(page, end_index - 1)
-            end_index = find_index_prior_to_newline(page, end_index - 1)
+            end_index = page_text.previous_newline(end_index - 1)
+            end_index = page_text.previous_newline(end_index - 1)
 
-        end_index = find_index_prior_to_newline(page, end_index - 1)
-    end_index = find_index_prior_to_newline(page, end_index - 1)
+        end_index = page_text.previous_newline(end_index - 1)
+    end_index = page_text.previous_newline(end_index - 1)
 
     prior_line_index = page.find("Card Number")
     if prior_line_index == -1:
         prior_line_index = page.find("Date")
     start_index = page.find("\n", prior_line_index) + 1
 
-    lines = page[start_index:end_index].split("\n")
+    return page[start_index:end_index].split("\n")
 
-    results = [parse_transaction(l, month_range) for l in lines]
 
-    return list(filter(lambda x: x is not None, results))
+def extract_transactions(lines: Iterable[str], month_range: MonthRange):
+    for line in lines:
+        transaction = parse_transaction(line, month_range)
+        if transaction is not None:
+            yield transaction
 
 
-def decrypt_and_get_data(reader: PdfReader):
-    if not reader.decrypt(PASSWORD):
-        raise Exception("PDF Not Decryptable")
+def decrypt_and_get_data(document: Document):
+    document.decrypt_with_key(PASSWORD_KEY)
 
-    return get_transaction_page_text(reader)
+    return get_transaction_page_text(document)
 
 
-def get_month_range(reader: PdfReader):
-    page_data = decrypt_and_get_data(reader)
-    return extract_month_range(page_data[0])
+def get_month_range(document: Document):
+    first_page = next(decrypt_and_get_data(document), None)
+    if first_page is None:
+        raise Exception("Expected transaction page")
+    return extract_month_range(first_page)
 
 
-def get_pdf_data(reader: PdfReader, month_range: MonthRange):
-    page_data = decrypt_and_get_data(reader)
+def get_pdf_data(document: Document, month_range: MonthRange):
+    for page in decrypt_and_get_data(document):
+        yield from extract_transactions(get_transaction_lines(page), month_range)
 
-    transactions = []
-    for page in page_data:
-        transactions += extract_transactions(page, month_range)
 
-    return transactions
+SOURCES = [Source("coles", SUFFIX, get_month_range, get_pdf_data)]
 
 
 def handle_coles():
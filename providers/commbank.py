@@ -1,59 +1,67 @@
 from datetime import datetime
-from typing import List, Tuple
-from pypdf import PdfReader
+from itertools import islice
+from typing import Iterable, List, Sequence, Set, Tuple
+from lib.ColumnLayout import ColumnLayout
+from lib.Document import Document
 from lib.MonthRange import MonthRange, parse_dashed_month_range
 from lib.dates import get_month_value
-from lib.files import manage_files
+from lib.files import get_layout_page_data, manage_files
 from lib.json_config import get_suffix
-
-from lib.floats import float_close
-from lib.printing import blue_print, valid_print
-from lib.search import search
+from lib.printing import blue_print
+from lib.PageClassifier import PageClassifier, PageLabel, select_pages
+from lib.PageText import PageText
+from lib.Source import Source
 from lib.transaction import Transaction, TransactionType, parse_money
-
+from lib.validation import (
+    Bucket,
+    StatementTotals,
+    StatementValidation,
+    get_buckets,
+    validated,
+)
 
 SUFFIX = get_suffix("commbank")
 
-
-class ValidationData:
-    def __init__(self, numbers: List[float]):
-        self.opening = numbers[0]
-        self.debits = numbers[1]
-        self.credits = numbers[2]
-        self.closing = numbers[3]
-
-        final_balance = self.opening + self.credits - self.debits
-        assert float_close(self.closing, final_balance)
-        valid_print(f"Final Balance: {final_balance} / {self.closing}")
-
-    def check(self, transactions: List[Transaction]):
-        total_credit = 0.0
-        total_debit = 0.0
-        for transaction in transactions:
-            if transaction.type in [
-                TransactionType.Credit,
-                TransactionType.TransferIn,
-                TransactionType.Salary,
-            ]:
-                total_credit += transaction.amount
-            else:
-                total_debit += transaction.amount
-
-        assert float_close(self.debits, total_debit)
-        valid_print(f"Total Debits: {total_debit} / {self.debits}")
-
-        assert float_close(self.credits, total_credit)
-        valid_print(f"Total Credits: {total_credit} / {self.credits}")
-
-
-def split_by_bunches(line: str):
-    split = line.split("  ")
-    filtered = list(filter(lambda x: x != "", split))
-    return [s.strip() for s in filtered]
-
-
-def get_page_data(reader: PdfReader):
-    return [page.extract_text(extraction_mode="layout") for page in reader.pages]
+CLASSIFIER = PageClassifier(
+    {
+        PageLabel.Transaction: ["Date", "Transaction", "Debit", "Credit", "Balance"],
+        PageLabel.Validation: [
+            "Opening balance",
+            "Total debits",
+            "Total credits",
+            "Closing balance",
+        ],
+    }
+)
+
+VALIDATION_COLUMNS = [
+    "Opening balance",
+    "Total debits",
+    "Total credits",
+    "Closing balance",
+]
+
+TRANSACTION_COLUMNS = ["Date", "Transaction", "Debit", "Credit", "Balance"]
+DATE_INDEX = 0
+DESCRIPTION_INDEX = 1
+DEBIT_INDEX = 2
+CREDIT_INDEX = 3
+# amounts are wider than the short Debit/Credit headers they sit under
+AMOUNT_OVERHANG = 6
+
+
+BUCKETS = get_buckets(
+    Bucket.Debit,
+    {
+        TransactionType.Credit: Bucket.Credit,
+        TransactionType.TransferIn: Bucket.Credit,
+        TransactionType.Salary: Bucket.Credit,
+    },
+)
+
+
+def get_page_data(document: Document):
+    return get_layout_page_data(document)
 
 
 def get_validation_section(page: str):
@@ -70,35 +78,38 @@ def get_validation_section(page: str):
     return page[start_index:next_newline]
 
 
-def get_validation_numbers(sections: List[str]):
-    if sections[-1] != "CR" or sections[0][-2:] != "CR":
-        raise Exception("Expected CR")
+def get_validation_layout(page: str):
+    header = PageText(page).line_at(page.find("Closing balance"))
+    # every summary value sits within its header, so each owns up to its end
+    return ColumnLayout.from_header(header, VALIDATION_COLUMNS, VALIDATION_COLUMNS)
+
 
-    strings = [s[1:] for s in sections[:-1]]
-    strings[0] = strings[0][:-2]
+def get_validation_numbers(cells: List[str]):
+    if not cells[0].endswith("CR") or not cells[-1].endswith("CR"):
+        raise Exception("Expected CR")
 
-    return [parse_money(s) for s in strings]
+    return [parse_possible_dollar_signed_number(c.replace("CR", "")) for c in cells]
 
 
-def get_validation_data(page_data: List[str]):
-    page = get_validation_page(page_data)
+def get_validation_data(page_data: Sequence[str], page_labels: List[Set[PageLabel]]):
+    page = get_validation_page(page_data, page_labels)
     validation_section = get_validation_section(page)
-    sections = split_by_bunches(validation_section)
-    numbers = get_validation_numbers(sections)
-    return ValidationData(numbers)
-
+    cells = get_validation_layout(page).slice(validation_section)
+    numbers = get_validation_numbers(cells)
+    totals = StatementTotals(
+        opening=numbers[0],
+        closing=numbers[3],
+        debits=numbers[1],
+        credits=numbers[2],
+    )
+    return StatementValidation(BUCKETS, totals)
 
-def get_validation_page(page_data: List[str]):
-    keywords = ["Opening balance", "Total debits", "Total credits", "Closing balance"]
-    for page in page_data:
-        all_found = True
-        for keyword in keywords:
-            if keyword not in page:
-                all_found = False
-        if all_found:
-            return page
 
-    raise Exception("Expected validation page")
+def get_validation_page(page_data: Sequence[str], page_labels: List[Set[PageLabel]]):
+    pages = select_pages(page_data, page_labels, PageLabel.Validation)
+    if len(pages) == 0:
+        raise Exception("Expected validation page")
+    return pages[0]
 
 
 def get_month_string(first_page: str):
@@ -110,106 +121,114 @@ def get_month_string(first_page: str):
     return first_page[first_space:newline].strip()
 
 
-def get_month_range(reader: PdfReader):
-    page_data = get_page_data(reader)
+def get_month_range(document: Document):
+    page_data = get_page_data(document)
     month_string = get_month_string(page_data[0])
     return parse_dashed_month_range(month_string)
 
 
-def get_transaction_pages(page_data: List[str]):
-    keywords = ["Date", "Transaction", "Debit", "Credit", "Balance"]
-
-    output: List[str] = []
-    for page in page_data:
-        all_keywords_present = True
-        for keyword in keywords:
-            if keyword not in page:
-                all_keywords_present = False
-
-        if all_keywords_present:
-            output.append(page)
-    return output
+def get_transaction_pages(page_data: Sequence[str], page_labels: List[Set[PageLabel]]):
+    return select_pages(page_data, page_labels, PageLabel.Transaction)
 
 
-def find_newline_after_transaction_header(page: str):
+def find_transaction_header(page: PageText):
     start_index = 0
 
     while True:
-        balance_index = page.find("Balance", start_index)
+        balance_index = page.text.find("Balance", start_index)
 
         if balance_index == -1:
             raise Exception("Expected to find")
-        previous_newline, _ = search(list(page), balance_index, -1, lambda x: x != "\n")
-        next_newline = page.find("\n", balance_index)
 
-        text = page[previous_newline + 1 : next_newline]
+        text = page.line_at(balance_index)
         if "Debit" in text and "Credit" in text:
-            return next_newline
+            return balance_index
 
         start_index = balance_index + 1
 
 
-def find_transaction_stop_index(page: str):
-    closing_balance_index = page.find("CLOSING BALANCE")
+def get_transaction_layout(page: PageText, header_index: int):
+    return ColumnLayout.from_header(
+        page.line_at(header_index),
+        TRANSACTION_COLUMNS,
+        TRANSACTION_COLUMNS[DEBIT_INDEX:],
+        AMOUNT_OVERHANG,
+    )
+
+
+def get_transaction_section(page: PageText, header_index: int):
+    closing_balance_index = page.text.find("CLOSING BALANCE")
 
     if closing_balance_index == -1:
-        return -1
+        return page.lines_between(header_index)
+    return page.lines_between(header_index, closing_balance_index)
 
-    stop_index, _ = search(list(page), closing_balance_index, -1, lambda x: x != "\n")
-    return stop_index
 
+def get_transaction_lines(transaction_pages: Iterable[str]):
+    layout = None
+    for page_string in transaction_pages:
+        page = PageText(page_string)
+        header_index = find_transaction_header(page)
+        if layout is None:
+            layout = get_transaction_layout(page, header_index)
 
-def get_transaction_section(page: str):
-    start_index = find_newline_after_transaction_header(page)
-    stop_index = find_transaction_stop_index(page)
+        for line in get_transaction_section(page, header_index):
+            row = layout.slice(line)
+            if any(row):
+                yield row
 
-    if stop_index == -1:
-        return page[start_index:]
-    return page[start_index:stop_index]
 
+def read_date(date_cell: str, month_range: MonthRange):
+    if len(date_cell) < 6:
+        return None
 
-def get_transaction_lines(transaction_pages: List[str]):
-    lines = []
+    month_value = get_month_value(date_cell[3:6])
+    if month_value is None:
+        return None
 
-    for page in transaction_pages:
-        section = get_transaction_section(page)
-        split_and_filtered = list(filter(lambda s: s != "", section.split("\n")))
-        trimmed = [s.strip() for s in split_and_filtered]
-        lines += trimmed
+    day = int(date_cell[0:2])
+    year = month_range.get_year_in_range(month_value)
+    return datetime(year, month_value, day)
 
-    return lines
 
+def join_aggregate(aggregate: Tuple[datetime, List[str], str, str]):
+    date, desc_parts, debit, credit = aggregate
+    return date, " ".join(desc_parts), debit, credit
 
-def aggregate_lines(lines: List[str], month_range: MonthRange):
-    aggregated: List[Tuple[datetime, str]] = []
+
+def aggregate_lines(rows: Iterable[List[str]], month_range: MonthRange):
     aggregate = None
 
-    for line in lines:
-        if len(line) >= 6:
-            month_section = line[3:6]
-            month_value = get_month_value(month_section)
-            if month_value is not None:
-                day = int(line[0:2])
-                year = month_range.get_year_in_range(month_value)
-                date = datetime(year, month_value, day)
-                if aggregate is not None:
-                    aggregated.append(aggregate)
-                aggregate = (date, line[6:].strip())
-                continue
+    for row in rows:
+        date = read_date(row[DATE_INDEX], month_range)
+        if date is not None:
+            if aggregate is not None:
+                yield join_aggregate(aggregate)
+            aggregate = (date, [], "", "")
 
         if aggregate is None:
             raise Exception("Expected Aggregate")
-        aggregate = (aggregate[0], aggregate[1] + " " + line)
+
+        # an amount may only appear on the last line of a wrapped description
+        date, desc_parts, debit, credit = aggregate
+        if row[DESCRIPTION_INDEX] != "":
+            desc_parts.append(row[DESCRIPTION_INDEX])
+        aggregate = (
+            date,
+            desc_parts,
+            debit or row[DEBIT_INDEX],
+            credit or row[CREDIT_INDEX],
+        )
+
     if aggregate is not None:
-        aggregated.append(aggregate)
-    return aggregated
+        yield join_aggregate(aggregate)
 
 
 def parse_possible_dollar_signed_number(s: str):
     return parse_money(s.replace("$", ""))
 
 
-def parse_amount_and_type(value: float, desc: str):
+def parse_amount_and_type(value: int, desc: str):
     if "Salary" in desc:
         return value, TransactionType.Salary
 
@@ -230,37 +249,35 @@ def parse_amount_and_type(value: float, desc: str):
     return value, TransactionType.Credit
 
 
-def get_transactions(aggregated: List[Tuple[datetime, str]]):
-    transactions = []
+def get_transactions(aggregated: Iterable[Tuple[datetime, str, str, str]]):
     for item in aggregated:
-        date, full_str = item
+        date, desc, debit, credit = item
 
-        chunks = list(filter(lambda x: x != "", full_str.split("  ")))
-        trimmed = [s.strip() for s in chunks]
+        if debit != "":
+            value = -parse_possible_dollar_signed_number(debit)
+        elif credit != "":
+            value = parse_possible_dollar_signed_number(credit)
+        else:
+            raise Exception(f"Expected amount for {desc}")
 
-        multiplier = -1
-        if len(trimmed) == 3:
-            multiplier = 1
-
-        value = multiplier * parse_possible_dollar_signed_number(trimmed[1])
-        desc = trimmed[0]
         amount, type = parse_amount_and_type(value, desc)
-        transactions.append(Transaction(date, amount, type, desc))
+        yield Transaction(date, amount, type, desc)
 
-    return transactions
 
+def get_data(document: Document, month_range: MonthRange):
+    page_data = get_page_data(document)
+    # one keyword scan per page serves both the validation and transaction pages
+    page_labels = CLASSIFIER.classify_pages(page_data)
+    validation_data = get_validation_data(page_data, page_labels)
 
-def get_data(reader: PdfReader, month_range: MonthRange):
-    page_data = get_page_data(reader)
+    transaction_pages = get_transaction_pages(page_data, page_labels)
+    lines = get_transaction_lines(transaction_pages)
+    # the first aggregate is the opening balance
+    aggregated = islice(aggregate_lines(lines, month_range), 1, None)
+    yield from validated(get_transactions(aggregated), validation_data)
 
-    validation_data = get_validation_data(page_data)
 
-    transaction_pages = get_transaction_pages(page_data)
-    lines = get_transaction_lines(transaction_pages)
-    aggregated = aggregate_lines(lines, month_range)
-    transactions = get_transactions(aggregated[1:])
-    validation_data.check(transactions)
-    return transactions
+SOURCES = [Source("commbank", SUFFIX, get_month_range, get_data)]
 
 
 def handle_commbank():
@@ -1,100 +1,94 @@
-from typing import Dict, List, Tuple
-from pypdf import PdfReader
+from typing import Iterable, List, Sequence, Tuple
 from datetime import datetime
 
+from lib.ColumnLayout import ColumnLayout, get_header_names
+from lib.Document import Document
 from lib.MonthRange import MonthRange
+from lib.PageClassifier import PageClassifier, PageLabel
+from lib.PageText import PageText
 from lib.dates import (
     format_date,
     get_month_abbreviation,
     get_month_value,
 )
-from lib.files import manage_files
-from lib.json_config import get_suffix, get_password
-
-from lib.floats import float_close
-from lib.printing import blue_print, valid_print
+from lib.files import get_layout_page_data, manage_files
+from lib.json_config import get_suffix
+from lib.printing import blue_print
+from lib.Source import Source
 from lib.transaction import Transaction, TransactionType, parse_money
-
+from lib.validation import (
+    Bucket,
+    StatementTotals,
+    StatementValidation,
+    get_buckets,
+    validated,
+)
 
 SUFFIX = get_suffix("hsbc")
-PASSWORD = get_password("hsbc")
+PASSWORD_KEY = "hsbc"
+
+CLASSIFIER = PageClassifier({PageLabel.EndOfStatement: ["END OF STATEMENT"]})
+
+
+BUCKETS = get_buckets(
+    Bucket.Credit,
+    {
+        TransactionType.CardPayment: Bucket.Debit,
+        TransactionType.TransferOut: Bucket.Debit,
+    },
+)
 
 
-class ValidationData:
-    def __init__(self, starting_balance, ending_parameters):
+class ValidationData(StatementValidation):
+    def __init__(self, starting_balance: int, ending_lines: List[str]):
+        super().__init__(BUCKETS, None)
         self.starting_balance = starting_balance
-        (closing_balance, total_debits, total_credits, debit_count, credit_count) = (
-            ending_parameters
+        # filled in once the lines after the transactions have been read
+        self.ending_lines = ending_lines
+
+    def get_totals(self):
+        closing_balance, total_debits, total_credits, debit_count, credit_count = (
+            get_ending_parameters(self.ending_lines)
         )
-        self.closing_balance = closing_balance
-        self.total_debits = total_debits
-        self.total_credits = total_credits
-        self.debit_count = debit_count
-        self.credit_count = credit_count
-
-        balance_difference = self.closing_balance - self.starting_balance
-        transaction_difference = self.total_credits - self.total_debits
-        assert float_close(balance_difference, transaction_difference)
-
-    def check(self, transactions: List[Transaction]):
-        change_in_balance: float = 0
-        debit_sum: float = 0
-        credit_sum: float = 0
-        debit_count: int = 0
-        credit_count: int = 0
-
-        for transaction in transactions:
-            change = transaction.amount
-
-            if transaction.type in [
-                TransactionType.CardPayment,
-                TransactionType.TransferOut,
-            ]:
-                change *= -1
-                debit_sum += transaction.amount
-                debit_count += 1
-            else:
-                credit_sum += transaction.amount
-                credit_count += 1
-
-            change_in_balance += change
-
-        assert debit_count == self.debit_count
-        valid_print(f"Debit Count: {debit_count} / {self.debit_count}")
-        assert credit_count == self.credit_count
-        valid_print(f"Credit Count: {credit_count} / {self.credit_count}")
-
-        assert float_close(debit_sum, self.total_debits)
-        valid_print(f"Debit Sum: {debit_sum:.2f} / {self.total_debits:.2f}")
-
-        assert float_close(credit_sum, self.total_credits)
-        valid_print(f"Debit Sum: {credit_sum:.2f} / {self.total_credits:.2f}")
-
-        expected_change = self.closing_balance - self.starting_balance
-        assert float_close(change_in_balance, expected_change)
-        valid_print(
-            f"Change In Balance: {change_in_balance:.2f} / {expected_change:.2f}"
+        return StatementTotals(
+            opening=self.starting_balance,
+            closing=closing_balance,
+            debits=total_debits,
+            credits=total_credits,
+            debit_count=debit_count,
+            credit_count=credit_count,
         )
 
 
-def get_page_text(reader: PdfReader):
-    return [page.extract_text(extraction_mode="layout") for page in reader.pages]
+def get_page_text(document: Document):
+    return get_layout_page_data(document)
 
 
 # first page contains no transaction data
 PAGE_START_INDEX = 1
 
 
-def get_final_page_index(page_text: List[str]):
-    for i in range(PAGE_START_INDEX, len(page_text)):
-        if "END OF STATEMENT" in page_text[i]:
-            return i
+def get_transaction_pages_text(pages_text: Sequence[str]):
+    for i in range(PAGE_START_INDEX, len(pages_text)):
+        yield pages_text[i]
+        if PageLabel.EndOfStatement in CLASSIFIER.classify(pages_text[i]):
+            return
     raise Exception("Could not find END OF STATEMENT")
 
 
-def get_transaction_pages_text(pages_text: List[str]):
-    final_index = get_final_page_index(pages_text)
-    return pages_text[PAGE_START_INDEX : final_index + 1]
+# the header names vary between statements, but always end with the
+# debit, credit and balance columns
+DATE_INDEX = 0
+DETAILS_INDEX = 1
+DEBIT_INDEX = -3
+CREDIT_INDEX = -2
+AMOUNT_OVERHANG = 4
+
+
+def get_transaction_layout(transaction_page: str):
+    header = PageText(transaction_page).line_at(transaction_page.find("Date"))
+    names = get_header_names(header)
+    return ColumnLayout.from_header(header, names, names[DEBIT_INDEX:], AMOUNT_OVERHANG)
 
 
 def get_transaction_text(transaction_page: str):
@@ -112,24 +106,21 @@ def get_transaction_text(transaction_page: str):
     return transaction_page[after_top_row_index : stop_index + 1]
 
 
-def get_transaction_lines(transaction_text: List[str]):
-    transactions = "\n".join(transaction_text)
-    first_newline = transactions.find("\n")
+def get_transaction_lines(transaction_text: Iterable[str], ending_lines: List[str]):
+    # the first line is the opening balance, everything from CLOSING BALANCE
+    # onwards is moved into ending_lines
+    for text in transaction_text:
+        closing_balance_index = text.find("CLOSING BALANCE")
+        if closing_balance_index != -1:
+            ending_lines += text[closing_balance_index:].split("\n")
+            text = text[: text.rfind("\n", 0, closing_balance_index) + 1]
 
-    starting_lines = transactions[:first_newline]
-    if first_newline == -1:
-        raise Exception("Newline expected")
+        for line in text.split("\n"):
+            if line != "":
+                yield line
 
-    closing_balance_index = transactions.find("CLOSING BALANCE")
-    ending_lines = transactions[closing_balance_index:]
-
-    while transactions[closing_balance_index] != "\n":
-        closing_balance_index -= 1
-
-    transaction_lines = transactions[first_newline:closing_balance_index].split("\n")
-    while "" in transaction_lines:
-        transaction_lines.remove("")
-    return starting_lines, transaction_lines, ending_lines
+        if closing_balance_index != -1:
+            return
 
 
 def get_last_item_as_money(line: str):
@@ -164,9 +155,7 @@ def get_transaction_counts(line: str):
     return int(separated[2]), int(separated[3])
 
 
-def get_ending_parameters(ending_lines: str):
-    lines = ending_lines.split("\n")
-
+def get_ending_parameters(lines: List[str]):
     closing_balance = get_closing_balance(lines[0])
     total_debits, total_credits = get_transaction_totals(lines[1])
     debit_count, credit_count = get_transaction_counts(lines[2])
@@ -174,12 +163,6 @@ def get_ending_parameters(ending_lines: str):
     return closing_balance, total_debits, total_credits, debit_count, credit_count
 
 
-def get_validation_data(starting_lines: str, ending_lines: str):
-    starting_balance = get_starting_balance(starting_lines)
-    ending_parameters = get_ending_parameters(ending_lines)
-    return ValidationData(starting_balance, ending_parameters)
-
-
 DATE_STRING_LENGTH = 6
 
 
@@ -207,30 +190,30 @@ def line_starts_with_date(line: str, month_range: MonthRange):
     )
 
 
-def group_by_dates(transaction_lines: List[str], month_range: MonthRange):
-    groups: Dict[datetime, List[str]] = {}
+def group_by_dates(
+    transaction_lines: Iterable[str], layout: ColumnLayout, month_range: MonthRange
+):
     current_date = None
+    group: List[List[str]] = []
 
     for line in transaction_lines:
-        process_data = line
-        date_result = line_starts_with_date(line, month_range)
+        row = layout.slice(line)
+        if not any(row):
+            continue
 
+        date_result = line_starts_with_date(row[DATE_INDEX], month_range)
         if date_result is not None:
-            (date, start_index) = date_result
-            current_date = date
-            process_data = line[start_index:]
-
-        transaction_start_index = 0
-        while process_data[transaction_start_index] == " ":
-            transaction_start_index += 1
+            if len(group) > 0:
+                yield current_date, group
+                group = []
+            current_date, _ = date_result
 
         if current_date is None:
             raise Exception("Should have an associated date")
-        arr = groups.get(current_date, [])
-        arr.append(process_data[transaction_start_index:])
-        groups[current_date] = arr
+        group.append(row)
 
-    return groups
+    if len(group) > 0:
+        yield current_date, group
 
 
 def format_description(split_desc: List[str]):
@@ -272,66 +255,40 @@ def reformat_transaction(
     return (desc, val, TransactionType.TransferIn)
 
 
-DESCRIPTION_CUTOFF = 60
-DEBIT_CUTOFF = 120
-CREDIT_CUTOFF = 160
-
-
-def extract_transaction_details(line: str):
-    split = line.split(" ")
-    if len(split) == 0:
-        raise Exception("Expected strings in payment line")
-    value = parse_money(split[-1])
-
-    if len(line) < DEBIT_CUTOFF:
-        value *= -1
-    description = " ".join(split[:-1]).strip()
-    return (description, value)
-
+def parse_row(row: List[str]):
+    description = row[DETAILS_INDEX]
+    if row[DEBIT_INDEX] != "":
+        return description, -1 * parse_money(row[DEBIT_INDEX])
+    if row[CREDIT_INDEX] != "":
+        return description, parse_money(row[CREDIT_INDEX])
+    return description, None
 
-def parse_line(payment_line: str):
-    payment_line = payment_line.strip()
-    if len(payment_line) < DESCRIPTION_CUTOFF:
-        return payment_line, None
-    if len(payment_line) < CREDIT_CUTOFF:
-        return extract_transaction_details(payment_line)
-    split = payment_line.split(" ")
-    if len(split) == 0:
-        raise Exception("Expected string in payment line")
-    backtrack_index = -2
-    while split[backtrack_index] == "":
-        backtrack_index -= 1
-    return extract_transaction_details(" ".join(split[: backtrack_index + 1]))
 
+def identify_transactions(payments: List[List[str]]):
+    active_transaction: Tuple[List[str], int] | None = None
 
-def identify_transactions(payments: List[str]):
-    active_transaction: Tuple[str, int] | None = None
-
-    transactions = []
+    transactions: List[Tuple[List[str], int]] = []
 
     for payment in payments:
-        (desc, value) = parse_line(payment)
+        desc, value = parse_row(payment)
         if value is None:
             if active_transaction is None:
                 raise Exception("Transaction should be defined")
-            (old_desc, trans_val) = active_transaction
-            new_desc = old_desc + " " + desc
-            active_transaction = (new_desc, trans_val)
+            active_transaction[0].append(desc)
         else:
             if active_transaction is not None:
                 transactions.append(active_transaction)
-            active_transaction = (desc, value)
+            active_transaction = ([desc], value)
 
     if active_transaction:
         transactions.append(active_transaction)
-    return transactions
+    return [(" ".join(desc_parts), value) for desc_parts, value in transactions]
 
 
-def get_month_range(reader: PdfReader):
-    if not reader.decrypt(PASSWORD):
-        raise Exception("PDF Not Decryptable")
+def get_month_range(document: Document):
+    document.decrypt_with_key(PASSWORD_KEY)
 
-    pages_text = get_page_text(reader)
+    pages_text = get_page_text(document)
     for page_text in pages_text:
         lines = page_text.split("\n")
         for line in lines:
@@ -354,30 +311,41 @@ def get_month_range(reader: PdfReader):
     raise Exception("Expected Month Range")
 
 
-def get_pdf_data(reader: PdfReader, month_range: MonthRange):
-    if not reader.decrypt(PASSWORD):
-        raise Exception("PDF Not Decryptable")
+def get_pdf_data(document: Document, month_range: MonthRange):
+    document.decrypt_with_key(PASSWORD_KEY)
+
+    pages_text = get_page_text(document)
+    layout = get_transaction_layout(pages_text[PAGE_START_INDEX])
+    transaction_text = map(get_transaction_text, get_transaction_pages_text(pages_text))
+
+    ending_lines: List[str] = []
+    transaction_lines = get_transaction_lines(transaction_text, ending_lines)
+    starting_line = next(transaction_lines, None)
+    if starting_line is None:
+        raise Exception("Newline expected")
+    validation_data = ValidationData(get_starting_balance(starting_line), ending_lines)
+
+    aggregated = aggregate_transactions(transaction_lines, layout, month_range)
+    yield from validated(get_transactions(aggregated, month_range), validation_data)
+
 
-    pages_text = get_page_text(reader)
-    transaction_pages_text = get_transaction_pages_text(pages_text)
-    transaction_text = [get_transaction_text(page) for page in transaction_pages_text]
-    start, transaction_lines, end = get_transaction_lines(transaction_text)
-    validation_data = get_validation_data(start, end)
-    date_groups = group_by_dates(transaction_lines, month_range)
+def aggregate_transactions(
+    transaction_lines: Iterable[str], layout: ColumnLayout, month_range: MonthRange
+):
+    for date, payments in group_by_dates(transaction_lines, layout, month_range):
+        for transaction in identify_transactions(payments):
+            yield date, transaction
 
-    parsed_transactions: List[Transaction] = []
 
-    for date in date_groups.keys():
-        payments = date_groups[date]
-        transactions = identify_transactions(payments)
-        formatted = [reformat_transaction(t, month_range) for t in transactions]
-        for item in formatted:
-            (desc, val, type) = item
-            parsed_transactions.append(Transaction(date, val, type, desc))
+def get_transactions(
+    aggregated: Iterable[Tuple[datetime, Tuple[str, int]]], month_range: MonthRange
+):
+    for date, transaction in aggregated:
+        desc, val, type = reformat_transaction(transaction, month_range)
+        yield Transaction(date, val, type, desc)
 
-    validation_data.check(parsed_transactions)
 
-    return parsed_transactions
+SOURCES = [Source("hsbc", SUFFIX, get_month_range, get_pdf_data)]
 
 
 def handle_hsbc():
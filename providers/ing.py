@@ -1,51 +1,46 @@
 from datetime import datetime
-from typing import List
-from pypdf import PdfReader
+from typing import Iterable, List, Tuple
+from lib.ColumnLayout import ColumnLayout
+from lib.Document import Document
 from lib.MonthRange import MonthRange
-from lib.files import manage_files
+from lib.files import get_layout_page_data, manage_files
 from lib.json_config import get_suffix
-from lib.floats import float_close
 from lib.printing import blue_print, valid_print
-from lib.search import search
+from lib.PageClassifier import PageClassifier, PageLabel
+from lib.PageText import PageText
+from lib.Source import Source
 from lib.transaction import Transaction, TransactionType, parse_money
-
+from lib.validation import (
+    Bucket,
+    StatementTotals,
+    StatementValidation,
+    get_buckets,
+    validated,
+)
 
 SUFFIX_EVERYDAY = get_suffix("ing-everyday")
 SUFFIX_SAVINGS = get_suffix("ing-savings")
 
+CLASSIFIER = PageClassifier({PageLabel.Transaction: ["Money out $", "Money in $"]})
 
-class ValidationData:
-    def __init__(self, numbers: List[float]):
-        self.opening = numbers[0]
-        self.credits = numbers[1]
-        self.debits = -1 * numbers[2]
-        self.closing = numbers[3]
-
-    def check(self, transactions: List[Transaction]):
-        debits = 0.0
-        credits = 0.0
-        interest = 0.0
-
-        for transaction in transactions:
-            if transaction.type in [TransactionType.TransferIn, TransactionType.Credit]:
-                credits += transaction.amount
-            elif transaction.type == TransactionType.Interest:
-                interest += transaction.amount
-            else:
-                debits += transaction.amount
-
-        balance_diff = self.closing - self.opening
-        change = self.credits - self.debits
-
-        assert float_close(balance_diff, change + interest)
-        valid_print(f"Difference in Balance: {balance_diff:.2f} / {change:.2f}")
-        valid_print(f"Interest: {interest:.2f}")
+# the details column is empty on dated rows, so it is folded into the date
+TRANSACTION_COLUMNS = ["Date", "Money out $", "Money in $", "Balance $"]
+DATE_INDEX = 0
+MONEY_OUT_INDEX = 1
+MONEY_IN_INDEX = 2
+BALANCE_INDEX = 3
+AMOUNT_OVERHANG = 4
 
-        assert float_close(credits, self.credits)
-        valid_print(f"Difference in Credits: {credits:.2f} / {self.credits:.2f}")
 
-        assert float_close(debits, self.debits)
-        valid_print(f"Difference in Debits: {debits:.2f} / {self.debits:.2f}")
+# interest is paid into the account but left out of the money in total
+BUCKETS = get_buckets(
+    Bucket.Debit,
+    {
+        TransactionType.TransferIn: Bucket.Credit,
+        TransactionType.Credit: Bucket.Credit,
+        TransactionType.Interest: Bucket.UntotalledCredit,
+    },
+)
 
 
 def get_validation_line(first_page: str):
@@ -66,7 +61,13 @@ def get_validation_numbers(line: str):
 def get_validation_data(first_page: str):
     validation_line = get_validation_line(first_page)
     numbers = get_validation_numbers(validation_line)
-    return ValidationData(numbers)
+    totals = StatementTotals(
+        opening=numbers[0],
+        closing=numbers[3],
+        debits=-1 * numbers[2],
+        credits=numbers[1],
+    )
+    return StatementValidation(BUCKETS, totals)
 
 
 def get_month_string(first_page: str):
@@ -82,18 +83,12 @@ def convert_ddmmyyyy(ddmmyyyy: str):
     return datetime(int(year_value), int(month_value), 1)
 
 
-def get_transaction_pages(page_data: List[str]):
-    pages = []
-    for page in page_data:
-        if "Money out $" in page and "Money in $" in page:
-            pages.append(page)
-    return pages
+def get_transaction_pages(page_data: Iterable[str]):
+    return CLASSIFIER.select(page_data, PageLabel.Transaction)
 
 
-def get_transaction_lines(transaction_pages: List[str]):
-    transaction_lines = []
-    for i in range(len(transaction_pages)):
-        page = transaction_pages[i]
+def get_transaction_lines(transaction_pages: Iterable[str]):
+    for page in transaction_pages:
         balance_index = page.find("Balance $")
         start_index = page.find("\n", balance_index) + 1
 
@@ -106,12 +101,20 @@ def get_transaction_lines(transaction_pages: List[str]):
 
         if end_index == -1:
             end_index = page.find("Statement continued over")
-        end_index, _ = search(list(page), end_index, -1, lambda x: x != "\n")
-        transaction_lines += list(
-            filter(lambda x: x != "", page[start_index:end_index].split("\n"))
-        )
+        end_index = PageText(page).previous_newline(end_index)
+        for line in page[start_index:end_index].split("\n"):
+            if line != "":
+                yield line
 
-    return transaction_lines
+
+def get_transaction_layout(transaction_page: str):
+    header = PageText(transaction_page).line_at(transaction_page.find("Balance $"))
+    return ColumnLayout.from_header(
+        header,
+        TRANSACTION_COLUMNS,
+        TRANSACTION_COLUMNS[MONEY_OUT_INDEX:],
+        AMOUNT_OVERHANG,
+    )
 
 
 def extract_desc_from_item(last_item: str):
@@ -120,21 +123,21 @@ def extract_desc_from_item(last_item: str):
     return last_item[start_index:]
 
 
-def read_line_data(line: str):
+def read_line_data(line: str, layout: ColumnLayout):
     trimmed = line.strip()
     if len(trimmed) < 3 or trimmed[2] != "/":
         return None, trimmed, None, None
 
-    split_and_filtered = list(filter(lambda x: x != "", trimmed.split("  ")))
-    stripped = [s.strip() for s in split_and_filtered]
+    row = layout.slice(line)
 
-    date = datetime.strptime(stripped[0], "%d/%m/%Y")
-    value = parse_money(stripped[1])
-    transaction_desc = extract_desc_from_item(stripped[2])
+    date = datetime.strptime(row[DATE_INDEX], "%d/%m/%Y")
+    value = parse_money(row[MONEY_OUT_INDEX] or row[MONEY_IN_INDEX])
+    # the transaction type is rendered straight after the balance
+    transaction_desc = extract_desc_from_item(row[BALANCE_INDEX])
     return date, None, value, transaction_desc
 
 
-def get_type_and_amount(amount: float, transaction_desc: str):
+def get_type_and_amount(amount: int, transaction_desc: str):
     if "Interest" in transaction_desc:
         return TransactionType.Interest, amount
 
@@ -148,49 +151,60 @@ def get_type_and_amount(amount: float, transaction_desc: str):
     return TransactionType.Credit, amount
 
 
-def get_transactions(lines: List[str]):
+def format_transaction(data: Tuple[datetime, List[str], int, str]):
+    type, amount = get_type_and_amount(data[2], data[3])
+    return Transaction(data[0], amount, type, " ".join(data[1]))
+
 
+def aggregate_lines(lines: Iterable[str], layout: ColumnLayout):
     data = None
-    transactions: List[Transaction] = []
 
     for line in lines:
-        date, desc, value, transaction_desc = read_line_data(line)
+        date, desc, value, transaction_desc = read_line_data(line, layout)
 
         if desc is not None:
             if data is None:
                 raise Exception("Expected nonzero data")
-            data = (data[0], data[1] + " " + desc, data[2], data[3])
+            data[1].append(desc)
         else:
             if data is not None:
-                type, amount = get_type_and_amount(data[2], data[3])
-                transactions.append(Transaction(data[0], amount, type, data[1]))
-            data = (date, "", value, transaction_desc)
+                yield data
+            data = (date, [], value, transaction_desc)
 
     if data is not None:
-        type, amount = get_type_and_amount(data[2], data[3])
-        transactions.append(Transaction(data[0], amount, type, data[1]))
+        yield data
 
-    return transactions
 
+def get_transactions(lines: Iterable[str], layout: ColumnLayout):
+    for data in aggregate_lines(lines, layout):
+        yield format_transaction(data)
 
-def get_month_range(reader: PdfReader):
-    first_page = reader.pages[0].extract_text(extraction_mode="layout")
+
+def get_month_range(document: Document):
+    first_page = document.get_page_text(0)
     month_string = get_month_string(first_page)
     dates = month_string.split(" to ")
     return MonthRange(convert_ddmmyyyy(dates[0]), convert_ddmmyyyy(dates[1]))
 
 
-def get_data(reader: PdfReader, month_range: MonthRange):
-    page_data = [page.extract_text(extraction_mode="layout") for page in reader.pages]
+def get_data(document: Document, month_range: MonthRange):
+    page_data = get_layout_page_data(document)
     validation_data = get_validation_data(page_data[0])
 
-    transaction_pages = get_transaction_pages(page_data)
-    transaction_lines = get_transaction_lines(transaction_pages)
-    transactions = get_transactions(transaction_lines)
+    transactions: Iterable[Transaction] = []
+    first_page = next(get_transaction_pages(page_data), None)
+    if first_page is not None:
+        layout = get_transaction_layout(first_page)
+        transaction_lines = get_transaction_lines(get_transaction_pages(page_data))
+        transactions = get_transactions(transaction_lines, layout)
+
+    yield from validated(transactions, validation_data)
 
-    validation_data.check(transactions)
 
-    return transactions
+SOURCES = [
+    Source("ing-everyday", SUFFIX_EVERYDAY, get_month_range, get_data),
+    Source("ing-savings", SUFFIX_SAVINGS, get_month_range, get_data),
+]
 
 
 def handle_ing():
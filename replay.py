@@ -0,0 +1,78 @@
+from contextlib import redirect_stdout
+import csv
+import difflib
+import io
+import os
+import sys
+import time
+from typing import List
+
+from lib.TextDocument import TextDocument
+from lib.fixtures import get_fixture_names, read_fixture
+from lib.printing import blue_print, error_print, valid_print
+from lib.registry import Provider, get_providers, parse_provider_names
+from lib.transaction import Transaction
+
+
+def transactions_to_lines(transactions: List[Transaction]):
+    # written the same way as lib.files so the text compares exactly
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Date", "Description", "Amount", "Type"])
+    writer.writerows(t.to_data() for t in transactions)
+    return buffer.getvalue().splitlines()
+
+
+def read_csv_lines(csv_path: str):
+    with open(csv_path, newline="") as file:
+        return file.read().splitlines()
+
+
+def replay_fixture(provider: Provider, filename: str):
+    source = provider.load()
+    month_range, pages = read_fixture(provider.suffix, filename)
+    transactions = source.get_data(TextDocument(pages), month_range)
+    return transactions_to_lines(transactions)
+
+
+def replay_provider(provider: Provider):
+    blue_print(provider.key)
+    failures = 0
+    for filename in get_fixture_names(provider.suffix):
+        name = filename[: -len(".json")]
+        csv_path = os.path.join(provider.suffix, name + ".csv")
+        if not os.path.isfile(csv_path):
+            error_print(f"{name} has no csv to compare against")
+            failures += 1
+            continue
+
+        start = time.perf_counter()
+        try:
+            # the parsers' validation output is noise when replaying
+            with redirect_stdout(io.StringIO()):
+                actual = replay_fixture(provider, filename)
+        except Exception as e:
+            error_print(f"{name} failed: {e}")
+            failures += 1
+            continue
+        milliseconds = (time.perf_counter() - start) * 1000
+
+        expected = read_csv_lines(csv_path)
+        diff = list(difflib.unified_diff(expected, actual, name + ".csv", "replay"))
+        if len(diff) > 0:
+            error_print(f"{name} differs ({milliseconds:.1f}ms)")
+            for line in diff:
+                print(line)
+            failures += 1
+        else:
+            valid_print(f"{name} matches ({milliseconds:.1f}ms)")
+    return failures
+
+
+if __name__ == "__main__":
+    providers = get_providers(parse_provider_names(sys.argv[1:]))
+    failures = sum(replay_provider(provider) for provider in providers)
+    if failures > 0:
+        error_print(f"{failures} statements differ")
+        sys.exit(1)
+    valid_print("All statements match")
@@ -0,0 +1,67 @@
+import sys
+from typing import List
+
+from lib.Rollup import Rollup
+from lib.categorise import Category
+from lib.printing import blue_print, valid_print, warning_print
+from lib.strings import cents_to_money_str, pad_string
+from lib.transaction import AMNT_WIDTH
+
+OUTPUT_PATH = "data"
+
+
+def parse_year(args: List[str]):
+    if len(args) > 0 and args[-1].isdigit():
+        return int(args[-1]), args[:-1]
+    return None, args
+
+
+def parse_category(words: List[str]):
+    text = " ".join(words).lower()
+    for category in Category:
+        if text in [category.value.lower(), category.name.lower()]:
+            return category
+    raise Exception(f"Unknown category {' '.join(words)}")
+
+
+def print_row(label: str, cents: int):
+    print(label + pad_string(cents_to_money_str(cents), AMNT_WIDTH))
+
+
+def print_category(rollup: Rollup, category: Category, year: int | None):
+    blue_print(f"{category.value} per month")
+    totals = rollup.totals_by_month([category], year)
+    for month_key, (cents, count) in totals.items():
+        print_row(f"{month_key} {count:>5}", cents)
+    valid_print(f"Total: {cents_to_money_str(sum(c for c, _ in totals.values()))}")
+
+
+def print_transfers(rollup: Rollup, year: int | None):
+    blue_print("Transfer difference (+) by account")
+    transfers_in = rollup.totals_by_source([Category.TransferIn], year)
+    transfers_out = rollup.totals_by_source([Category.TransferOut], year)
+    for source in transfers_in.keys():
+        print_row(f"{source:<20}", transfers_in[source] - transfers_out[source])
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    command = args[0] if len(args) > 0 else "info"
+    year, rest = parse_year(args[1:])
+
+    rollup = Rollup(OUTPUT_PATH)
+    if not rollup.is_current():
+        warning_print("rollup predates the current rules, run organise.py again")
+
+    if command == "category":
+        print_category(rollup, parse_category(rest), year)
+    elif command == "transfers":
+        print_transfers(rollup, year)
+    elif command == "info":
+        months = rollup.get_month_keys()
+        sources = len(rollup.get_sources())
+        valid_print(f"{len(months)} months from {sources} sources in {rollup.path}")
+    else:
+        raise Exception(
+            f"Unknown command {command}, expected category, transfers or info"
+        )
@@ -1,16 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
 import os
 import sys
-from typing import List
+from typing import List, Tuple
 
+from lib.Folder import Folder, history_is_current
+from lib.HistoryStore import HistoryStore
 from lib.SingleMonthRange import SingleMonthRange
 from lib.TransactionGroups import parse_transaction_groups
-from lib.transaction import get_transactions_in_csv
+from lib.TransactionTable import TransactionTable, csv_has_current_categories
+from lib.json_config import get_json
+from lib.printing import warning_print
+
+# financial years run July to June and are named by the year they end in
+FINANCIAL_YEAR_START_MONTH = 7
+
+
+def get_months_between(first: SingleMonthRange, last: SingleMonthRange):
+    if (first.year, first.month) > (last.year, last.month):
+        raise Exception(f"{first.to_string()} is after {last.to_string()}")
+
+    months = [first]
+    while months[-1] != last:
+        months.append(months[-1].get_incremented_copy(1))
+    return months
 
 
 def parse_args(args: List[str]):
-    year = int(args[0])
-    month = int(args[1])
-    return year, month
+    if len(args) == 2 and args[0] == "fy":
+        end_year = int(args[1])
+        first = SingleMonthRange(month=FINANCIAL_YEAR_START_MONTH, year=end_year - 1)
+        last = SingleMonthRange(month=FINANCIAL_YEAR_START_MONTH - 1, year=end_year)
+        return get_months_between(first, last)
+
+    if len(args) == 1:
+        year = int(args[0])
+        first = SingleMonthRange(month=1, year=year)
+        return get_months_between(first, SingleMonthRange(month=12, year=year))
+
+    if len(args) == 2:
+        return [SingleMonthRange(month=int(args[1]), year=int(args[0]))]
+
+    if len(args) == 4:
+        first = SingleMonthRange(month=int(args[1]), year=int(args[0]))
+        last = SingleMonthRange(month=int(args[3]), year=int(args[2]))
+        return get_months_between(first, last)
+
+    raise Exception(
+        "Expected year month, year month year month, year or fy year, got "
+        + " ".join(args)
+    )
 
 
 def get_transaction_csv_path(year: int, month: int):
@@ -19,9 +57,54 @@ def get_transaction_csv_path(year: int, month: int):
     return os.path.join("data", f"{filename}.csv")
 
 
+def load_month(month: SingleMonthRange, store: HistoryStore | None):
+    path = get_transaction_csv_path(month.year, month.month)
+    # a month organise has not written is skipped, even with the store current
+    if not os.path.isfile(path):
+        return None
+
+    # categorised under the current rules, nothing has to be recategorised
+    if csv_has_current_categories(path):
+        return TransactionTable.from_csv(path)
+
+    # the history store holds the same rows as the monthly csv, in the same
+    # order, whenever it is up to date with every source
+    if store is not None:
+        month_range = month.to_month_range()
+        transactions = store.get_transactions_between_dates(month_range)
+        return TransactionTable.from_transactions(transactions)
+
+    return TransactionTable.from_csv(path)
+
+
+def load_months(months: List[SingleMonthRange]):
+    store = HistoryStore()
+    suffixes: dict = get_json("suffixes.json")
+    folders = [Folder(path) for path in suffixes.values()]
+    current_store = store if history_is_current(store, folders) else None
+
+    workers = min(len(months), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        tables = list(executor.map(lambda m: load_month(m, current_store), months))
+
+    loaded = []
+    for month, table in zip(months, tables):
+        if table is None:
+            warning_print(f"{month.to_string()} has no transactions csv, skipped")
+            continue
+        loaded.append((month.to_string(), table))
+    return loaded
+
+
+def merge_tables(months: List[Tuple[str, TransactionTable]]):
+    merged = TransactionTable()
+    for _, table in months:
+        merged.extend(table)
+    return merged
+
+
 if __name__ == "__main__":
-    year, month = parse_args(sys.argv[1:])
-    path = get_transaction_csv_path(year, month)
-    transactions = get_transactions_in_csv(path)
-    transaction_groups = parse_transaction_groups(transactions)
+    months = load_months(parse_args(sys.argv[1:]))
+    table = merge_tables(months)
+    transaction_groups = parse_transaction_groups(table, months)
     transaction_groups.print_comprehensive_summary()
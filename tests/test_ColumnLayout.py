@@ -0,0 +1,67 @@
+from lib.ColumnLayout import ColumnLayout, get_header_names
+
+HEADER = "Date    Description              Debits ($)   Credits ($)   Balance ($)"
+NAMES = ["Date", "Description", "Debits ($)", "Credits ($)", "Balance ($)"]
+AMOUNTS = ["Debits ($)", "Credits ($)", "Balance ($)"]
+
+
+def make_row(date: str, desc: str, debit: str, credit: str, balance: str):
+    return (
+        date.ljust(8)
+        + desc.ljust(25)
+        + debit.rjust(10)
+        + credit.rjust(14)
+        + balance.rjust(14)
+    )
+
+
+def test_header_names():
+    assert get_header_names(HEADER) == NAMES
+
+
+def test_slice_rows():
+    layout = ColumnLayout.from_header(HEADER, NAMES, AMOUNTS)
+
+    debit = make_row("01-Jan", "Coffee shop", "-4.50", "", "100.00")
+    assert layout.slice(debit) == ["01-Jan", "Coffee shop", "-4.50", "", "100.00"]
+
+    credit = make_row("02-Jan", "Salary", "", "1,000.00", "1,100.00")
+    assert layout.slice(credit) == ["02-Jan", "Salary", "", "1,000.00", "1,100.00"]
+
+    continuation = make_row("", "Melbourne", "", "", "")
+    assert layout.slice(continuation) == ["", "Melbourne", "", "", ""]
+
+
+def test_overhang():
+    header = "Date    Transaction    Debit  Credit"
+    row = "01 Jan  Rent        1,200.00"
+    names = ["Date", "Transaction", "Debit", "Credit"]
+
+    layout = ColumnLayout.from_header(header, names, ["Debit", "Credit"], overhang=3)
+    assert layout.slice(row) == ["01 Jan", "Rent", "1,200.00", ""]
+    assert layout.get_index("Credit") == 3
+
+
+def test_long_description_beside_amounts():
+    header = "Date    Transaction                    Debit  Credit"
+    names = ["Date", "Transaction", "Debit", "Credit"]
+    layout = ColumnLayout.from_header(header, names, ["Debit", "Credit"], overhang=4)
+
+    def make_row(desc: str, debit: str):
+        return ("01 Jan  " + desc).ljust(44 - len(debit)) + debit
+
+    # trailing digits inside the overhang stay with the description
+    row = make_row("Transfer to Joe Smith Bank 1234", "")
+    assert layout.slice(row) == ["01 Jan", "Transfer to Joe Smith Bank 1234", "", ""]
+
+    row = make_row("Direct Debit ANYTIME FITNESS", "19.95")
+    assert layout.slice(row)[1:3] == ["Direct Debit ANYTIME FITNESS", "19.95"]
+
+    # an amount wider than its header still starts inside the overhang
+    row = make_row("Rent", "1,850.00")
+    assert layout.slice(row)[1:3] == ["Rent", "1,850.00"]
+
+    # a word running from before the overhang under the headers is text
+    row = make_row("Payment to Commonwealth Superannuation", "")
+    desc = "Payment to Commonwealth Superannuation"
+    assert layout.slice(row) == ["01 Jan", desc, "", ""]
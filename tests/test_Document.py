@@ -0,0 +1,60 @@
+from pypdf import PdfWriter
+
+from lib import page_cache
+from lib.Document import EXTRACTION_MODE, Document
+from lib.page_cache import hash_file, write_entry
+
+
+def write_blank_pdf(path: str, pages: int):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    with open(path, "wb") as file:
+        writer.write(file)
+
+
+def test_page_text_memoised(tmp_path):
+    path = str(tmp_path / "blank.pdf")
+    write_blank_pdf(path, 2)
+
+    document = Document(path, use_cache=False)
+    assert document.page_count() == 2
+
+    document.page_text[1] = "cached"
+    assert document.get_page_text(1) == "cached"
+    assert 0 not in document.page_text
+    document.close()
+
+
+def test_cached_pages_skip_reader(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "CACHE_PATH", str(tmp_path / "cache"))
+    path = str(tmp_path / "blank.pdf")
+    write_blank_pdf(path, 2)
+    write_entry(hash_file(path), EXTRACTION_MODE, 2, {0: "first", 1: "second"})
+
+    document = Document(path)
+    assert document.page_count() == 2
+    assert document.get_page_text(1) == "second"
+    assert document.reader is None
+    document.close()
+
+
+def test_lazy_pages_extract_on_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "CACHE_PATH", str(tmp_path / "cache"))
+    path = str(tmp_path / "blank.pdf")
+    write_blank_pdf(path, 3)
+    write_entry(hash_file(path), EXTRACTION_MODE, 3, {0: "a", 1: "b", 2: "c"})
+
+    document = Document(path)
+    pages = document.get_pages()
+    requested = []
+    get_page_text = document.get_page_text
+    document.get_page_text = lambda i: requested.append(i) or get_page_text(i)
+
+    assert len(pages) == 3
+    assert pages[-1] == "c"
+    assert pages[1:] == ["b", "c"]
+    for page in pages:
+        if page == "a":
+            break
+    assert requested == [2, 1, 2, 0]
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from lib.Folder import Folder
+from lib.MonthRange import MonthRange
+from lib.files import transactions_to_csv
+from lib.transaction import Transaction, TransactionType
+
+
+def make_transactions(dates):
+    return [
+        Transaction(date, 100, TransactionType.CardPayment, f"SHOP {i}")
+        for i, date in enumerate(dates)
+    ]
+
+
+def month(year: int, month: int, last_day: int):
+    return MonthRange(datetime(year, month, 1), datetime(year, month, last_day))
+
+
+def setup_folder(tmp_path):
+    transactions_to_csv(
+        str(tmp_path),
+        "2023-11 to 2024-01.csv",
+        make_transactions([datetime(2024, 1, 9), datetime(2023, 11, 3)]),
+    )
+    transactions_to_csv(
+        str(tmp_path),
+        "2024-02 to 2024-02.csv",
+        make_transactions([datetime(2024, 2, 1), datetime(2024, 2, 29)]),
+    )
+    transactions_to_csv(
+        str(tmp_path),
+        "2024-04 to 2024-06.csv",
+        make_transactions([datetime(2024, 5, 5)]),
+    )
+    return Folder(str(tmp_path))
+
+
+def test_interval_lookup(tmp_path):
+    folder = setup_folder(tmp_path)
+
+    def names(query_range: MonthRange):
+        statements = folder.get_statements_between_dates(query_range)
+        return [s.filename for s in statements]
+
+    assert names(month(2023, 12, 31)) == ["2023-11 to 2024-01.csv"]
+    assert names(month(2024, 2, 29)) == ["2024-02 to 2024-02.csv"]
+    assert names(month(2024, 3, 31)) == []
+    assert names(MonthRange(datetime(2024, 1, 31), datetime(2024, 4, 1))) == [
+        "2023-11 to 2024-01.csv",
+        "2024-02 to 2024-02.csv",
+        "2024-04 to 2024-06.csv",
+    ]
+    assert names(month(2025, 1, 31)) == []
+
+
+def test_queries_load_each_statement_once(tmp_path):
+    folder = setup_folder(tmp_path)
+
+    january = folder.get_transactions_between_dates(month(2024, 1, 31))
+    assert [t.description for t in january] == ["SHOP 0"]
+    november = folder.get_transactions_between_dates(month(2023, 11, 30))
+    assert [t.description for t in november] == ["SHOP 1"]
+
+    loaded = folder.rows["2023-11 to 2024-01.csv"]
+    folder.get_transactions_between_dates(month(2023, 12, 31))
+    assert folder.rows["2023-11 to 2024-01.csv"] is loaded
+    assert list(folder.rows.keys()) == ["2023-11 to 2024-01.csv"]
+
+    february = folder.get_transactions_between_dates(month(2024, 2, 29))
+    assert [t.date.day for t in february] == [1, 29]
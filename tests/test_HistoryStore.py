@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from lib.HistoryStore import HistoryStore
+from lib.MonthRange import MonthRange
+from lib.transaction import Transaction, TransactionType
+
+JANUARY = [
+    Transaction(datetime(2024, 1, 2), 1010, TransactionType.CardPayment, "COLES"),
+    Transaction(datetime(2024, 1, 20), -500, TransactionType.Credit, "REFUND"),
+]
+FEBRUARY = [
+    Transaction(datetime(2024, 2, 1), 20, TransactionType.CardPayment, "COLES"),
+    Transaction(datetime(2024, 2, 9), 1500, TransactionType.Investment, "COMMSEC"),
+]
+SAVINGS = [
+    Transaction(datetime(2024, 1, 20), 5000, TransactionType.TransferIn, "Savings"),
+    Transaction(datetime(2024, 3, 1), 7, TransactionType.Interest, "Interest"),
+]
+
+JANUARY_RANGE = MonthRange(datetime(2024, 1, 1), datetime(2024, 1, 31))
+ALL_RANGE = MonthRange(datetime(2023, 1, 1), datetime(2025, 1, 1))
+
+
+def to_strings(transactions):
+    return [str(t) for t in transactions]
+
+
+def test_write_and_slice(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    assert not store.exists()
+    assert store.get_transactions_between_dates(ALL_RANGE) == []
+
+    store.write(
+        {
+            "Everyday": ({"a.csv": [1, 2]}, JANUARY + FEBRUARY),
+            "Savings": ({"b.csv": [3, 4]}, SAVINGS),
+        }
+    )
+    reopened = HistoryStore(str(tmp_path))
+    assert len(reopened) == 6
+    assert reopened.index.months == {
+        "2024-01": [0, 3],
+        "2024-02": [3, 5],
+        "2024-03": [5, 6],
+    }
+    assert reopened.is_current("Savings", {"b.csv": [3, 4]})
+    assert not reopened.is_current("Savings", {"b.csv": [3, 5]})
+
+    assert to_strings(reopened.get_transactions_between_dates(JANUARY_RANGE)) == (
+        to_strings(JANUARY + SAVINGS[:1])
+    )
+    assert to_strings(
+        reopened.get_transactions_between_dates(ALL_RANGE, "Everyday")
+    ) == to_strings(JANUARY + FEBRUARY)
+
+    partial = MonthRange(datetime(2024, 1, 10), datetime(2024, 2, 5))
+    assert len(reopened.slice(partial)) == 3 * 24
+    reopened.close()
+
+
+def test_append(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.write({"Everyday": ({"a.csv": [1, 2]}, JANUARY)})
+
+    assert not store.append("Savings", {"b.csv": [3, 4]}, SAVINGS)
+    assert store.append("Everyday", {"a.csv": [1, 2], "c.csv": [5, 6]}, FEBRUARY)
+
+    reopened = HistoryStore(str(tmp_path))
+    assert reopened.index.months["2024-02"] == [2, 4]
+    assert reopened.descriptions == ["COLES", "REFUND", "COMMSEC"]
+    assert to_strings(reopened.get_transactions_between_dates(ALL_RANGE)) == (
+        to_strings(JANUARY + FEBRUARY)
+    )
+    assert reopened.is_current("Everyday", {"a.csv": [1, 2], "c.csv": [5, 6]})
@@ -0,0 +1,61 @@
+from datetime import datetime
+import os
+
+from lib import Manifest as manifest_module
+from lib.Manifest import PARSING_MODULES, Manifest, get_parser_version
+from lib.MonthRange import MonthRange
+from lib.page_cache import hash_file
+
+MONTH_RANGE = MonthRange(datetime(2024, 1, 1), datetime(2024, 2, 29))
+
+
+def setup_statement(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    pdf = raw / "2024-01 to 2024-02.pdf"
+    pdf.write_bytes(b"statement")
+    (tmp_path / "2024-01 to 2024-02.csv").write_text("Date")
+
+    manifest = Manifest(str(raw), str(tmp_path))
+    manifest.record(pdf.name, hash_file(str(pdf)), MONTH_RANGE, "v1")
+    manifest.save()
+    return pdf
+
+
+def test_unchanged_file_is_current(tmp_path):
+    pdf = setup_statement(tmp_path)
+    manifest = Manifest(str(tmp_path / "raw"), str(tmp_path))
+
+    assert manifest.is_current(pdf.name, "v1")
+    assert manifest.is_current(pdf.name, None)
+    assert not manifest.is_current(pdf.name, "v2")
+    assert not manifest.is_current("other.pdf", "v1")
+
+
+def test_touched_file_is_rehashed(tmp_path):
+    pdf = setup_statement(tmp_path)
+    os.utime(pdf, (0, 0))
+    manifest = Manifest(str(tmp_path / "raw"), str(tmp_path))
+    assert manifest.is_current(pdf.name, "v1")
+
+    pdf.write_bytes(b"statemenT")
+    assert not manifest.is_current(pdf.name, "v1")
+
+
+def test_missing_csv_is_not_current(tmp_path):
+    pdf = setup_statement(tmp_path)
+    os.remove(tmp_path / "2024-01 to 2024-02.csv")
+    manifest = Manifest(str(tmp_path / "raw"), str(tmp_path))
+    assert not manifest.is_current(pdf.name, "v1")
+
+
+def test_parser_version_covers_shared_modules(monkeypatch):
+    hashes = {name: name for name in ["providers.ing"] + PARSING_MODULES}
+    monkeypatch.setattr(manifest_module, "get_module_hash", hashes.get)
+    before = get_parser_version("providers.ing")
+
+    for name in ["lib.ColumnLayout", "lib.files", "lib.sidecar"]:
+        hashes[name] = "edited"
+        assert get_parser_version("providers.ing") != before
+        hashes[name] = name
+        assert get_parser_version("providers.ing") == before
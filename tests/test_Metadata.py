@@ -0,0 +1,37 @@
+from contextlib import redirect_stdout
+import io
+import os
+
+from lib.Metadata import Metadata, patch_metadata_csv
+from lib.SingleMonthRange import SingleMonthRange
+
+
+def make_metadata(months, missing):
+    return [
+        Metadata(SingleMonthRange(month=month, year=2024), missing.get(month, []))
+        for month in months
+    ]
+
+
+def read_lines(path):
+    with open(path) as file:
+        return file.read().splitlines()
+
+
+def test_patch_appends_new_months(tmp_path):
+    path = tmp_path / "metadata.csv"
+    with redirect_stdout(io.StringIO()):
+        metadata = make_metadata([1, 2], {})
+        assert patch_metadata_csv(str(tmp_path), path.name, metadata) == 2
+        inode = os.stat(path).st_ino
+
+        metadata = make_metadata([1, 2, 3], {3: ["hsbc"]})
+        assert patch_metadata_csv(str(tmp_path), path.name, metadata) == 1
+        assert os.stat(path).st_ino == inode
+        assert patch_metadata_csv(str(tmp_path), path.name, metadata) == 0
+
+        # an earlier month changing rewrites the file
+        metadata = make_metadata([1, 2, 3], {1: ["ing"], 3: ["hsbc"]})
+        assert patch_metadata_csv(str(tmp_path), path.name, metadata) == 1
+
+    assert read_lines(path) == ["2024,1,ing", "2024,2", "2024,3,hsbc"]
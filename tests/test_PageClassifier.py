@@ -0,0 +1,32 @@
+from lib.PageClassifier import PageClassifier, PageLabel, select_pages
+
+CLASSIFIER = PageClassifier(
+    {
+        PageLabel.Transaction: ["Date", "Debit", "Balance"],
+        PageLabel.Validation: ["Opening balance", "Balance"],
+    }
+)
+
+
+def test_classify():
+    assert CLASSIFIER.keywords == ["Date", "Debit", "Balance", "Opening balance"]
+    assert CLASSIFIER.classify("Date Debit Balance") == {PageLabel.Transaction}
+    assert CLASSIFIER.classify("Date Debit Balance Opening balance") == {
+        PageLabel.Transaction,
+        PageLabel.Validation,
+    }
+    assert CLASSIFIER.classify("Terms and conditions") == {PageLabel.Boilerplate}
+
+
+def test_select_pages():
+    pages = ["Opening balance Balance", "Date Debit Balance", "Terms"]
+    page_labels = CLASSIFIER.classify_pages(pages)
+    assert select_pages(pages, page_labels, PageLabel.Transaction) == [pages[1]]
+    assert select_pages(pages, page_labels, PageLabel.Validation) == [pages[0]]
+
+
+def test_select_is_lazy():
+    pages = iter(["Date Debit Balance", "Terms", "Date Debit Balance"])
+    selected = CLASSIFIER.select(pages, PageLabel.Transaction)
+    assert next(selected) == "Date Debit Balance"
+    assert next(pages) == "Terms"
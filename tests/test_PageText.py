@@ -0,0 +1,28 @@
+from lib.PageText import PageText
+
+TEXT = "Date  Balance\n\n01 Jan  Coffee  4.50\n02 Jan  Rent  900.00\nCLOSING BALANCE"
+
+
+def test_newlines():
+    page = PageText(TEXT)
+    assert page.previous_newline(3) == -1
+    assert page.previous_newline(13) == 13
+    assert page.previous_newline(20) == 14
+    assert page.next_newline(0) == 13
+    assert page.next_newline(len(TEXT) - 1) == -1
+
+
+def test_line_at():
+    page = PageText(TEXT)
+    assert page.line_at(TEXT.find("Balance")) == "Date  Balance"
+    assert page.line_at(TEXT.find("Rent")) == "02 Jan  Rent  900.00"
+    assert page.line_at(TEXT.find("CLOSING")) == "CLOSING BALANCE"
+    assert page.line_at(13) == "Date  Balance"
+
+
+def test_lines_between():
+    page = PageText(TEXT)
+    lines = page.lines_between(TEXT.find("Balance"), TEXT.find("CLOSING"))
+    assert lines == ["", "01 Jan  Coffee  4.50", "02 Jan  Rent  900.00"]
+    assert page.lines_between(TEXT.find("Rent"), TEXT.find("CLOSING")) == []
+    assert page.lines_between(TEXT.find("Rent")) == ["CLOSING BALANCE"]
@@ -0,0 +1,45 @@
+from lib.RuleSet import Rule, RuleSet, get_rule_set
+
+
+def test_highest_priority_wins():
+    rule_set = RuleSet(
+        [
+            Rule("coles", "Groceries", 20),
+            Rule("myki", "Transport", 50),
+            Rule("agl", "Utilities", 30),
+        ]
+    )
+    assert rule_set.match("COLES MYKI TOPUP").category == "Transport"
+    assert rule_set.match("aldi and AGL").category == "Utilities"
+    assert rule_set.match("nothing here") is None
+
+
+def test_overlapping_patterns():
+    rule_set = RuleSet(
+        [
+            Rule("she", "A", 1),
+            Rule("he", "B", 2),
+            Rule("hers", "C", 3),
+            Rule("is", "D", 0),
+        ]
+    )
+    assert rule_set.match("ushers").category == "C"
+    assert rule_set.match("ushe").category == "B"
+    assert rule_set.match("this").category == "D"
+
+
+def test_ties_go_to_the_first_rule():
+    rule_set = RuleSet([Rule("abc", "First", 1), Rule("b", "Second", 1)])
+    assert rule_set.match("xabcx").category == "First"
+    assert rule_set.version != RuleSet([Rule("abc", "First", 2)]).version
+
+
+def test_many_rules():
+    rules = [Rule(f"merchant {i:03d}", f"Category {i}", i % 7) for i in range(500)]
+    rule_set = RuleSet(rules)
+    assert rule_set.match("EFTPOS MERCHANT 123 MELBOURNE").category == "Category 123"
+    assert rule_set.match("merchant 12") is None
+
+
+def test_configured_rules():
+    assert get_rule_set().match("Paypal *Amaysimmobi").category == "Utilities"
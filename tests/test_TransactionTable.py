@@ -0,0 +1,104 @@
+from contextlib import redirect_stdout
+from datetime import datetime
+import io
+import os
+import tempfile
+
+from lib.TransactionTable import (
+    CATEGORY_CODES,
+    TransactionTable,
+    csv_has_current_categories,
+)
+from lib.categorise import Category
+from lib.files import table_to_csv, transactions_to_csv
+from lib.sidecar import get_sidecar_path
+from lib.transaction import Transaction, TransactionType
+
+TRANSACTIONS = [
+    Transaction(datetime(2024, 1, 2), 1010, TransactionType.CardPayment, "COLES 0583"),
+    Transaction(datetime(2024, 1, 5), 200000, TransactionType.Salary, "ACME"),
+    Transaction(datetime(2024, 2, 1), 20, TransactionType.CardPayment, "COLES 0583"),
+    Transaction(datetime(2024, 2, 3), 5000, TransactionType.TransferOut, "Savings"),
+    Transaction(datetime(2024, 2, 9), 1500, TransactionType.Investment, "COMMSEC"),
+]
+
+
+def test_round_trip():
+    table = TransactionTable.from_transactions(TRANSACTIONS)
+    assert len(table) == 5
+    assert table.descriptions == ["COLES 0583", "ACME", "Savings", "COMMSEC"]
+    assert [str(t) for t in table] == [str(t) for t in TRANSACTIONS]
+    assert table.category(0) == Category.Groceries
+
+
+def test_totals():
+    table = TransactionTable.from_transactions(TRANSACTIONS)
+    assert table.total() == 207530
+    assert table.category_totals() == {
+        Category.Groceries: 1030,
+        Category.Salary: 200000,
+        Category.TransferOut: 5000,
+        Category.Investments: 1500,
+    }
+    # investments count for nothing
+    assert table.signed_total() == 200000 - 1030 - 5000
+
+
+def test_filters():
+    table = TransactionTable.from_transactions(TRANSACTIONS)
+    february = table.between(datetime(2024, 2, 1), datetime(2024, 2, 29))
+    assert len(february) == 3
+    assert february.descriptions is table.descriptions
+
+    groups = table.group_by_category()
+    assert list(groups.keys())[0] == Category.Groceries
+    assert groups[Category.Groceries].total() == 1030
+    assert len(table.in_categories([Category.Salary, Category.TransferOut])) == 2
+
+
+def test_from_csv():
+    with tempfile.TemporaryDirectory() as path:
+        transactions_to_csv(path, "a.csv", TRANSACTIONS)
+        table = TransactionTable.from_csv(os.path.join(path, "a.csv"))
+
+    assert [str(t) for t in table] == [str(t) for t in TRANSACTIONS]
+    assert table.descriptions == ["COLES 0583", "ACME", "Savings", "COMMSEC"]
+    assert table.category_totals() == (
+        TransactionTable.from_transactions(TRANSACTIONS).category_totals()
+    )
+
+
+def test_stored_categories_are_read_back(tmp_path):
+    table = TransactionTable.from_transactions(TRANSACTIONS)
+    # a category no rule would give, so it can only come from the file
+    table.categories[0] = CATEGORY_CODES[Category.Utilities]
+    with redirect_stdout(io.StringIO()):
+        table_to_csv(str(tmp_path), "a.csv", table)
+    csv_path = str(tmp_path / "a.csv")
+
+    assert csv_has_current_categories(csv_path)
+    assert TransactionTable.from_csv(csv_path).category(0) == Category.Utilities
+    os.remove(get_sidecar_path(csv_path))
+    assert TransactionTable.from_csv(csv_path).category(0) == Category.Utilities
+
+
+def test_stale_categories_are_recomputed(tmp_path):
+    csv_path = tmp_path / "a.csv"
+    csv_path.write_text(
+        "Date,Description,Amount,Type,Category 0000000000000000\n"
+        "2024-01-02 00:00:00,COLES 0583,10.1,Card Payment,Utilities\n"
+    )
+    assert not csv_has_current_categories(str(csv_path))
+    assert TransactionTable.from_csv(str(csv_path)).category(0) == Category.Groceries
+
+
+def test_extend():
+    table = TransactionTable.from_transactions(TRANSACTIONS[:2])
+    other = TransactionTable.from_transactions(TRANSACTIONS[2:])
+    table.extend(other.between(datetime(2024, 2, 2), datetime(2024, 2, 9)))
+
+    assert [str(t) for t in table] == [
+        str(t) for t in TRANSACTIONS[:2] + TRANSACTIONS[3:]
+    ]
+    assert table.descriptions == ["COLES 0583", "ACME", "Savings", "COMMSEC"]
+    assert table.category(3) == Category.Investments
@@ -0,0 +1,19 @@
+import tempfile
+
+from benchmarks.parsers import STATEMENTS, get_slope, time_stages
+
+PARSING_STAGES = ["lines", "aggregate", "transactions"]
+
+
+def test_synthetic_statements_parse():
+    with tempfile.TemporaryDirectory() as output_path:
+        for name in STATEMENTS.keys():
+            stages = time_stages(name, 50, output_path)
+            parsing = [s for s in PARSING_STAGES if name != "coles" or s != "aggregate"]
+            assert list(stages.keys()) == ["month_range", *parsing, "get_data", "csv"]
+
+
+def test_get_slope():
+    sizes = [10, 100, 1000]
+    assert abs(get_slope(sizes, [1.0, 10.0, 100.0]) - 1) < 1e-9
+    assert abs(get_slope(sizes, [1.0, 100.0, 10000.0]) - 2) < 1e-9
@@ -1,4 +1,8 @@
-from lib.files import parse_manage_args
+import os
+
+import pytest
+
+from lib.files import export_to_csv, parse_manage_args
 
 
 def test_arguments_true():
@@ -15,3 +19,43 @@ def test_arguments_false():
     assert not args.force
     assert not args.log
     assert not args.quick
+
+
+def test_arguments_workers():
+    assert parse_manage_args(["_"]).workers == 1
+    assert parse_manage_args(["_", "f", "j4"]).workers == 4
+    assert parse_manage_args(["_", "j0"]).workers == 1
+
+
+def test_arguments_cache():
+    assert parse_manage_args(["_"]).cache
+    assert not parse_manage_args(["_", "n"]).cache
+
+
+def test_arguments_capture():
+    assert not parse_manage_args(["_"]).capture
+    assert parse_manage_args(["_", "c"]).capture
+
+
+def failing_rows():
+    yield ["Date", "Description", "Amount", "Type"]
+    raise Exception("Validation failed")
+
+
+def test_export_keeps_old_csv_on_failure(tmp_path):
+    (tmp_path / "out.csv").write_text("old\n")
+    with pytest.raises(Exception):
+        export_to_csv(str(tmp_path), "out.csv", failing_rows())
+
+    assert (tmp_path / "out.csv").read_text() == "old\n"
+    assert os.listdir(tmp_path) == ["out.csv"]
+
+
+def test_export_streams_rows(tmp_path):
+    rows = (["row", i] for i in range(3))
+    assert export_to_csv(str(tmp_path), "out.csv", rows) == 3
+    assert (tmp_path / "out.csv").read_text().splitlines() == [
+        "row,0",
+        "row,1",
+        "row,2",
+    ]
@@ -0,0 +1,25 @@
+from contextlib import redirect_stdout
+import io
+import os
+
+from lib.registry import Provider
+from replay import replay_provider
+
+# statement text in the layouts the original chunk and cutoff parsers read,
+# with descriptions running into the amount columns' overhang
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def replay(key: str):
+    provider = Provider(key, os.path.join(FIXTURE_PATH, key), f"providers.{key}")
+    with redirect_stdout(io.StringIO()) as output:
+        failures = replay_provider(provider)
+    assert failures == 0, output.getvalue()
+
+
+def test_commbank_layout():
+    replay("commbank")
+
+
+def test_hsbc_layout():
+    replay("hsbc")
@@ -0,0 +1,68 @@
+from datetime import datetime
+import os
+import time
+
+from lib.MonthRange import MonthRange
+from lib.Source import Source
+from lib.files import parse_manage_args
+from lib.orchestrate import collect_jobs, orchestrate
+from lib.registry import Provider
+from lib.transaction import Transaction, TransactionType
+
+
+def get_month_range(document):
+    return MonthRange(datetime(2024, 1, 1), datetime(2024, 1, 31))
+
+
+def get_data(document, month_range):
+    if os.path.getsize(document.file_path) > 10:
+        raise Exception("Unparseable")
+    return [Transaction(datetime(2024, 1, 2), 1, TransactionType.Credit, "Refund")]
+
+
+SOURCES = [
+    Source(key, "", get_month_range, get_data) for key in ["a", "b", "good", "bad"]
+]
+
+
+def make_provider(tmp_path, key: str, files):
+    raw = tmp_path / key / "raw"
+    raw.mkdir(parents=True)
+    for name, contents in files.items():
+        (raw / name).write_bytes(contents)
+    return Provider(key, str(tmp_path / key), __name__)
+
+
+def test_largest_jobs_first(tmp_path):
+    providers = [
+        make_provider(tmp_path, "a", {"small.pdf": b"1", "notes.txt": b"1"}),
+        make_provider(tmp_path, "b", {"large.pdf": b"123456"}),
+    ]
+    args = parse_manage_args(["_", "n"])
+
+    jobs, _, _ = collect_jobs(providers, args)
+    assert [job.filename for job in jobs] == ["large.pdf", "small.pdf"]
+
+
+def test_failures_do_not_stop_other_sources(tmp_path, capsys):
+    providers = [
+        make_provider(tmp_path, "good", {"statement.pdf": b"ok"}),
+        make_provider(tmp_path, "bad", {"statement.pdf": b"too large to parse"}),
+    ]
+    orchestrate(providers, parse_manage_args(["_", "n", "j2"]))
+
+    output = capsys.readouterr().out
+    assert "good: 1 files, 1 transactions, 0 failures" in output
+    assert "bad: 0 files, 0 transactions, 1 failures" in output
+    assert os.path.isfile(tmp_path / "good" / "2024-01 to 2024-01.csv")
+    assert os.path.isfile(tmp_path / "good" / "raw" / "2024-01 to 2024-01.pdf")
+
+
+def test_job_seconds_are_cpu_time(tmp_path, monkeypatch, capsys):
+    providers = [make_provider(tmp_path, "good", {"statement.pdf": b"ok"})]
+    clock = iter([1.0, 4.0])
+    monkeypatch.setattr(time, "process_time", lambda: next(clock))
+
+    orchestrate(providers, parse_manage_args(["_", "n"]))
+    output = capsys.readouterr().out
+    assert "good: 1 files, 1 transactions, 0 failures, 3.00s CPU time" in output
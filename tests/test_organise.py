@@ -0,0 +1,184 @@
+from contextlib import redirect_stdout
+from datetime import datetime
+import io
+import os
+
+import organise
+from lib.Folder import Folder
+from lib.HistoryStore import HistoryStore
+from lib.Rollup import Rollup
+from lib.SingleMonthRange import SingleMonthRange
+from lib.categorise import Category
+from lib.files import transactions_to_csv
+from lib.transaction import Transaction, TransactionType
+
+
+def make_transactions(dates, description: str):
+    return [
+        Transaction(date, 100 + i, TransactionType.CardPayment, description)
+        for i, date in enumerate(dates)
+    ]
+
+
+def setup_folders(tmp_path):
+    everyday = tmp_path / "data" / "Everyday"
+    savings = tmp_path / "data" / "Savings"
+    everyday.mkdir(parents=True)
+    savings.mkdir(parents=True)
+
+    with redirect_stdout(io.StringIO()):
+        transactions_to_csv(
+            str(everyday),
+            "2024-01 to 2024-02.csv",
+            make_transactions(
+                [datetime(2024, 1, 3), datetime(2024, 1, 1), datetime(2024, 2, 3)],
+                "COLES",
+            ),
+        )
+        transactions_to_csv(
+            str(everyday),
+            "2024-04 to 2024-04.csv",
+            make_transactions([datetime(2024, 4, 9)], "COLES"),
+        )
+        transactions_to_csv(
+            str(savings),
+            "2024-01 to 2024-01.csv",
+            make_transactions([datetime(2024, 1, 3)], "Savings"),
+        )
+    return [Folder(str(everyday)), Folder(str(savings))]
+
+
+def read_csv(path):
+    with open(path) as file:
+        return file.read()
+
+
+def test_bucket_by_month_fills_gaps(tmp_path):
+    folders = setup_folders(tmp_path)
+    buckets = organise.bucket_by_month(organise.merge_sources(folders))
+
+    assert [b.month for b in buckets] == [
+        SingleMonthRange(month=1, year=2024),
+        SingleMonthRange(month=2, year=2024),
+        SingleMonthRange(month=3, year=2024),
+        SingleMonthRange(month=4, year=2024),
+    ]
+    assert [t.description for t in buckets[0].transactions] == [
+        "COLES",
+        "COLES",
+        "Savings",
+    ]
+    assert buckets[0].sources == {0, 1}
+    assert buckets[2].transactions == []
+
+
+def test_collate_all_matches_month_by_month(tmp_path, monkeypatch):
+    folders = setup_folders(tmp_path)
+    one_pass = tmp_path / "one_pass"
+    by_month = tmp_path / "by_month"
+    one_pass.mkdir()
+    by_month.mkdir()
+
+    with redirect_stdout(io.StringIO()):
+        monkeypatch.setattr(organise, "OUTPUT_PATH", str(one_pass))
+        organise.collate_all(folders, 4)
+
+        monkeypatch.setattr(organise, "OUTPUT_PATH", str(by_month))
+        for month in [1, 2]:
+            month_range = SingleMonthRange(month=month, year=2024)
+            organise.collate_transactions(folders, month_range)
+
+    for name in ["2024-01 to 2024-01.csv", "2024-02 to 2024-02.csv"]:
+        assert read_csv(one_pass / name) == read_csv(by_month / name)
+
+    assert read_csv(one_pass / "metadata.csv").splitlines() == [
+        "2024,1",
+        f"2024,2,{folders[1].get_source()}",
+        f"2024,3,{folders[0].get_source()},{folders[1].get_source()}",
+        f"2024,4,{folders[1].get_source()}",
+    ]
+    assert os.path.isfile(one_pass / "2024-03 to 2024-03.csv")
+
+
+def test_incremental_writes_changed_months(tmp_path, monkeypatch):
+    folders = setup_folders(tmp_path)
+    output = tmp_path / "output"
+    output.mkdir()
+    monkeypatch.setattr(organise, "OUTPUT_PATH", str(output))
+
+    with redirect_stdout(io.StringIO()):
+        assert organise.collate_incremental(folders, False) == 4
+        assert organise.collate_incremental(folders, False) == 0
+
+        transactions_to_csv(
+            folders[1].path,
+            "2024-04 to 2024-04.csv",
+            make_transactions([datetime(2024, 4, 2)], "Savings"),
+        )
+        folders = [Folder(folder.path) for folder in folders]
+        assert organise.collate_incremental(folders, False) == 1
+        assert organise.collate_incremental(folders, True) == 4
+
+    assert read_csv(output / "metadata.csv").splitlines()[3] == "2024,4"
+    assert read_csv(output / "2024-04 to 2024-04.csv").count("\n") == 3
+
+
+def test_rollup_follows_collation(tmp_path, monkeypatch):
+    folders = setup_folders(tmp_path)
+    output = tmp_path / "output"
+    output.mkdir()
+    monkeypatch.setattr(organise, "OUTPUT_PATH", str(output))
+    everyday, savings = [folder.get_source() for folder in folders]
+
+    with redirect_stdout(io.StringIO()):
+        organise.collate_all(folders, 2)
+    rollup = Rollup(str(output))
+    assert rollup.is_current()
+    assert rollup.months["2024-01"] == {
+        everyday: {"Groceries": [201, 2]},
+        savings: {"Entertainment": [100, 1]},
+    }
+    assert rollup.totals_by_month([Category.Groceries], 2024) == {
+        "2024-01": (201, 2),
+        "2024-02": (102, 1),
+        "2024-03": (0, 0),
+        "2024-04": (100, 1),
+    }
+    assert rollup.totals_by_source(None, 2024) == {everyday: 403, savings: 100}
+
+    with redirect_stdout(io.StringIO()):
+        organise.collate_incremental(folders, False)
+        transactions_to_csv(
+            folders[1].path,
+            "2024-04 to 2024-04.csv",
+            make_transactions([datetime(2024, 4, 2)], "Savings"),
+        )
+        folders = [Folder(folder.path) for folder in folders]
+        assert organise.collate_incremental(folders, False) == 1
+
+    rollup = Rollup(str(output))
+    assert rollup.total("2024-04", None, savings) == (100, 1)
+    assert rollup.total("2024-01") == (301, 3)
+
+
+def test_history_keeps_statement_order(tmp_path):
+    folder = tmp_path / "data" / "Everyday"
+    folder.mkdir(parents=True)
+    day = datetime(2024, 1, 5)
+    with redirect_stdout(io.StringIO()):
+        for name in ["2024-01 to 2024-01.csv", "2023-12 to 2024-01.csv"]:
+            transactions_to_csv(str(folder), name, make_transactions([day], name))
+
+        folders = [Folder(str(folder))]
+        store = HistoryStore(str(tmp_path / "history"))
+        organise.refresh_history(store, folders)
+
+    month_range = SingleMonthRange(month=1, year=2024).to_month_range()
+    expected = folders[0].get_transactions_between_dates(month_range)
+    assert [t.description for t in expected] == [
+        "2023-12 to 2024-01.csv",
+        "2024-01 to 2024-01.csv",
+    ]
+    stored = store.get_transactions_between_dates(month_range)
+    assert [str(t) for t in stored] == [str(t) for t in expected]
+    store.close()
@@ -0,0 +1,58 @@
+import os
+
+from lib import page_cache
+from lib.page_cache import evict, get_entry_paths, purge, read_entry, write_entry
+
+
+def test_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "CACHE_PATH", str(tmp_path))
+
+    assert read_entry("abc", "layout") is None
+    write_entry("abc", "layout", 3, {0: "first", 2: "third"})
+
+    assert read_entry("abc", "layout") == (3, {0: "first", 2: "third"})
+    assert read_entry("abc", "plain") is None
+
+
+def test_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "CACHE_PATH", str(tmp_path))
+
+    write_entry("old", "layout", 1, {0: "x" * 100})
+    write_entry("new", "layout", 1, {0: "x" * 100})
+    old_path = page_cache.get_entry_path("old", "layout")
+    os.utime(old_path, (0, 0))
+
+    entry_size = os.path.getsize(old_path)
+    assert evict(entry_size) == 1
+    assert read_entry("old", "layout") is None
+    assert read_entry("new", "layout") is not None
+
+    assert purge() == 1
+    assert get_entry_paths() == []
+
+
+def test_evict_skips_entries_removed_by_another_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "CACHE_PATH", str(tmp_path))
+
+    write_entry("gone", "layout", 1, {0: "x" * 100})
+    write_entry("kept", "layout", 1, {0: "x" * 100})
+    gone_path = page_cache.get_entry_path("gone", "layout")
+    os.utime(gone_path, (0, 0))
+
+    # another worker evicts the entry between listing and removal
+    stats = page_cache.get_entry_stats()
+    os.remove(gone_path)
+    monkeypatch.setattr(page_cache, "get_entry_stats", lambda: stats)
+    assert evict(0) == 1
+    assert get_entry_paths() == []
+
+
+def test_read_entry_evicted_before_mtime_refresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "CACHE_PATH", str(tmp_path))
+    write_entry("abc", "layout", 1, {0: "first"})
+
+    def evicted(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, "utime", evicted)
+    assert read_entry("abc", "layout") == (1, {0: "first"})
@@ -0,0 +1,34 @@
+import sys
+
+import pytest
+
+from lib.registry import (
+    get_module_name,
+    get_provider_names,
+    get_providers,
+    parse_provider_names,
+)
+
+
+def test_module_names():
+    assert get_module_name("boq-everyday") == "providers.boq"
+    assert get_module_name("hsbc") == "providers.hsbc"
+
+
+def test_providers_selected_by_name():
+    keys = [p.key for p in get_providers(["boq", "coles"])]
+    assert keys == ["boq-everyday", "boq-savings", "coles"]
+    assert "ing" in get_provider_names()
+    assert len(get_providers()) == 7
+
+
+def test_providers_not_imported():
+    sys.modules.pop("providers.hsbc", None)
+    get_providers()
+    assert "providers.hsbc" not in sys.modules
+
+
+def test_unknown_provider_names_rejected():
+    assert parse_provider_names(["hsbc", "boq-savings"]) == ["hsbc", "boq-savings"]
+    with pytest.raises(Exception, match="hsbcc"):
+        parse_provider_names(["hsbcc"])
@@ -0,0 +1,46 @@
+from contextlib import redirect_stdout
+import io
+import tempfile
+
+from benchmarks.synthetic import boq_statement
+from lib.TextDocument import TextDocument
+from lib.files import transactions_to_csv
+from lib.fixtures import get_fixture_names, read_fixture, write_fixture
+from lib.registry import Provider
+from providers.boq import get_data
+from replay import replay_provider
+
+NAME = "2024-01 to 2024-03"
+
+
+def write_statement(output_path: str):
+    statement = boq_statement(20)
+    write_fixture(output_path, NAME, statement.month_range, statement.pages)
+    with redirect_stdout(io.StringIO()):
+        transactions = get_data(TextDocument(statement.pages), statement.month_range)
+        transactions_to_csv(output_path, NAME + ".csv", transactions)
+    return statement
+
+
+def test_fixture_round_trip():
+    with tempfile.TemporaryDirectory() as output_path:
+        statement = write_statement(output_path)
+        assert get_fixture_names(output_path) == [NAME + ".json"]
+        assert read_fixture(output_path, NAME + ".json") == (
+            statement.month_range,
+            statement.pages,
+        )
+
+
+def test_replay_matches_csv():
+    with tempfile.TemporaryDirectory() as output_path:
+        write_statement(output_path)
+        provider = Provider("boq-everyday", output_path, "providers.boq")
+        with redirect_stdout(io.StringIO()):
+            assert replay_provider(provider) == 0
+
+        with open(f"{output_path}/{NAME}.csv", "a") as file:
+            file.write("2024-03-31 00:00:00,Extra,1.0,Credit\n")
+        with redirect_stdout(io.StringIO()) as output:
+            assert replay_provider(provider) == 1
+        assert "+++ replay" in output.getvalue()
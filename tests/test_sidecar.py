@@ -0,0 +1,61 @@
+from datetime import datetime
+import os
+
+from lib.TransactionTable import TransactionTable
+from lib.files import transactions_to_csv
+from lib.sidecar import get_sidecar_path, read_sidecar
+from lib.transaction import Transaction, TransactionType, get_transactions_in_csv
+
+TRANSACTIONS = [
+    Transaction(datetime(2024, 1, 2), 1010, TransactionType.CardPayment, "COLES 0583"),
+    Transaction(datetime(2024, 1, 5), -200000, TransactionType.Salary, "ACME, INC"),
+    Transaction(datetime(2024, 2, 1), 20, TransactionType.CardPayment, "COLES 0583"),
+    Transaction(datetime(2024, 2, 3), 5000, TransactionType.TransferOut, "Café"),
+]
+
+
+def write(tmp_path):
+    transactions_to_csv(str(tmp_path), "a.csv", TRANSACTIONS)
+    return os.path.join(tmp_path, "a.csv")
+
+
+def test_sidecar_matches_csv(tmp_path):
+    csv_path = write(tmp_path)
+    columns = read_sidecar(csv_path)
+
+    assert len(columns) == 4
+    assert columns.descriptions == ["COLES 0583", "ACME  INC", "Café"]
+    assert list(columns.rows())[1] == (
+        datetime(2024, 1, 5),
+        -200000,
+        "Salary",
+        "ACME  INC",
+    )
+
+    loaded = get_transactions_in_csv(csv_path)
+    assert [t.to_data() for t in loaded] == [t.to_data() for t in TRANSACTIONS]
+
+    table = TransactionTable.from_csv(csv_path)
+    expected = TransactionTable.from_transactions(loaded)
+    assert list(table.categories) == list(expected.categories)
+    assert [str(t) for t in table] == [str(t) for t in expected]
+
+
+def test_stale_sidecar_falls_back_to_csv(tmp_path):
+    csv_path = write(tmp_path)
+    sidecar_path = get_sidecar_path(csv_path)
+    os.utime(sidecar_path, ns=(0, 0))
+
+    assert read_sidecar(csv_path) is None
+    assert len(get_transactions_in_csv(csv_path)) == 4
+
+
+def test_corrupt_sidecar_falls_back_to_csv(tmp_path):
+    csv_path = write(tmp_path)
+    sidecar_path = get_sidecar_path(csv_path)
+    with open(sidecar_path, "r+b") as file:
+        file.truncate(40)
+
+    assert read_sidecar(csv_path) is None
+    assert len(TransactionTable.from_csv(csv_path)) == 4
+    assert read_sidecar(os.path.join(tmp_path, "missing.csv")) is None
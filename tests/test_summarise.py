@@ -0,0 +1,78 @@
+from contextlib import redirect_stdout
+from datetime import datetime
+import io
+
+import pytest
+
+from lib.HistoryStore import HistoryStore
+from lib.SingleMonthRange import SingleMonthRange
+from lib.TransactionGroups import parse_transaction_groups
+from lib.TransactionTable import TransactionTable
+from lib.categorise import Category
+from lib.transaction import Transaction, TransactionType
+import summarise
+from summarise import load_month, merge_tables, parse_args
+
+
+def test_parse_single_month():
+    assert parse_args(["2024", "3"]) == [SingleMonthRange(month=3, year=2024)]
+
+
+def test_parse_ranges():
+    months = parse_args(["2023", "11", "2024", "2"])
+    assert [m.to_string() for m in months] == [
+        "2023-11",
+        "2023-12",
+        "2024-01",
+        "2024-02",
+    ]
+
+    financial_year = parse_args(["fy", "2024"])
+    assert len(financial_year) == 12
+    assert financial_year[0] == SingleMonthRange(month=7, year=2023)
+    assert financial_year[-1] == SingleMonthRange(month=6, year=2024)
+
+    assert len(parse_args(["2024"])) == 12
+
+    with pytest.raises(Exception):
+        parse_args(["2024", "3", "2023", "1"])
+
+
+def test_monthly_columns():
+    january = TransactionTable.from_transactions(
+        [Transaction(datetime(2024, 1, 2), 1000, TransactionType.Salary, "ACME")]
+    )
+    february = TransactionTable.from_transactions(
+        [
+            Transaction(datetime(2024, 2, 2), 1000, TransactionType.Salary, "ACME"),
+            Transaction(datetime(2024, 2, 3), 250, TransactionType.CardPayment, "ALDI"),
+        ]
+    )
+    months = [("2024-01", january), ("2024-02", february)]
+    groups = parse_transaction_groups(merge_tables(months), months)
+    assert groups.compute_totals()[Category.Salary] == 2000
+
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        groups.print_monthly_columns()
+    lines = buffer.getvalue().splitlines()
+    assert lines[0].endswith("     2024-01     2024-02")
+    salary = [line for line in lines if "Salary" in line][0]
+    assert salary.endswith("20.00       10.00       10.00\x1b[0m")
+
+
+def test_missing_month_skipped_with_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = HistoryStore(str(tmp_path / "history"))
+    salary = Transaction(datetime(2024, 1, 2), 1000, TransactionType.Salary, "ACME")
+    store.write({"Everyday": ({"a.csv": [1, 2]}, [salary])})
+
+    monkeypatch.setattr(summarise, "get_json", lambda name: {})
+    monkeypatch.setattr(summarise, "HistoryStore", lambda: store)
+    assert load_month(SingleMonthRange(month=2, year=2024), store) is None
+
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        assert summarise.load_months([SingleMonthRange(month=2, year=2024)]) == []
+    assert "2024-02 has no transactions csv, skipped" in buffer.getvalue()
+    store.close()
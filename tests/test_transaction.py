@@ -0,0 +1,44 @@
+from datetime import datetime
+import os
+import tempfile
+
+from lib.files import transactions_to_csv
+from lib.transaction import (
+    Transaction,
+    TransactionType,
+    get_transactions_in_csv,
+    parse_money,
+    parse_timestamp,
+)
+
+
+def test_parse_money():
+    assert parse_money("1,234.56") == 123456
+    assert parse_money("-12.3") == -1230
+    assert parse_money("1000.0") == 100000
+    assert parse_money(" 5 ") == 500
+    assert parse_money("0.30000000000000004") == 30
+
+
+def test_to_data_in_dollars():
+    transaction = Transaction(datetime(2024, 1, 2), 1230, TransactionType.Credit, "A,B")
+    assert transaction.to_data()[1:] == ["A B", 12.3, "Credit"]
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("2024-01-02 03:04:05") == datetime(2024, 1, 2, 3, 4, 5)
+    assert parse_timestamp("2024-1-2 03:04:05") == datetime(2024, 1, 2, 3, 4, 5)
+
+
+def test_csv_round_trip():
+    transactions = [
+        Transaction(datetime(2024, 1, 2), 1230, TransactionType.Credit, "A,B"),
+        Transaction(datetime(2024, 1, 2), -5, TransactionType.CardPayment, "C"),
+        Transaction(datetime(2024, 1, 3), 100000, TransactionType.Salary, "D"),
+    ]
+    with tempfile.TemporaryDirectory() as path:
+        transactions_to_csv(path, "a.csv", transactions)
+        loaded = get_transactions_in_csv(os.path.join(path, "a.csv"))
+
+    assert [t.to_data() for t in loaded] == [t.to_data() for t in transactions]
+    assert loaded[0].date is loaded[1].date
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import pytest
+
+from lib.transaction import Transaction, TransactionType
+from lib.validation import (
+    Bucket,
+    StatementTotals,
+    StatementValidation,
+    get_buckets,
+    validated,
+)
+
+BUCKETS = get_buckets(
+    Bucket.Credit,
+    {
+        TransactionType.CardPayment: Bucket.Debit,
+        TransactionType.Interest: Bucket.UntotalledCredit,
+    },
+)
+
+STATEMENT = [
+    Transaction(datetime(2024, 1, 1), 1050, TransactionType.CardPayment, "Coles"),
+    Transaction(datetime(2024, 1, 2), 20000, TransactionType.Salary, "ACME"),
+    Transaction(datetime(2024, 1, 3), 7, TransactionType.Interest, "Interest"),
+]
+
+
+class CountingValidation:
+    def __init__(self):
+        self.count = 0
+        self.checked = False
+
+    def add(self, transaction: Transaction):
+        self.count += 1
+
+    def check(self):
+        self.checked = True
+
+
+def test_checked_after_last_transaction():
+    transactions = [
+        Transaction(datetime(2024, 1, d), 1, TransactionType.Credit, "Refund")
+        for d in range(1, 4)
+    ]
+    validation = CountingValidation()
+    stream = validated(transactions, validation)
+
+    assert next(stream) == transactions[0]
+    assert validation.count == 1
+    assert not validation.checked
+
+    assert list(stream) == transactions[1:]
+    assert validation.count == 3
+    assert validation.checked
+
+
+def get_report(totals: StatementTotals):
+    validation = StatementValidation(BUCKETS, totals)
+    for transaction in STATEMENT:
+        validation.add(transaction)
+    return validation.report()
+
+
+def test_report_passes():
+    report = get_report(StatementTotals(100000, 118957, 1050, 20000, debit_count=1))
+    assert report.passed
+    assert [check.name for check in report.checks] == [
+        "Statement Balance",
+        "Change In Balance",
+        "Total Debits",
+        "Total Credits",
+        "Debit Count",
+    ]
+
+
+def test_failed_statement_raises():
+    totals = StatementTotals(100000, 118957, 1051, 20001)
+    assert [check.name for check in get_report(totals).failures()] == [
+        "Total Debits",
+        "Total Credits",
+    ]
+
+    validation = StatementValidation(BUCKETS, totals)
+    with pytest.raises(Exception, match="Total Debits, Total Credits"):
+        list(validated(STATEMENT, validation))